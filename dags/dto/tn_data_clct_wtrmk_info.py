@@ -0,0 +1,18 @@
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, DateTime
+
+Base = declarative_base()
+
+class TnDataClctWtrmkInfo(Base):
+
+    def as_dict(self):
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+
+    __tablename__ = "tn_data_clct_wtrmk_info"
+
+    dtst_cd = Column(String, primary_key=True)
+    wtrmk_col_nm = Column(String)
+    wtrmk_vl = Column(String)
+    pndng_wtrmk_vl = Column(String)
+    pndng_clct_log_sn = Column(Integer)
+    mdfcn_dt = Column(DateTime)
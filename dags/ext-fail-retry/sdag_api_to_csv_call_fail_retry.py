@@ -159,9 +159,7 @@ def api_to_csv_call_fail_retry():
             params: fail_data_lists
             return: file_size
             """
-            import requests
-            import time
-            from util.call_url_util import CallUrlUtil
+            from util.call_url_util import CallUrlUtil, CsvSink, RetryPolicy
             from xml_to_dict import XMLtoDict
             
             root_collect_file_path = kwargs['var']['value'].root_collect_file_path
@@ -173,6 +171,7 @@ def api_to_csv_call_fail_retry():
 
                     dtst_cd = th_data_clct_contact_fail_hstry_log.dtst_cd.lower()
                     pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
+                    http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # 제공처별 http 연결 설정
                     pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
                     # base_url = return_url = tn_data_bsc_info.link_data_clct_url
                     return_url = th_data_clct_contact_fail_hstry_log.clct_fail_url
@@ -181,6 +180,7 @@ def api_to_csv_call_fail_retry():
                     params = th_data_clct_contact_fail_hstry_log.estn_field_one
 
                     retry_num = 0  # 데이터 없을 시 재시도 횟수
+                    retry_policy = RetryPolicy(http_config)  # 재시도 정책 (지수 백오프)
                     page_no = th_data_clct_contact_fail_hstry_log.clct_pgng_no
                     
                     header = False   # 파일 헤더 모드
@@ -193,17 +193,18 @@ def api_to_csv_call_fail_retry():
                     full_file_name = full_file_path + file_name
                     link_file_sprtr = tn_data_bsc_info.link_file_sprtr
                     row_count = 0  # 행 개수
+                    csv_sink = CsvSink(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name)  # 페이지 단위 csv 파일 생성
 
                     while True:
                         # 재시도 5회 이상 시 whlie 종료
-                        if retry_num >= 5:
+                        if retry_num >= retry_policy.max_retries:
                             break
 
                         # url 설정
                         # return_url = base_url + { "data19" : f"{page_no}&bjdongCd=" }.get(dtst_cd) + params
                         
                         # url 호출
-                        response = requests.get(return_url, verify= False)                    
+                        response = CallUrlUtil.request_url(return_url, http_config)                    
                         response_code = response.status_code
 
                         # url 호출 시 메세지 설정
@@ -228,7 +229,7 @@ def api_to_csv_call_fail_retry():
 
                             # 공공데이터포털 - HTTP 에러 시
                             if 'OpenAPI_ServiceResponse' in response.text:
-                                retry_num += 1
+                                retry_num = retry_policy.wait(retry_num, response, "service_error")
                                 continue
 
                             result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
@@ -246,58 +247,34 @@ def api_to_csv_call_fail_retry():
                                 add_column_dict = {add_column : "세출"}
                             
                             # 컬럼 존재하지않는 경우 예외 처리
-                            get_data_column_stmt = f"""
-                                SELECT column_name
-                                FROM information_schema.columns
-                                WHERE table_name = '{tn_data_bsc_info.dw_tbl_phys_nm}'
-                                AND column_name NOT IN ('data_crtr_pnttm','clct_sn','clct_pnttm','clct_log_sn','page_no')
-                                ORDER BY ordinal_position
-                            """
-                            with session.begin() as conn:
-                                dw_column_dict = []  # DW 컬럼명
-                                for dict_row in conn.execute(get_data_column_stmt).all():
-                                    dw_column_dict.append(dict_row[0])
-
-                            for dict_value in result_json:
-                                dict_value.update(add_column_dict)
-                                lowercase_keys = {key.lower(): value for key, value in dict_value.items()}
-                                for missing_column in dw_column_dict:
-                                    if missing_column not in lowercase_keys.keys():
-                                        add_column_dict.update({missing_column: None})
-                                dict_value.update(add_column_dict)
-                            
+                            dw_column_dict = CommonUtil.get_dw_column_list(session, tn_data_bsc_info.dw_tbl_phys_nm)  # DW 컬럼명 (캐시 사용)
+
                             # 데이터 존재 시
                             if result_size != 0:
                                 retry_num = 0  # 재시도 횟수 초기화
-                                row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                                if row_count == 0:
-                                    header = True
-                                    mode = "w"
-
                                 # csv 파일 생성
-                                CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no)
+                                csv_sink.write(result_json, page_no, add_column_dict, dw_column_dict)
 
                             # 데이터 결과 없을 경우
                             else:
                                 logging.info(f"{CONST.MSG_CLCT_COMP_NO_DATA}")
 
-                            row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
+                            row_count = csv_sink.row_count  # 행 개수 확인
                             if row_count != 0:
                                 logging.info(f"현재까지 파일 내 행 개수: {row_count}")
                             break
                         else:
                             logging.info(f"call_url response_code::: {response_code}")
-                            retry_num += 1
-                            time.sleep(5)
+                            retry_num = retry_policy.wait(retry_num, response)
                             continue
                     
                     with session.begin() as conn:
                         th_data_clct_contact_fail_hstry_log = conn.get(ThDataClctCallFailrHistLog, th_data_clct_contact_fail_hstry_log.sn)
 
                         # th_data_clct_contact_fail_hstry_log 업데이트
-                        if result_size == 0 and retry_num < 5:  # 원천데이터 없음
+                        if result_size == 0 and retry_num < retry_policy.max_retries:  # 원천데이터 없음
                             CallUrlUtil.update_fail_history_log(th_data_clct_contact_fail_hstry_log, session, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA)
-                        elif retry_num >= 5:  # URL호출 실패
+                        elif retry_num >= retry_policy.max_retries:  # URL호출 실패
                             CallUrlUtil.update_fail_history_log(th_data_clct_contact_fail_hstry_log, session, CONST.STTS_ERROR,CONST.MSG_CLCT_ERROR_CALL)
                         else:  # URL호출 및 CSV생성 성공
                             CallUrlUtil.update_fail_history_log(th_data_clct_contact_fail_hstry_log, session, CONST.STTS_COMP, CONST.MSG_CLCT_COMP)
@@ -432,7 +409,8 @@ def api_to_csv_call_fail_retry():
                     root_collect_file_path = kwargs['var']['value'].root_collect_file_path
                     full_file_path = root_collect_file_path + file_path
 
-                    FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle)
+                    zip_codec = FileUtil.get_zip_codec(kwargs, tn_data_bsc_info.pvdr_site_cd)  # 압축 코덱 (pvdr_site_cd 별)
+                    FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle, zip_codec)
                     encrypt_file = FileUtil.encrypt_file(full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle)
             except Exception as e:
                 CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_FILE_INSD_SEND, CONST.STTS_ERROR, CONST.MSG_FILE_INSD_SEND_ERROR_FILE, "y")
@@ -3,7 +3,7 @@ import urllib3
 
 from pendulum import datetime, now
 from airflow.decorators import dag, task, task_group
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
@@ -92,11 +92,9 @@ def api_to_csv_5min():
             params: tn_data_bsc_info, th_data_clct_mastr_log, tn_clct_file_info, file_path
             return: file_size
             """
-            import requests
             import os
-            import time
             from xml_to_dict import XMLtoDict
-            from util.call_url_util import CallUrlUtil
+            from util.call_url_util import CallUrlUtil, CsvSink, RetryPolicy
             from util.date_custom_util import DateUtil
 
             th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_list['th_data_clct_mastr_log'])
@@ -108,6 +106,7 @@ def api_to_csv_5min():
             dtst_cd = th_data_clct_mastr_log.dtst_cd.lower()
             link_se_cd = tn_data_bsc_info.link_se_cd.lower()
             pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
+            http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # 제공처별 http 연결 설정
             pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
             base_url = return_url = tn_data_bsc_info.link_data_clct_url
 
@@ -117,6 +116,7 @@ def api_to_csv_5min():
             params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
 
             retry_num = 0  # 데이터 없을 시 재시도 횟수
+            retry_policy = RetryPolicy(http_config)  # 재시도 정책 (지수 백오프)
             repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
             page_no = 1  # 현재 페이지
             total_page = 1  # 총 페이지 수
@@ -131,175 +131,171 @@ def api_to_csv_5min():
             link_file_sprtr = tn_data_bsc_info.link_file_sprtr
             file_size = 0  # 파일 사이즈
             row_count = 0  # 행 개수
+            csv_sink = CsvSink(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name)  # 페이지 단위 csv 파일 생성
 
-            try:
-                # 파라미터 길이만큼 반복 호출
-                while repeat_num <= params_len:
+            with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+                try:
+                    # 파라미터 길이만큼 반복 호출
+                    while repeat_num <= params_len:
                     
-                    # 총 페이지 수만큼 반복 호출
-                    while page_no <= total_page:
+                        # 총 페이지 수만큼 반복 호출
+                        while page_no <= total_page:
                         
-                        # 파라미터 길이만큼 호출 시 while 종료
-                        if repeat_num > params_len:
-                            break
-                        
-                        # 재시도 5회 이상 시
-                        if retry_num >= 5:
-                            # 파라미터 길이 == 1) whlie 종료
-                            if params_len == 1:
-                                repeat_num += 1
+                            # 파라미터 길이만큼 호출 시 while 종료
+                            if repeat_num > params_len:
                                 break
-                            else:  # 파라미터 길이 != 1)
-                                # th_data_clct_contact_fail_hstry_log 에 입력
-                                CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
+                        
+                            # 재시도 5회 이상 시
+                            if retry_num >= retry_policy.max_retries:
+                                # 파라미터 길이 == 1) whlie 종료
+                                if params_len == 1:
+                                    repeat_num += 1
+                                    break
+                                else:  # 파라미터 길이 != 1)
+                                    # th_data_clct_contact_fail_hstry_log 에 입력
+                                    CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
 
-                                # 총 페이지 수만큼 덜 돌았을 때
-                                if page_no < total_page:  # 다음 페이지 호출
-                                    retry_num = 0
-                                    page_no += 1
-                                    continue
-                                # 총 페이지 수만큼 다 돌고
-                                elif page_no == total_page:
-                                    # 파라미터 길이만큼 덜 돌았을 때
-                                    if repeat_num < params_len:
+                                    # 총 페이지 수만큼 덜 돌았을 때
+                                    if page_no < total_page:  # 다음 페이지 호출
                                         retry_num = 0
-                                        page_no = 1
-                                        repeat_num += 1
+                                        page_no += 1
                                         continue
-                                    # 파라미터 길이만큼 다 돌았을 때
-                                    else:
-                                        repeat_num += 1
-                                        break
+                                    # 총 페이지 수만큼 다 돌고
+                                    elif page_no == total_page:
+                                        # 파라미터 길이만큼 덜 돌았을 때
+                                        if repeat_num < params_len:
+                                            retry_num = 0
+                                            page_no = 1
+                                            repeat_num += 1
+                                            continue
+                                        # 파라미터 길이만큼 다 돌았을 때
+                                        else:
+                                            repeat_num += 1
+                                            break
 
-                        # url 설정
-                        return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                            # url 설정
+                            return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
                         
                         
-                        # url 호출
-                        response = requests.get(return_url, verify= False)
-                        response_code = response.status_code
+                            # url 호출
+                            response = CallUrlUtil.request_url(return_url, http_config)
+                            response_code = response.status_code
 
-                        # url 호출 시 메세지 설정
-                        header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, full_file_name, header, mode)
+                            # url 호출 시 메세지 설정
+                            header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, full_file_name, header, mode)
 
-                        # 수집파일 header, mode 설정
-                        if os.path.exists(full_file_name):
-                            header = False
-                            mode = "a"  # 파일 쓰기 모드 append
+                            # 수집파일 header, mode 설정
+                            if os.path.exists(full_file_name):
+                                header = False
+                                mode = "a"  # 파일 쓰기 모드 append
                         
-                        if response_code == 200:
-                            if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json":
-                                json_data = response.json()
-                            else:  # xml
-                                json_data = XMLtoDict().parse(response.text)
+                            if response_code == 200:
+                                if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json":
+                                    json_data = response.json()
+                                else:  # xml
+                                    json_data = XMLtoDict().parse(response.text)
 
-                            # 원천 데이터 저장
-                            CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
+                                # 원천 데이터 저장
+                                CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
 
-                            result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
-                            result_json = result['result_json_array']
-                            result_size = len(result_json)
+                                result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
+                                result_json = result['result_json_array']
+                                result_size = len(result_json)
                             
-                            # 데이터 존재 시
-                            if result_size != 0:
-                                retry_num = 0  # 재시도 횟수 초기화
-                                if page_no == 1: # 첫 페이지일 때
-                                    # 페이징 계산
-                                    total_count = int(result['total_count'])
-                                    total_page = CallUrlUtil.get_total_page(total_count, result_size)
+                                # 데이터 존재 시
+                                if result_size != 0:
+                                    retry_num = 0  # 재시도 횟수 초기화
+                                    if page_no == 1: # 첫 페이지일 때
+                                        # 페이징 계산
+                                        total_count = int(result['total_count'])
+                                        total_page = CallUrlUtil.get_total_page(total_count, result_size)
 
-                                row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                                if row_count == 0:
-                                    header = True
-                                    mode = "w"
-                                
-                                with session.begin() as conn:
-                                    # DB 적재
-                                    bulk_data = [
-                                        {
-                                            'roadname': result['roadName'],
-                                            'roaddrctype': result['roadDrcType'],
-                                            'linkno': result['linkNo'],
-                                            'linkid': result['linkId'],
-                                            'startnodeid': result['startNodeId'],
-                                            'endnodeid': result['endNodeId'],
-                                            'speed': result['speed'],
-                                            'traveltime': result['travelTime'],
-                                            'createddate': result['createdDate'],
-                                            'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
-                                            'clct_pnttm': DateUtil.get_ymdhm(),
-                                            'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
-                                            'page_no': page_no
-                                        } for result in result_json
-                                    ]
-                                    columns = ', '.join(bulk_data[0].keys())
-                                    values = ', '.join([
-                                        f"({', '.join(map(lambda x: format_value(x) if x is not None else 'Null', row.values()))})"
-                                        for row in bulk_data
-                                    ])
-                                    insert_stmt = f'''
+                                    with session.begin() as conn:
+                                        # DB 적재
+                                        bulk_data = [
+                                            {
+                                                'roadname': result['roadName'],
+                                                'roaddrctype': result['roadDrcType'],
+                                                'linkno': result['linkNo'],
+                                                'linkid': result['linkId'],
+                                                'startnodeid': result['startNodeId'],
+                                                'endnodeid': result['endNodeId'],
+                                                'speed': result['speed'],
+                                                'traveltime': result['travelTime'],
+                                                'createddate': result['createdDate'],
+                                                'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
+                                                'clct_pnttm': DateUtil.get_ymdhm(),
+                                                'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
+                                                'page_no': page_no
+                                            } for result in result_json
+                                        ]
+                                        columns = ', '.join(bulk_data[0].keys())
+                                        values = ', '.join([
+                                            f"({', '.join(map(lambda x: format_value(x) if x is not None else 'Null', row.values()))})"
+                                            for row in bulk_data
+                                        ])
+                                        insert_stmt = f'''
                                         INSERT INTO {tn_data_bsc_info.dw_tbl_phys_nm} ({columns}) VALUES {values};
                                     '''
-                                    conn.execute(insert_stmt)
+                                        conn.execute(insert_stmt)
 
-                                # csv 파일 생성
-                                CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no)
+                                    # csv 파일 생성
+                                    csv_sink.write(result_json, page_no)
 
-                            row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                            if row_count != 0:
-                                logging.info(f"현재까지 파일 내 행 개수: {row_count}")
+                                row_count = csv_sink.row_count  # 행 개수 확인
+                                if row_count != 0:
+                                    logging.info(f"현재까지 파일 내 행 개수: {row_count}")
 
-                            # 총 페이지 수 == 1)
-                            if total_page == 1:
-                                repeat_num += 1
-                                break
-                            else:
-                                if page_no < total_page:
-                                    page_no += 1
-                                elif page_no == total_page:
-                                    if params_len == 1:
-                                        repeat_num += 1
-                                        break
-                                    elif params_len != 1:
-                                        if repeat_num < params_len:
-                                            page_no = 1
+                                # 총 페이지 수 == 1)
+                                if total_page == 1:
+                                    repeat_num += 1
+                                    break
+                                else:
+                                    if page_no < total_page:
+                                        page_no += 1
+                                    elif page_no == total_page:
+                                        if params_len == 1:
                                             repeat_num += 1
-                                        else: repeat_num += 1
-                                        break
+                                            break
+                                        elif params_len != 1:
+                                            if repeat_num < params_len:
+                                                page_no = 1
+                                                repeat_num += 1
+                                            else: repeat_num += 1
+                                            break
 
-                        else:
-                            logging.info(f"call_url response_code::: {response_code}")
-                            retry_num += 1
-                            time.sleep(5)
-                            continue
+                            else:
+                                logging.info(f"call_url response_code::: {response_code}")
+                                retry_num = retry_policy.wait(retry_num, response)
+                                continue
 
-                # 파일 사이즈 확인
-                if os.path.exists(full_file_name):
-                    file_size = os.path.getsize(full_file_name)
-                logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
+                    # 파일 사이즈 확인
+                    if os.path.exists(full_file_name):
+                        file_size = os.path.getsize(full_file_name)
+                    logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
 
-                # 실패 로그 개수 확인
-                fail_count = CallUrlUtil.get_fail_data_count(th_data_clct_mastr_log.clct_log_sn, session)
+                    # 실패 로그 개수 확인
+                    fail_count = CallUrlUtil.get_fail_data_count(th_data_clct_mastr_log.clct_log_sn, session)
                 
-                if row_count == 0 and fail_count == 0 and retry_num < 5:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-                    raise AirflowSkipException()
-                elif fail_count != 0 or retry_num >= 5:
-                    logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                    raise AirflowSkipException()
-                else:
-                    # tn_clct_file_info 수집파일정보
-                    tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
-                    if link_file_crt_yn == "y":
-                        CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
-            except AirflowSkipException as e:
-                raise e
-            except Exception as e:
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                logging.info(f"call_url Exception::: {e}")
-                raise e
+                    if row_count == 0 and fail_count == 0 and retry_num < retry_policy.max_retries:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+                        raise AirflowSkipException()
+                    elif fail_count != 0 or retry_num >= retry_policy.max_retries:
+                        logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                        raise AirflowSkipException()
+                    else:
+                        # tn_clct_file_info 수집파일정보
+                        tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
+                        if link_file_crt_yn == "y":
+                            CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
+                except AirflowSkipException as e:
+                    raise e
+                except Exception as e:
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                    logging.info(f"call_url Exception::: {e}")
+                    raise e
 
         file_path = create_directory(collect_data_list)
         file_path >> call_url(collect_data_list, file_path)
@@ -3,7 +3,7 @@ import urllib3
 
 from pendulum import datetime
 from airflow.decorators import dag, task, task_group
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
@@ -94,10 +94,8 @@ def api_to_csv_day():
             params: tn_data_bsc_info, th_data_clct_mastr_log, tn_clct_file_info, file_path
             return: file_size
             """
-            import requests
             import os
-            import time
-            from util.call_url_util import CallUrlUtil
+            from util.call_url_util import CallUrlUtil, CsvSink, PageFetcher, RetryPolicy
             from xml_to_dict import XMLtoDict
 
             th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_list['th_data_clct_mastr_log'])
@@ -109,6 +107,7 @@ def api_to_csv_day():
             dtst_cd = th_data_clct_mastr_log.dtst_cd.lower()
             link_se_cd = tn_data_bsc_info.link_se_cd.lower()
             pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
+            http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # 제공처별 http 연결 설정
             pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
             base_url = return_url = tn_data_bsc_info.link_data_clct_url
 
@@ -118,6 +117,7 @@ def api_to_csv_day():
             params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
 
             retry_num = 0  # 데이터 없을 시 재시도 횟수
+            retry_policy = RetryPolicy(http_config)  # 재시도 정책 (지수 백오프)
             repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
             page_no = 1  # 현재 페이지
             total_page = 1  # 총 페이지 수
@@ -132,175 +132,158 @@ def api_to_csv_day():
             link_file_sprtr = tn_data_bsc_info.link_file_sprtr
             file_size = 0  # 파일 사이즈
             row_count = 0  # 행 개수
+            csv_sink = CsvSink(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name)  # 페이지 단위 csv 파일 생성
+            page_fetcher = PageFetcher(http_config)  # total_page 확인 후 페이지 병렬 호출
 
-            try:
-                # 파라미터 길이만큼 반복 호출
-                while repeat_num <= params_len:
+            with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+                try:
+                    # 파라미터 길이만큼 반복 호출
+                    while repeat_num <= params_len:
                     
-                    # 총 페이지 수만큼 반복 호출
-                    while page_no <= total_page:
+                        # 총 페이지 수만큼 반복 호출
+                        while page_no <= total_page:
                         
-                        # 파라미터 길이만큼 호출 시 while 종료
-                        if repeat_num > params_len:
-                            break
-                        
-                        # 재시도 5회 이상 시
-                        if retry_num >= 5:
-                            # 파라미터 길이 == 1) whlie 종료
-                            if params_len == 1:
-                                repeat_num += 1
+                            # 파라미터 길이만큼 호출 시 while 종료
+                            if repeat_num > params_len:
                                 break
-                            else:  # 파라미터 길이 != 1)
-                                # th_data_clct_contact_fail_hstry_log 에 입력
-                                CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
-
-                                # 총 페이지 수만큼 덜 돌았을 때
-                                if page_no < total_page:  # 다음 페이지 호출
-                                    retry_num = 0
-                                    page_no += 1
-                                    continue
-                                # 총 페이지 수만큼 다 돌고
-                                elif page_no == total_page:
-                                    # 파라미터 길이만큼 덜 돌았을 때
-                                    if repeat_num < params_len:
+                        
+                            # 재시도 5회 이상 시
+                            if retry_num >= retry_policy.max_retries:
+                                # 파라미터 길이 == 1) whlie 종료
+                                if params_len == 1:
+                                    repeat_num += 1
+                                    break
+                                else:  # 파라미터 길이 != 1)
+                                    # th_data_clct_contact_fail_hstry_log 에 입력
+                                    CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
+
+                                    # 총 페이지 수만큼 덜 돌았을 때
+                                    if page_no < total_page:  # 다음 페이지 호출
                                         retry_num = 0
-                                        page_no = 1
-                                        repeat_num += 1
+                                        page_no += 1
                                         continue
-                                    # 파라미터 길이만큼 다 돌았을 때
-                                    else:
-                                        repeat_num += 1
-                                        break
-
-                        # url 설정
-                        # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
-                        return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
-                        print ('!!!!!!!! : ',return_url)
-                        # url 호출
-                        response = requests.get(return_url, verify= False) #prod
-                        #response = requests.get(return_url, verify=False,cert=context) #test
-                        response_code = response.status_code
-                        #print(f"Response Code@@@@: {response_code}, Response Body: {response.text}")
-
-                        # url 호출 시 메세지 설정
-                        header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, full_file_name, header, mode)
+                                    # 총 페이지 수만큼 다 돌고
+                                    elif page_no == total_page:
+                                        # 파라미터 길이만큼 덜 돌았을 때
+                                        if repeat_num < params_len:
+                                            retry_num = 0
+                                            page_no = 1
+                                            repeat_num += 1
+                                            continue
+                                        # 파라미터 길이만큼 다 돌았을 때
+                                        else:
+                                            repeat_num += 1
+                                            break
+
+                            # url 설정
+                            # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                            return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                            print ('!!!!!!!! : ',return_url)
+                            # url 호출
+                            response = page_fetcher.get(return_url)
+                            #response = requests.get(return_url, verify=False,cert=context) #test
+                            response_code = response.status_code
+                            #print(f"Response Code@@@@: {response_code}, Response Body: {response.text}")
+
+                            # url 호출 시 메세지 설정
+                            header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, full_file_name, header, mode)
                         
-                        if response_code == 200:
-                            if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json" and 'OpenAPI_ServiceResponse' not in response.text:  # 공공데이터포털 - HTTP 에러 제외
-                                json_data = response.json()
-                            if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "xml" or 'OpenAPI_ServiceResponse' in response.text:  # 공공데이터포털 - HTTP 에러 시 xml 형태
-                                json_data = XMLtoDict().parse(response.text)
-
-                            # 원천 데이터 저장
-                            CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
-
-                            # 공공데이터포털 - HTTP 에러 시
-                            if 'OpenAPI_ServiceResponse' in response.text:
-                                retry_num += 1
-                                continue
+                            if response_code == 200:
+                                if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json" and 'OpenAPI_ServiceResponse' not in response.text:  # 공공데이터포털 - HTTP 에러 제외
+                                    json_data = response.json()
+                                if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "xml" or 'OpenAPI_ServiceResponse' in response.text:  # 공공데이터포털 - HTTP 에러 시 xml 형태
+                                    json_data = XMLtoDict().parse(response.text)
+
+                                # 원천 데이터 저장
+                                CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
+
+                                # 공공데이터포털 - HTTP 에러 시
+                                if 'OpenAPI_ServiceResponse' in response.text:
+                                    retry_num = retry_policy.wait(retry_num, response, "service_error")
+                                    continue
 
-                            result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
-                            result_json = result['result_json_array']
-                            result_size = len(result_json)
+                                result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
+                                result_json = result['result_json_array']
+                                result_size = len(result_json)
 
-                            # 데이터 구분 컬럼, 값 추가
-                            add_column = tn_data_bsc_info.data_se_col_two
-                            add_column_dict = {}
-                            if dtst_cd in {"data31"}:  # 대기오염정보_측정소별_실시간_측정정보_조회
-                                add_column_dict = {add_column : params_dict['param_list'][repeat_num - 1]}
+                                # 데이터 구분 컬럼, 값 추가
+                                add_column = tn_data_bsc_info.data_se_col_two
+                                add_column_dict = {}
+                                if dtst_cd in {"data31"}:  # 대기오염정보_측정소별_실시간_측정정보_조회
+                                    add_column_dict = {add_column : params_dict['param_list'][repeat_num - 1]}
                             
-                            # 컬럼 존재하지않는 경우 예외 처리
-                            get_data_column_stmt = f"""
-                                SELECT column_name
-                                FROM information_schema.columns
-                                WHERE table_name = '{tn_data_bsc_info.dw_tbl_phys_nm}'
-                                AND column_name NOT IN ('data_crtr_pnttm','clct_sn','clct_pnttm','clct_log_sn','page_no')
-                                ORDER BY ordinal_position
-                            """
-                            with session.begin() as conn:
-                                dw_column_dict = []  # DW 컬럼명
-                                for dict_row in conn.execute(get_data_column_stmt).all():
-                                    dw_column_dict.append(dict_row[0])
-
-                            for dict_value in result_json:
-                                dict_value.update(add_column_dict)
-                                lowercase_keys = {key.lower(): value for key, value in dict_value.items()}
-                                for missing_column in dw_column_dict:
-                                    if missing_column not in lowercase_keys.keys():
-                                        add_column_dict.update({missing_column: None})
-                                dict_value.update(add_column_dict)
-                            
-                            # 데이터 존재 시
-                            if result_size != 0:
-                                retry_num = 0  # 재시도 횟수 초기화
-                                if page_no == 1: # 첫 페이지일 때
-                                    # 페이징 계산
-                                    total_count = int(result['total_count'])
-                                    total_page = CallUrlUtil.get_total_page(total_count, result_size)
-
-                                row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                                if row_count == 0:
-                                    header = True
-                                    mode = "w"
-
-                                # csv 파일 생성
-                                CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no)
-
-                            row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                            if row_count != 0:
-                                logging.info(f"현재까지 파일 내 행 개수: {row_count}")
-
-                            # 총 페이지 수 == 1)
-                            if total_page == 1:
-                                repeat_num += 1
-                                break
-                            else:
-                                if page_no < total_page:
-                                    page_no += 1
-                                elif page_no == total_page:
-                                    if params_len == 1:
-                                        repeat_num += 1
-                                        break
-                                    elif params_len != 1:
-                                        if repeat_num < params_len:
-                                            page_no = 1
+                                # 컬럼 존재하지않는 경우 예외 처리
+                                dw_column_dict = CommonUtil.get_dw_column_list(session, tn_data_bsc_info.dw_tbl_phys_nm)  # DW 컬럼명 (캐시 사용)
+
+                                # 데이터 존재 시
+                                if result_size != 0:
+                                    retry_num = 0  # 재시도 횟수 초기화
+                                    if page_no == 1: # 첫 페이지일 때
+                                        # 페이징 계산
+                                        total_count = int(result['total_count'])
+                                        total_page = CallUrlUtil.get_total_page(total_count, result_size)
+                                        # 2페이지 ~ 총 페이지 병렬 호출 (page_concurrency > 1 인 경우, 적재는 페이지 순서대로)
+                                        page_fetcher.prefetch([f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, next_page_no)}" for next_page_no in range(2, total_page + 1)])
+
+                                    # csv 파일 생성
+                                    csv_sink.write(result_json, page_no, add_column_dict, dw_column_dict)
+
+                                row_count = csv_sink.row_count  # 행 개수 확인
+                                if row_count != 0:
+                                    logging.info(f"현재까지 파일 내 행 개수: {row_count}")
+
+                                # 총 페이지 수 == 1)
+                                if total_page == 1:
+                                    repeat_num += 1
+                                    break
+                                else:
+                                    if page_no < total_page:
+                                        page_no += 1
+                                    elif page_no == total_page:
+                                        if params_len == 1:
                                             repeat_num += 1
-                                        else: repeat_num += 1
-                                        break
-
-                        else:
-                            logging.info(f"call_url response_code::: {response_code}")
-                            retry_num += 1
-                            time.sleep(5)
-                            continue
-
-                # 파일 사이즈 확인
-                if os.path.exists(full_file_name):
-                    file_size = os.path.getsize(full_file_name)
-                logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
-
-                # 실패 로그 개수 확인
-                fail_count = CallUrlUtil.get_fail_data_count(th_data_clct_mastr_log.clct_log_sn, session)
+                                            break
+                                        elif params_len != 1:
+                                            if repeat_num < params_len:
+                                                page_no = 1
+                                                repeat_num += 1
+                                            else: repeat_num += 1
+                                            break
+
+                            else:
+                                logging.info(f"call_url response_code::: {response_code}")
+                                retry_num = retry_policy.wait(retry_num, response)
+                                continue
+
+                    # 파일 사이즈 확인
+                    if os.path.exists(full_file_name):
+                        file_size = os.path.getsize(full_file_name)
+                    logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
+
+                    # 실패 로그 개수 확인
+                    fail_count = CallUrlUtil.get_fail_data_count(th_data_clct_mastr_log.clct_log_sn, session)
                 
-                if row_count == 0 and fail_count == 0 and retry_num < 5:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-                    raise AirflowSkipException()
-                elif fail_count != 0 or retry_num >= 5:
-                    logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                    raise AirflowSkipException()
-                else:
-                    # tn_clct_file_info 수집파일정보
-                    tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
-                    if link_file_crt_yn == "y":
-                        CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
-            except AirflowSkipException as e:
-                raise e
-            except Exception as e:
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                logging.info(f"call_url Exception::: {e}")
-                raise e
+                    if row_count == 0 and fail_count == 0 and retry_num < retry_policy.max_retries:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+                        raise AirflowSkipException()
+                    elif fail_count != 0 or retry_num >= retry_policy.max_retries:
+                        logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                        raise AirflowSkipException()
+                    else:
+                        # tn_clct_file_info 수집파일정보
+                        tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
+                        if link_file_crt_yn == "y":
+                            CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
+                except AirflowSkipException as e:
+                    raise e
+                except Exception as e:
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                    logging.info(f"call_url Exception::: {e}")
+                    raise e
+                finally:
+                    page_fetcher.close()
         
         @task
         def encrypt_zip_file(collect_data_list, file_path, **kwargs):
@@ -324,7 +307,8 @@ def api_to_csv_day():
                     root_collect_file_path = kwargs['var']['value'].root_collect_file_path
                     full_file_path = root_collect_file_path + file_path
 
-                    FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle)
+                    zip_codec = FileUtil.get_zip_codec(kwargs, tn_data_bsc_info.pvdr_site_cd)  # 압축 코덱 (pvdr_site_cd 별)
+                    FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle, zip_codec)
                     encrypt_file = FileUtil.encrypt_file(full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle)
             except Exception as e:
                 CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_FILE_INSD_SEND, CONST.STTS_ERROR, CONST.MSG_FILE_INSD_SEND_ERROR_FILE, "n")
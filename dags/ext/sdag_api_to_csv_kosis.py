@@ -3,7 +3,7 @@ import urllib3
 
 from pendulum import datetime, from_format,now
 from airflow.decorators import dag, task
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
@@ -99,191 +99,197 @@ def api_to_csv_kosis():
         params: tn_data_bsc_info, th_data_clct_mastr_log, tn_clct_file_info, file_path
         return: success_data_list
         """
-        import requests
         import os
-        import time
-        from util.call_url_util import CallUrlUtil
+        import json
+        from util.call_url_util import CallUrlUtil, CsvSink, RetryPolicy, JsonArrayStream
         from xml_to_dict import XMLtoDict
         
         success_data_list = []
-        for collect_data_dict in collect_data_list:
-            th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_dict['th_data_clct_mastr_log'])
-            tn_data_bsc_info = TnDataBscInfo(**collect_data_dict['tn_data_bsc_info'])
-            tn_clct_file_info = TnClctFileInfo(**collect_data_dict['tn_clct_file_info'])
-            log_full_file_path = collect_data_dict['log_full_file_path']
-            root_collect_file_path = kwargs['var']['value'].root_collect_file_path
-
-            dtst_cd = th_data_clct_mastr_log.dtst_cd.lower()
-            link_se_cd = tn_data_bsc_info.link_se_cd.lower()
-            pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
-            pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
-            base_url = return_url = tn_data_bsc_info.link_data_clct_url
-
-            # 파라미터 및 파라미터 길이 설정
-            data_interval_start = kwargs['data_interval_start'].in_timezone("Asia/Seoul").set(day=1)  # 처리 데이터의 시작 날짜 (데이터 기준 시점)
-            data_interval_end = kwargs['data_interval_end'].in_timezone("Asia/Seoul")  # 실제 실행하는 날짜를 KST 로 설정
-            params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
-
-            retry_num = 0  # 데이터 없을 시 재시도 횟수
-            repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
-            page_no = 1  # 현재 페이지
-            total_page = 1  # 총 페이지 수
+        with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+            for collect_data_dict in collect_data_list:
+                th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_dict['th_data_clct_mastr_log'])
+                tn_data_bsc_info = TnDataBscInfo(**collect_data_dict['tn_data_bsc_info'])
+                tn_clct_file_info = TnClctFileInfo(**collect_data_dict['tn_clct_file_info'])
+                log_full_file_path = collect_data_dict['log_full_file_path']
+                root_collect_file_path = kwargs['var']['value'].root_collect_file_path
+
+                dtst_cd = th_data_clct_mastr_log.dtst_cd.lower()
+                link_se_cd = tn_data_bsc_info.link_se_cd.lower()
+                pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
+                http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # 제공처별 http 연결 설정
+                pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
+                base_url = return_url = tn_data_bsc_info.link_data_clct_url
+
+                # 파라미터 및 파라미터 길이 설정
+                data_interval_start = kwargs['data_interval_start'].in_timezone("Asia/Seoul").set(day=1)  # 처리 데이터의 시작 날짜 (데이터 기준 시점)
+                data_interval_end = kwargs['data_interval_end'].in_timezone("Asia/Seoul")  # 실제 실행하는 날짜를 KST 로 설정
+                params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
+
+                retry_num = 0  # 데이터 없을 시 재시도 횟수
+                retry_policy = RetryPolicy(http_config)  # 재시도 정책 (지수 백오프)
+                repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
+                page_no = 1  # 현재 페이지
+                total_page = 1  # 총 페이지 수
             
-            header = True   # 파일 헤더 모드
-            mode = "w"  # 파일 쓰기 모드 overwrite
-            link_file_crt_yn = tn_data_bsc_info.link_file_crt_yn.lower()  # csv 파일 생성 여부
-            file_name = tn_clct_file_info.insd_file_nm + "." + tn_clct_file_info.insd_file_extn  # csv 파일명
-            source_file_name = tn_clct_file_info.insd_file_nm + "." + tn_data_bsc_info.pvdr_sou_data_pvsn_stle  # 원천 파일명
-            full_file_path = root_collect_file_path + file_path
-            full_file_name = full_file_path + file_name
-            link_file_sprtr = tn_data_bsc_info.link_file_sprtr
-            file_size = 0  # 파일 사이즈
-            row_count = 0  # 행 개수
-
-            try:
-                # 파라미터 길이만큼 반복 호출
-                while repeat_num <= params_len:
+                header = True   # 파일 헤더 모드
+                mode = "w"  # 파일 쓰기 모드 overwrite
+                link_file_crt_yn = tn_data_bsc_info.link_file_crt_yn.lower()  # csv 파일 생성 여부
+                file_name = tn_clct_file_info.insd_file_nm + "." + tn_clct_file_info.insd_file_extn  # csv 파일명
+                source_file_name = tn_clct_file_info.insd_file_nm + "." + tn_data_bsc_info.pvdr_sou_data_pvsn_stle  # 원천 파일명
+                full_file_path = root_collect_file_path + file_path
+                full_file_name = full_file_path + file_name
+                link_file_sprtr = tn_data_bsc_info.link_file_sprtr
+                file_size = 0  # 파일 사이즈
+                row_count = 0  # 행 개수
+                csv_sink = CsvSink(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name)  # 페이지 단위 csv 파일 생성
+                json_stream_yn = tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json" and CallUrlUtil.set_keyword("list_keywords", pvdr_site_cd, pvdr_inst_cd, dtst_cd) == ""  # json 배열 응답 스트리밍 여부
+
+                try:
+                    # 파라미터 길이만큼 반복 호출
+                    while repeat_num <= params_len:
                     
-                    # 총 페이지 수만큼 반복 호출
-                    while page_no <= total_page:
+                        # 총 페이지 수만큼 반복 호출
+                        while page_no <= total_page:
                         
-                        # 파라미터 길이만큼 호출 시 while 종료
-                        if repeat_num > params_len:
-                            break
-                        
-                        # 재시도 5회 이상 시
-                        if retry_num >= 5:
-                            # 파라미터 길이 == 1) whlie 종료
-                            if params_len == 1:
-                                repeat_num += 1
+                            # 파라미터 길이만큼 호출 시 while 종료
+                            if repeat_num > params_len:
                                 break
-                            else:  # 파라미터 길이 != 1)
-                                # th_data_clct_contact_fail_hstry_log 에 입력
-                                CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
-
-                                # 총 페이지 수만큼 덜 돌았을 때
-                                if page_no < total_page:  # 다음 페이지 호출
-                                    retry_num = 0
-                                    page_no += 1
-                                    continue
-                                # 총 페이지 수만큼 다 돌고
-                                elif page_no == total_page:
-                                    # 파라미터 길이만큼 덜 돌았을 때
-                                    if repeat_num < params_len:
+                        
+                            # 재시도 5회 이상 시
+                            if retry_num >= retry_policy.max_retries:
+                                # 파라미터 길이 == 1) whlie 종료
+                                if params_len == 1:
+                                    repeat_num += 1
+                                    break
+                                else:  # 파라미터 길이 != 1)
+                                    # th_data_clct_contact_fail_hstry_log 에 입력
+                                    CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
+
+                                    # 총 페이지 수만큼 덜 돌았을 때
+                                    if page_no < total_page:  # 다음 페이지 호출
                                         retry_num = 0
-                                        page_no = 1
-                                        repeat_num += 1
+                                        page_no += 1
                                         continue
-                                    # 파라미터 길이만큼 다 돌았을 때
-                                    else:
-                                        repeat_num += 1
-                                        break
-
-                        # url 설정
-                        # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
-                        return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                                    # 총 페이지 수만큼 다 돌고
+                                    elif page_no == total_page:
+                                        # 파라미터 길이만큼 덜 돌았을 때
+                                        if repeat_num < params_len:
+                                            retry_num = 0
+                                            page_no = 1
+                                            repeat_num += 1
+                                            continue
+                                        # 파라미터 길이만큼 다 돌았을 때
+                                        else:
+                                            repeat_num += 1
+                                            break
+
+                            # url 설정
+                            # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                            return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
                         
-                        # url 호출
-                        response = requests.get(return_url, verify= False)                            
-                        response_code = response.status_code
+                            # url 호출
+                            response = CallUrlUtil.request_url(return_url, http_config, stream=json_stream_yn)
+                            response_code = response.status_code
 
-                        # url 호출 시 메세지 설정
-                        header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, full_file_name, header, mode)
+                            # url 호출 시 메세지 설정
+                            header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, full_file_name, header, mode)
                         
-                        if response_code == 200:
-                            if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json" and 'OpenAPI_ServiceResponse' not in response.text:  # 공공데이터포털 - HTTP 에러 제외
-                                json_data = response.json()
-                            if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "xml" or 'OpenAPI_ServiceResponse' in response.text:  # 공공데이터포털 - HTTP 에러 시 xml 형태
-                                json_data = XMLtoDict().parse(response.text)
-
-                            # 원천 데이터 저장
-                            CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
-
-                            # 공공데이터포털 - HTTP 에러 시
-                            if 'OpenAPI_ServiceResponse' in response.text:
-                                retry_num += 1
-                                continue
+                            if response_code == 200:
+                                # json 배열 응답은 받은 만큼 원천 파일, csv 파일에 바로 저장
+                                json_stream = JsonArrayStream(response) if json_stream_yn else None
+                                if json_stream is not None and json_stream.is_array:
+                                    result_size = json_stream.write_file(csv_sink, page_no, source_file_name, full_file_path, mode, CallUrlUtil.get_ignore_column(dtst_cd))
+                                    result = {'total_count' : result_size}
+                                else:
+                                    response_text = json_stream.read_text() if json_stream is not None else response.text
+                                    if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json" and 'OpenAPI_ServiceResponse' not in response_text:  # 공공데이터포털 - HTTP 에러 제외
+                                        json_data = json.loads(response_text)
+                                    if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "xml" or 'OpenAPI_ServiceResponse' in response_text:  # 공공데이터포털 - HTTP 에러 시 xml 형태
+                                        json_data = XMLtoDict().parse(response_text)
+
+                                    # 원천 데이터 저장
+                                    CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
+
+                                    # 공공데이터포털 - HTTP 에러 시
+                                    if 'OpenAPI_ServiceResponse' in response_text:
+                                        retry_num = retry_policy.wait(retry_num, response, "service_error")
+                                        continue
 
-                            result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
-                            result_json = result['result_json_array']
-                            result_size = len(result_json)
+                                    result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
+                                    result_json = result['result_json_array']
+                                    result_size = len(result_json)
                             
-                            # 데이터 존재 시
-                            if result_size != 0:
-                                retry_num = 0  # 재시도 횟수 초기화
-                                if page_no == 1: # 첫 페이지일 때
-                                    # 페이징 계산
-                                    total_count = int(result['total_count'])
-                                    total_page = CallUrlUtil.get_total_page(total_count, result_size)
-
-                                row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                                if row_count == 0:
-                                    header = True
-                                    mode = "w"
-
-                                # csv 파일 생성
-                                CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no)
-
-                            # 데이터 결과 없을 경우
-                            else:
-                                # 가변 파라미터 변경 후 재호출
-                                if params_len == 1 and params_dict != {} and retry_num < 4:
-                                    params_dict['params'] -= 1  # year -= 1
-                                    retry_num += 1
-                                    continue
-
-                            row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                            if row_count != 0:
-                                logging.info(f"현재까지 파일 내 행 개수: {row_count}")
-
-                            # 총 페이지 수 == 1)
-                            if total_page == 1:
-                                repeat_num += 1
-                                break
-                            else:
-                                if page_no < total_page:
-                                    page_no += 1
-                                elif page_no == total_page:
-                                    if params_len == 1:
-                                        repeat_num += 1
-                                        break
-                                    elif params_len != 1:
-                                        if repeat_num < params_len:
-                                            page_no = 1
+                                # 데이터 존재 시
+                                if result_size != 0:
+                                    retry_num = 0  # 재시도 횟수 초기화
+                                    if page_no == 1: # 첫 페이지일 때
+                                        # 페이징 계산
+                                        total_count = int(result['total_count'])
+                                        total_page = CallUrlUtil.get_total_page(total_count, result_size)
+
+                                    # csv 파일 생성 (스트리밍 시 저장 완료)
+                                    if json_stream is None or not json_stream.is_array:
+                                        csv_sink.write(result_json, page_no)
+
+                                # 데이터 결과 없을 경우
+                                else:
+                                    # 가변 파라미터 변경 후 재호출
+                                    if params_len == 1 and params_dict != {} and retry_num < retry_policy.max_retries - 1:
+                                        params_dict['params'] -= 1  # year -= 1
+                                        retry_num += 1
+                                        continue
+
+                                row_count = csv_sink.row_count  # 행 개수 확인
+                                if row_count != 0:
+                                    logging.info(f"현재까지 파일 내 행 개수: {row_count}")
+
+                                # 총 페이지 수 == 1)
+                                if total_page == 1:
+                                    repeat_num += 1
+                                    break
+                                else:
+                                    if page_no < total_page:
+                                        page_no += 1
+                                    elif page_no == total_page:
+                                        if params_len == 1:
                                             repeat_num += 1
-                                        else: repeat_num += 1
-                                        break
-
-                        else:
-                            logging.info(f"call_url response_code::: {response_code}")
-                            retry_num += 1
-                            time.sleep(5)
-                            continue
-
-                # 파일 사이즈 확인
-                if os.path.exists(full_file_name):
-                    file_size = os.path.getsize(full_file_name)
-                logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
+                                            break
+                                        elif params_len != 1:
+                                            if repeat_num < params_len:
+                                                page_no = 1
+                                                repeat_num += 1
+                                            else: repeat_num += 1
+                                            break
+
+                            else:
+                                logging.info(f"call_url response_code::: {response_code}")
+                                retry_num = retry_policy.wait(retry_num, response)
+                                continue
+
+                    # 파일 사이즈 확인
+                    if os.path.exists(full_file_name):
+                        file_size = os.path.getsize(full_file_name)
+                    logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
                 
-                if row_count == 0:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-                else:
-                    # tn_clct_file_info 수집파일정보
-                    tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
-
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
-                    success_data_list.append({
-                        "tn_data_bsc_info" : tn_data_bsc_info.as_dict()
-                        , "th_data_clct_mastr_log": th_data_clct_mastr_log.as_dict()
-                        , "tn_clct_file_info": tn_clct_file_info.as_dict()
-                        , "log_full_file_path" : log_full_file_path
-                        })
-                    if link_file_crt_yn == "y":
-                        CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
-            except Exception as e:
-                logging.info(f"call_url Exception::: {e}")
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-        return success_data_list
+                    if row_count == 0:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+                    else:
+                        # tn_clct_file_info 수집파일정보
+                        tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
+
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
+                        success_data_list.append({
+                            "tn_data_bsc_info" : tn_data_bsc_info.as_dict()
+                            , "th_data_clct_mastr_log": th_data_clct_mastr_log.as_dict()
+                            , "tn_clct_file_info": tn_clct_file_info.as_dict()
+                            , "log_full_file_path" : log_full_file_path
+                            })
+                        if link_file_crt_yn == "y":
+                            CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
+                except Exception as e:
+                    logging.info(f"call_url Exception::: {e}")
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+            return success_data_list
     
     @task
     def encrypt_zip_file(success_data_list, file_path, **kwargs):
@@ -310,7 +316,8 @@ def api_to_csv_kosis():
             root_collect_file_path = kwargs['var']['value'].root_collect_file_path
             full_file_path = root_collect_file_path + file_path
 
-            FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle)
+            zip_codec = FileUtil.get_zip_codec(kwargs, tn_data_bsc_info.pvdr_site_cd)  # 압축 코덱 (pvdr_site_cd 별)
+            FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle, zip_codec)
             encrypt_file = FileUtil.encrypt_file(full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle)
         except Exception as e:
             for collect_data_dict in success_data_list:
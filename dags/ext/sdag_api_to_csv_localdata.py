@@ -133,23 +133,24 @@ def api_to_csv_localdata():
         params: tn_data_bsc_info, th_data_clct_mastr_log, tn_clct_file_info, file_path
         return: file_size
         """
-        import requests
         import os
-        import time
         import zipfile
         import shutil
         import csv
         import pandas as pd
         from util.date_custom_util import DateUtil
+        from util.call_url_util import CallUrlUtil, RetryPolicy
 
         tn_data_bsc_info = TnDataBscInfo(**collect_data_list['tn_data_bsc_info'])
         th_data_clct_mastr_log_temp = ThDataClctMastrLog(**collect_data_list['th_data_clct_mastr_log'])
 
         base_url = return_url = tn_data_bsc_info.link_data_clct_url
+        http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # 제공처별 http 연결 설정
         root_collect_file_path = kwargs['var']['value'].root_collect_file_path
         full_file_path = root_collect_file_path + file_path
 
         retry_num = 0  # 재시도 횟수
+        retry_policy = RetryPolicy(http_config)  # 재시도 정책 (지수 백오프)
         data_interval_start = kwargs['data_interval_start'].in_timezone("Asia/Seoul")  # 처리 데이터의 시작 날짜 (데이터 기준 시점)
         data_interval_end = kwargs['data_interval_end'].in_timezone("Asia/Seoul")  # 실제 실행하는 날짜를 KST 로 설정
         data_crtr_pnttm = CommonUtil.set_data_crtr_pnttm(tn_data_bsc_info.link_clct_cycle_cd, data_interval_start)
@@ -161,14 +162,14 @@ def api_to_csv_localdata():
         try:
             while True:
                 # 재시도 5회 이상 시
-                if retry_num >= 5:
+                if retry_num >= retry_policy.max_retries:
                     break
 
                 # url 설정
                 return_url = f"{base_url}"
                 
                 # url 호출
-                response = requests.get(return_url, verify= False, stream=True)                    
+                response = CallUrlUtil.request_url(return_url, http_config, stream=True)                    
                 response_code = response.status_code
 
                 # url 호출 시 메세지 설정
@@ -197,10 +198,20 @@ def api_to_csv_localdata():
                     break
                 else:
                     logging.error(f"call_url response_code::: {response_code}")
-                    retry_num += 1
-                    time.sleep(5)
+                    retry_num = retry_policy.wait(retry_num, response)
                     continue
             
+            # 지방행정인허가 파일별 DW 테이블명 조회 후 DW 컬럼명 한 번에 조회
+            select_dw_tbl_stmt = f"""
+                SELECT dtst_nm, dw_tbl_phys_nm
+                FROM tn_data_bsc_info
+                WHERE LOWER(dtst_cd) = 'data648'
+                AND LOWER(dw_load_yn) = 'y'
+            """
+            with session.begin() as conn:
+                dw_tbl_phys_nm_dict = {dict_row[0]: dict_row[1] for dict_row in conn.execute(select_dw_tbl_stmt).all()}
+            CommonUtil.get_dw_column_info(session, dw_tbl_phys_nm_dict.values())
+
             for file in os.listdir(full_file_path):
                 if file.endswith(tn_data_bsc_info.link_file_extn) and not file.endswith('.zip'):
                 # if not file.endswith('.zip'):
@@ -271,23 +282,8 @@ def api_to_csv_localdata():
                         conn.get(ThDataClctMastrLog, th_data_clct_mastr_log.clct_log_sn)
                         
                         # csv 한글 헤더를 DW 영문 컬럼명으로 변경
-                        get_data_column_stmt = f"""
-                                    SELECT column_name
-                                    FROM information_schema.columns
-                                    WHERE table_name = (
-                                        SELECT dw_tbl_phys_nm
-                                        FROM tn_data_bsc_info
-                                        WHERE LOWER(dtst_cd) = 'data648'
-                                        AND dtst_nm = replace('{file_name}','_{data_crtr_pnttm}','')
-                                        AND LOWER(dw_load_yn) = 'y'
-                                    )
-                                    AND column_name NOT IN ('data_crtr_pnttm','clct_sn','clct_pnttm','clct_log_sn','page_no')
-                                    ORDER BY ordinal_position
-                                """
-                        with session.begin() as conn:
-                            dw_column_dict = []  # DW 컬럼명
-                            for dict_row in conn.execute(get_data_column_stmt).all():
-                                dw_column_dict.append(dict_row[0])
+                        dw_tbl_phys_nm = dw_tbl_phys_nm_dict.get(file_name.replace(f"_{data_crtr_pnttm}", ""))
+                        dw_column_dict = CommonUtil.get_dw_column_list(session, dw_tbl_phys_nm) if dw_tbl_phys_nm else []  # DW 컬럼명 (캐시 사용)
 
                         if dw_column_dict != []:
                             df = pd.read_csv(full_file_name)
@@ -370,7 +366,8 @@ def api_to_csv_localdata():
                 root_collect_file_path = kwargs['var']['value'].root_collect_file_path
                 full_file_path = root_collect_file_path + file_path
 
-                FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle)
+                zip_codec = FileUtil.get_zip_codec(kwargs, tn_data_bsc_info.pvdr_site_cd)  # 압축 코덱 (pvdr_site_cd 별)
+                FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle, zip_codec)
                 encrypt_file = FileUtil.encrypt_file(full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle)
         except Exception as e:
             for log_data_list in log_data_lists['log_data_lists']:
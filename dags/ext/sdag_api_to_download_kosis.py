@@ -3,7 +3,7 @@ import urllib3
 
 from pendulum import datetime, from_format,now
 from airflow.decorators import dag, task
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
@@ -95,112 +95,113 @@ def api_to_download_kosis():
         params: tn_data_bsc_info, th_data_clct_mastr_log, tn_clct_file_info, file_path
         return: success_data_list
         """
-        import requests
         import os
         import csv
         import re
         from util.call_url_util import CallUrlUtil
 
         success_data_list = []
-        for collect_data_dict in collect_data_list:
-            th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_dict['th_data_clct_mastr_log'])
-            tn_data_bsc_info = TnDataBscInfo(**collect_data_dict['tn_data_bsc_info'])
-            tn_clct_file_info = TnClctFileInfo(**collect_data_dict['tn_clct_file_info'])
-            log_full_file_path = collect_data_dict['log_full_file_path']
-            root_collect_file_path = kwargs['var']['value'].root_collect_file_path
-
-            dtst_cd = th_data_clct_mastr_log.dtst_cd.lower()
-            link_se_cd = tn_data_bsc_info.link_se_cd.lower()
-            pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
-            pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
-            base_url = return_url = tn_data_bsc_info.link_data_clct_url
-
-            # 파라미터 및 파라미터 길이 설정
-            data_interval_start = kwargs['data_interval_start'].in_timezone("Asia/Seoul").set(day=1)  # 처리 데이터의 시작 날짜 (데이터 기준 시점)
-            data_interval_end = kwargs['data_interval_end'].in_timezone("Asia/Seoul")  # 실제 실행하는 날짜를 KST 로 설정
-            params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
-
-            repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
-            page_no = 1  # 현재 페이지
+        with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+            for collect_data_dict in collect_data_list:
+                th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_dict['th_data_clct_mastr_log'])
+                tn_data_bsc_info = TnDataBscInfo(**collect_data_dict['tn_data_bsc_info'])
+                tn_clct_file_info = TnClctFileInfo(**collect_data_dict['tn_clct_file_info'])
+                log_full_file_path = collect_data_dict['log_full_file_path']
+                root_collect_file_path = kwargs['var']['value'].root_collect_file_path
+
+                dtst_cd = th_data_clct_mastr_log.dtst_cd.lower()
+                link_se_cd = tn_data_bsc_info.link_se_cd.lower()
+                pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
+                http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # 제공처별 http 연결 설정
+                pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
+                base_url = return_url = tn_data_bsc_info.link_data_clct_url
+
+                # 파라미터 및 파라미터 길이 설정
+                data_interval_start = kwargs['data_interval_start'].in_timezone("Asia/Seoul").set(day=1)  # 처리 데이터의 시작 날짜 (데이터 기준 시점)
+                data_interval_end = kwargs['data_interval_end'].in_timezone("Asia/Seoul")  # 실제 실행하는 날짜를 KST 로 설정
+                params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
+
+                repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
+                page_no = 1  # 현재 페이지
             
-            source_file_name = tn_clct_file_info.insd_file_nm + "." + tn_data_bsc_info.pvdr_sou_data_pvsn_stle  # 원천 파일명
-            full_file_path = root_collect_file_path + file_path
-            full_file_name = full_file_path + source_file_name
-            copy_file_name = full_file_path + tn_clct_file_info.insd_file_nm + "_xls_sample.csv"  # 미리보기 파일
-            file_size = 0  # 파일 사이즈
-
-            try:
-                # url 설정
-                # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
-                return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                source_file_name = tn_clct_file_info.insd_file_nm + "." + tn_data_bsc_info.pvdr_sou_data_pvsn_stle  # 원천 파일명
+                full_file_path = root_collect_file_path + file_path
+                full_file_name = full_file_path + source_file_name
+                copy_file_name = full_file_path + tn_clct_file_info.insd_file_nm + "_xls_sample.csv"  # 미리보기 파일
+                file_size = 0  # 파일 사이즈
+
+                try:
+                    # url 설정
+                    # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                    return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
                 
-                # url 호출
-                response = requests.get(return_url, verify= False)                    
-                response_code = response.status_code
-
-                # 기존 파일 존재 시 삭제
-                if os.path.exists(full_file_name):
-                    os.remove(full_file_name)
-                logging.info(f"호출 url: {return_url}")
-
-                if response_code == 200:
-                    with open(full_file_name, "wb") as file:
-                        file.write(response.content)
+                    # url 호출
+                    response = CallUrlUtil.request_url(return_url, http_config)                    
+                    response_code = response.status_code
+
+                    # 기존 파일 존재 시 삭제
+                    if os.path.exists(full_file_name):
+                        os.remove(full_file_name)
+                    logging.info(f"호출 url: {return_url}")
+
+                    if response_code == 200:
+                        with open(full_file_name, "wb") as file:
+                            file.write(response.content)
                     
-                    # 미리보기 파일 생성
-                        with open(copy_file_name, 'w', newline='\n', encoding='utf-8-sig') as csvfile:
-                            csv_writer = csv.writer(csvfile, delimiter=tn_data_bsc_info.link_file_sprtr)
-                            content_str = response.content.decode('utf-8')
-                            clean_data = content_str.replace('\t', '').replace('\n', '').replace('\r', '').replace("\r\n"," ")
-
-                            # 헤더, 데이터 파싱
-                            pattern = r'(<Row ss:AutoFitHeight="0" ss:Height="12">)|<Data ss:Type=".*?">(.*?)</Data>'
-                            matches = re.findall(pattern, clean_data)
-
-                            row_data = []
-                            for match in matches:
-                                # 행 구분
-                                if match[0].startswith('<Row ss:AutoFitHeight="0" ss:Height="12">'):
-                                    if row_data:  # 한 줄씩 쓰기
-                                        csv_writer.writerow(row_data)
-                                    row_data = []  # 새로운 행
-                                # 열 데이터 추가
-                                else:
-                                    row_data.append(match[1])
-
-                            # 마지막 행 데이터 쓰기
-                            if row_data:
-                                csv_writer.writerow(row_data)
-
-                        logging.info(f"미리보기 파일 생성::: {copy_file_name}")
-
-                else:
-                    logging.info(f"call_url response_code::: {response_code}")
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-
-                # 파일 사이즈 확인
-                if os.path.exists(full_file_name):
-                    file_size = os.path.getsize(full_file_name)
-                logging.info(f"call_url file_name::: {source_file_name}, file_size::: {file_size}")
-
-                if file_size == 0:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-                else:
-                    # tn_clct_file_info 수집파일정보
-                    tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
-
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
-                    success_data_list.append({
-                        "tn_data_bsc_info" : tn_data_bsc_info.as_dict()
-                        , "th_data_clct_mastr_log": th_data_clct_mastr_log.as_dict()
-                        , "tn_clct_file_info": tn_clct_file_info.as_dict()
-                        , "log_full_file_path" : log_full_file_path
-                        })
-                    CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
-            except Exception as e:
-                logging.info(f"call_url Exception::: {e}")
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-        return success_data_list
+                        # 미리보기 파일 생성
+                            with open(copy_file_name, 'w', newline='\n', encoding='utf-8-sig') as csvfile:
+                                csv_writer = csv.writer(csvfile, delimiter=tn_data_bsc_info.link_file_sprtr)
+                                content_str = response.content.decode('utf-8')
+                                clean_data = content_str.replace('\t', '').replace('\n', '').replace('\r', '').replace("\r\n"," ")
+
+                                # 헤더, 데이터 파싱
+                                pattern = r'(<Row ss:AutoFitHeight="0" ss:Height="12">)|<Data ss:Type=".*?">(.*?)</Data>'
+                                matches = re.findall(pattern, clean_data)
+
+                                row_data = []
+                                for match in matches:
+                                    # 행 구분
+                                    if match[0].startswith('<Row ss:AutoFitHeight="0" ss:Height="12">'):
+                                        if row_data:  # 한 줄씩 쓰기
+                                            csv_writer.writerow(row_data)
+                                        row_data = []  # 새로운 행
+                                    # 열 데이터 추가
+                                    else:
+                                        row_data.append(match[1])
+
+                                # 마지막 행 데이터 쓰기
+                                if row_data:
+                                    csv_writer.writerow(row_data)
+
+                            logging.info(f"미리보기 파일 생성::: {copy_file_name}")
+
+                    else:
+                        logging.info(f"call_url response_code::: {response_code}")
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+
+                    # 파일 사이즈 확인
+                    if os.path.exists(full_file_name):
+                        file_size = os.path.getsize(full_file_name)
+                    logging.info(f"call_url file_name::: {source_file_name}, file_size::: {file_size}")
+
+                    if file_size == 0:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+                    else:
+                        # tn_clct_file_info 수집파일정보
+                        tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
+
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
+                        success_data_list.append({
+                            "tn_data_bsc_info" : tn_data_bsc_info.as_dict()
+                            , "th_data_clct_mastr_log": th_data_clct_mastr_log.as_dict()
+                            , "tn_clct_file_info": tn_clct_file_info.as_dict()
+                            , "log_full_file_path" : log_full_file_path
+                            })
+                        CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
+                except Exception as e:
+                    logging.info(f"call_url Exception::: {e}")
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+            return success_data_list
     
     @task
     def encrypt_zip_file(success_data_list, file_path, **kwargs):
@@ -227,7 +228,8 @@ def api_to_download_kosis():
             root_collect_file_path = kwargs['var']['value'].root_collect_file_path
             full_file_path = root_collect_file_path + file_path
 
-            FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle)
+            zip_codec = FileUtil.get_zip_codec(kwargs, tn_data_bsc_info.pvdr_site_cd)  # 압축 코덱 (pvdr_site_cd 별)
+            FileUtil.zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle, zip_codec)
             encrypt_file = FileUtil.encrypt_file(full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle)
         except Exception as e:
             for collect_data_dict in success_data_list:
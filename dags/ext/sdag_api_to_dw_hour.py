@@ -3,7 +3,7 @@ import urllib3
 
 from pendulum import datetime, now
 from airflow.decorators import dag, task, task_group
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
@@ -85,11 +85,9 @@ def api_to_dw_hour():
             params: tn_data_bsc_info, th_data_clct_mastr_log, tn_clct_file_info, file_path
             return: file_size
             """
-            import requests
             import os
-            import time
             from xml_to_dict import XMLtoDict
-            from util.call_url_util import CallUrlUtil
+            from util.call_url_util import CallUrlUtil, RetryPolicy
             from util.date_custom_util import DateUtil
 
             th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_list['th_data_clct_mastr_log'])
@@ -100,6 +98,7 @@ def api_to_dw_hour():
             dtst_cd = th_data_clct_mastr_log.dtst_cd.lower()
             link_se_cd = tn_data_bsc_info.link_se_cd.lower()
             pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
+            http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # 제공처별 http 연결 설정
             pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
             base_url = return_url = tn_data_bsc_info.link_data_clct_url
 
@@ -109,160 +108,161 @@ def api_to_dw_hour():
             params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
 
             retry_num = 0  # 데이터 없을 시 재시도 횟수
+            retry_policy = RetryPolicy(http_config, no_data = {"base_delay" : 120, "max_delay" : 120, "jitter" : False})  # 재시도 정책 (지수 백오프, 데이터 미생성 시 제공처 데이터 생성 대기로 120초 고정 대기)
             repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
             page_no = 1  # 현재 페이지
             total_page = 1  # 총 페이지 수
             header = False
             mode = "w"  # 파일 쓰기 모드 overwrite
             
-            try:
-                # 파라미터 길이만큼 반복 호출
-                while repeat_num <= params_len:
+            with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+                try:
+                    # 파라미터 길이만큼 반복 호출
+                    while repeat_num <= params_len:
                     
-                    # 총 페이지 수만큼 반복 호출
-                    while page_no <= total_page:
-                        
-                        # 파라미터 길이만큼 호출 시 while 종료
-                        if repeat_num > params_len:
-                            break
+                        # 총 페이지 수만큼 반복 호출
+                        while page_no <= total_page:
                         
-                        # 재시도 5회 이상 시
-                        if retry_num >= 5:
-                            # 파라미터 길이 == 1) whlie 종료
-                            if params_len == 1:
-                                repeat_num += 1
+                            # 파라미터 길이만큼 호출 시 while 종료
+                            if repeat_num > params_len:
                                 break
-                            else:  # 파라미터 길이 != 1)
-                                # 총 페이지 수만큼 덜 돌았을 때
-                                if page_no < total_page:  # 다음 페이지 호출
-                                    retry_num = 0
-                                    page_no += 1
-                                    continue
-                                # 총 페이지 수만큼 다 돌고
-                                elif page_no == total_page:
-                                    # 파라미터 길이만큼 덜 돌았을 때
-                                    if repeat_num < params_len:
+                        
+                            # 재시도 5회 이상 시
+                            if retry_num >= retry_policy.max_retries:
+                                # 파라미터 길이 == 1) whlie 종료
+                                if params_len == 1:
+                                    repeat_num += 1
+                                    break
+                                else:  # 파라미터 길이 != 1)
+                                    # 총 페이지 수만큼 덜 돌았을 때
+                                    if page_no < total_page:  # 다음 페이지 호출
                                         retry_num = 0
-                                        page_no = 1
-                                        repeat_num += 1
+                                        page_no += 1
                                         continue
-                                    # 파라미터 길이만큼 다 돌았을 때
-                                    else:
-                                        repeat_num += 1
-                                        break
+                                    # 총 페이지 수만큼 다 돌고
+                                    elif page_no == total_page:
+                                        # 파라미터 길이만큼 덜 돌았을 때
+                                        if repeat_num < params_len:
+                                            retry_num = 0
+                                            page_no = 1
+                                            repeat_num += 1
+                                            continue
+                                        # 파라미터 길이만큼 다 돌았을 때
+                                        else:
+                                            repeat_num += 1
+                                            break
 
-                        # url 설정
-                        # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
-                        return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                            # url 설정
+                            # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                            return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
                         
-                        # url 호출
-                        response = requests.get(return_url, verify= False)
-                        response_code = response.status_code
+                            # url 호출
+                            response = CallUrlUtil.request_url(return_url, http_config)
+                            response_code = response.status_code
 
-                        # url 호출 시 메세지 설정
-                        header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, None, header, mode)
+                            # url 호출 시 메세지 설정
+                            header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, None, header, mode)
 
-                        if response_code == 200:
-                            logging.info(f"Status Code: {response_code}")
-                            logging.info(f"Raw Response Text: {response.text[:500]}")  # 너무 길면 앞부분만
+                            if response_code == 200:
+                                logging.info(f"Status Code: {response_code}")
+                                logging.info(f"Raw Response Text: {response.text[:500]}")  # 너무 길면 앞부분만
                             
-                            if 'NO_DATA' not in response.text:
-                                try:
-                                    if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json":
-                                        json_data = response.json()
-                                        logging.info("JSON 파싱 성공")
-                                    else:  # xml
-                                        json_data = XMLtoDict().parse(response.text)
-                                        logging.info("XML 파싱 성공")
-                                except Exception as e:
-                                    logging.error(f"파싱 에러 발생: {str(e)}")
-                                    raise e
-                        # if response_code == 200 and 'NO_DATA' not in response.text:
-                        #     if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json":
-                        #         json_data = response.json()
-                        #     else:  # xml
-                        #         json_data = XMLtoDict().parse(response.text) 
+                                if 'NO_DATA' not in response.text:
+                                    try:
+                                        if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json":
+                                            json_data = response.json()
+                                            logging.info("JSON 파싱 성공")
+                                        else:  # xml
+                                            json_data = XMLtoDict().parse(response.text)
+                                            logging.info("XML 파싱 성공")
+                                    except Exception as e:
+                                        logging.error(f"파싱 에러 발생: {str(e)}")
+                                        raise e
+                            # if response_code == 200 and 'NO_DATA' not in response.text:
+                            #     if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json":
+                            #         json_data = response.json()
+                            #     else:  # xml
+                            #         json_data = XMLtoDict().parse(response.text) 
 
-                            result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
-                            result_json = result['result_json_array']
-                            result_size = len(result_json)
+                                result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
+                                result_json = result['result_json_array']
+                                result_size = len(result_json)
                             
-                            # 데이터 존재 시
-                            if result_size != 0:
-                                retry_num = 0  # 재시도 횟수 초기화
-                                if page_no == 1: # 첫 페이지일 때
-                                    # 페이징 계산
-                                    total_count = int(result['total_count'])
-                                    total_page = CallUrlUtil.get_total_page(total_count, result_size)
+                                # 데이터 존재 시
+                                if result_size != 0:
+                                    retry_num = 0  # 재시도 횟수 초기화
+                                    if page_no == 1: # 첫 페이지일 때
+                                        # 페이징 계산
+                                        total_count = int(result['total_count'])
+                                        total_page = CallUrlUtil.get_total_page(total_count, result_size)
 
-                                with session.begin() as conn:
-                                    # DB 적재
-                                    bulk_data = [
-                                        {
-                                            'baseDate': result['baseDate'],
-                                            'baseTime': result['baseTime'],
-                                            'category': result['category'],
-                                            'nx': result['nx'],
-                                            'ny': result['ny'],
-                                            'obsrvalue': result['obsrValue'],
-                                            'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
-                                            'clct_pnttm': DateUtil.get_ymdhm(),
-                                            'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
-                                            'page_no': page_no
-                                        } for result in result_json
-                                    ]
-                                    columns = ', '.join(bulk_data[0].keys())
-                                    values = ', '.join([
-                                        f"({', '.join(map(lambda x: format_value(x) if x is not None else 'Null', row.values()))})"
-                                        for row in bulk_data
-                                    ])
-                                    delete_stmt = f'''
+                                    with session.begin() as conn:
+                                        # DB 적재
+                                        bulk_data = [
+                                            {
+                                                'baseDate': result['baseDate'],
+                                                'baseTime': result['baseTime'],
+                                                'category': result['category'],
+                                                'nx': result['nx'],
+                                                'ny': result['ny'],
+                                                'obsrvalue': result['obsrValue'],
+                                                'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
+                                                'clct_pnttm': DateUtil.get_ymdhm(),
+                                                'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
+                                                'page_no': page_no
+                                            } for result in result_json
+                                        ]
+                                        columns = ', '.join(bulk_data[0].keys())
+                                        values = ', '.join([
+                                            f"({', '.join(map(lambda x: format_value(x) if x is not None else 'Null', row.values()))})"
+                                            for row in bulk_data
+                                        ])
+                                        delete_stmt = f'''
                                         TRUNCATE TABLE {tn_data_bsc_info.dw_tbl_phys_nm};
                                     '''
-                                    conn.execute(delete_stmt)
-                                    insert_stmt = f'''
+                                        conn.execute(delete_stmt)
+                                        insert_stmt = f'''
                                         INSERT INTO {tn_data_bsc_info.dw_tbl_phys_nm} ({columns}) VALUES {values};
                                     '''
-                                    conn.execute(insert_stmt)
+                                        conn.execute(insert_stmt)
 
-                            # 총 페이지 수 == 1)
-                            if total_page == 1:
-                                repeat_num += 1
-                                break
-                            else:
-                                if page_no < total_page:
-                                    page_no += 1
-                                elif page_no == total_page:
-                                    if params_len == 1:
-                                        repeat_num += 1
-                                        break
-                                    elif params_len != 1:
-                                        if repeat_num < params_len:
-                                            page_no = 1
+                                # 총 페이지 수 == 1)
+                                if total_page == 1:
+                                    repeat_num += 1
+                                    break
+                                else:
+                                    if page_no < total_page:
+                                        page_no += 1
+                                    elif page_no == total_page:
+                                        if params_len == 1:
                                             repeat_num += 1
-                                        else: repeat_num += 1
-                                        break
+                                            break
+                                        elif params_len != 1:
+                                            if repeat_num < params_len:
+                                                page_no = 1
+                                                repeat_num += 1
+                                            else: repeat_num += 1
+                                            break
 
-                        else:
-                            logging.info(f"call_url resultmsg::: NO_DATA")
-                            retry_num += 1
-                            time.sleep(120)
-                            continue
+                            else:
+                                logging.info(f"call_url resultmsg::: NO_DATA")
+                                retry_num = retry_policy.wait(retry_num, response, "no_data")
+                                continue
 
-                if retry_num >= 5:
-                    logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                    if now().strftime("%H") == "23":  # 마지막 로그 URL호출 및 CSV생성 실패여도 DW 적재 성공 처리
-                        CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_DW_LDADNG, CONST.STTS_COMP, CONST.MSG_DW_LDADNG_COMP, "n")
-                    raise AirflowSkipException()
-                else:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
-            except AirflowSkipException as e:
-                raise e
-            except Exception as e:
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                logging.info(f"call_url Exception::: {e}")
-                raise e
+                    if retry_num >= retry_policy.max_retries:
+                        logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                        if now().strftime("%H") == "23":  # 마지막 로그 URL호출 및 CSV생성 실패여도 DW 적재 성공 처리
+                            log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_DW_LDADNG, CONST.STTS_COMP, CONST.MSG_DW_LDADNG_COMP, "n")
+                        raise AirflowSkipException()
+                    else:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
+                except AirflowSkipException as e:
+                    raise e
+                except Exception as e:
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                    logging.info(f"call_url Exception::: {e}")
+                    raise e
             
         @task
         def check_loading_result(collect_data_list):
@@ -10,7 +10,7 @@ from sqlalchemy.orm import sessionmaker
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
 from util.file_util import FileUtil
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from dto.tc_com_dtl_cd import TcCmmnDtlCd as CONST
 
 from util.date_custom_util import DateUtil
@@ -88,10 +88,8 @@ def api_dw_month_data_1st():
             params: tdm_list_url_info, tdm_file_url_info, tdm_standard_url_info, th_data_clct_mastr_log, tn_clct_file_info, file_path
             return: file_size
             """
-            import requests
             import os
-            import time
-            from util.call_url_util import CallUrlUtil
+            from util.call_url_util import CallUrlUtil, CsvSink, RetryPolicy
             from xml_to_dict import XMLtoDict
 
             tn_data_bsc_info = TnDataBscInfo(**collect_data_list['tn_data_bsc_info'])
@@ -106,6 +104,7 @@ def api_dw_month_data_1st():
             link_se_cd = tn_data_bsc_info.link_se_cd.lower()
             root_collect_file_path = kwargs['var']['value'].root_collect_file_path
             pvdr_site_cd = tn_data_bsc_info.pvdr_site_cd.lower()
+            http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # 제공처별 http 연결 설정
             pvdr_inst_cd = tn_data_bsc_info.pvdr_inst_cd.lower()
             base_url = return_url = tn_data_bsc_info.link_data_clct_url
 
@@ -115,6 +114,7 @@ def api_dw_month_data_1st():
             params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
 
             retry_num = 0  # 데이터 없을 시 재시도 횟수
+            retry_policy = RetryPolicy(http_config)  # 재시도 정책 (지수 백오프)
             repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
             page_no = 1  # 현재 페이지
             total_page = 1  # 총 페이지 수
@@ -140,305 +140,302 @@ def api_dw_month_data_1st():
             link_file_sprtr = tn_data_bsc_info.link_file_sprtr
             file_size = 0  # 파일 사이즈
             row_count = 0  # 행 개수
+            csv_sink = CsvSink(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name)  # 페이지 단위 csv 파일 생성
 
-            try:
-                # 테이블 적재 전에 TRUNCATE 시키기
-                # with session.begin() as conn:
-                #     delete_stmt = f'TRUNCATE TABLE {table_name};'
-                #     conn.execute(delete_stmt)
+            with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+                try:
+                    # 테이블 적재 전에 TRUNCATE 시키기
+                    # with session.begin() as conn:
+                    #     delete_stmt = f'TRUNCATE TABLE {table_name};'
+                    #     conn.execute(delete_stmt)
 
-                # 파라미터 길이만큼 반복 호출
-                while repeat_num <= params_len:
+                    # 파라미터 길이만큼 반복 호출
+                    while repeat_num <= params_len:
                     
-                    # 총 페이지 수만큼 반복 호출
-                    while page_no <= total_page:
+                        # 총 페이지 수만큼 반복 호출
+                        while page_no <= total_page:
                         
-                        # 파라미터 길이만큼 호출 시 while 종료
-                        if repeat_num > params_len:
-                            break
-                    
-                        # 재시도 5회 이상 시
-                        if retry_num >= 5:
-                            # 파라미터 길이 == 1) whlie 종료
-                            if params_len == 1:
-                                repeat_num += 1
+                            # 파라미터 길이만큼 호출 시 while 종료
+                            if repeat_num > params_len:
                                 break
-                            else:  # 파라미터 길이 != 1)
-                                # th_data_clct_contact_fail_hstry_log 에 입력
-                                CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
-                                # 총 페이지 수만큼 덜 돌았을 때
-                                if page_no < total_page:  # 다음 페이지 호출
-                                    retry_num = 0
-                                    page_no += 1
-                                    continue
-                                # 총 페이지 수만큼 다 돌고
-                                elif page_no == total_page:
-                                    # 파라미터 길이만큼 덜 돌았을 때
-                                    if repeat_num < params_len:
+                    
+                            # 재시도 5회 이상 시
+                            if retry_num >= retry_policy.max_retries:
+                                # 파라미터 길이 == 1) whlie 종료
+                                if params_len == 1:
+                                    repeat_num += 1
+                                    break
+                                else:  # 파라미터 길이 != 1)
+                                    # th_data_clct_contact_fail_hstry_log 에 입력
+                                    CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
+                                    # 총 페이지 수만큼 덜 돌았을 때
+                                    if page_no < total_page:  # 다음 페이지 호출
                                         retry_num = 0
-                                        page_no = 1
-                                        repeat_num += 1
+                                        page_no += 1
                                         continue
-                                    # 파라미터 길이만큼 다 돌았을 때
-                                    else:
-                                        repeat_num += 1
-                                        break
-                        # url 설정
-                        return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
-                        # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
-
-                        # url 호출
-                        response = requests.get(return_url, verify= False)
-                        response_code = response.status_code        
-
-                        # url 호출 시 메세지 설정
-                        header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, full_file_name, header, mode)
-
-                        # response = requests.get(base_url, verify=False)
-                        # if response_code == 200 and 'NO_DATA' not in response.text:
-                        if response_code == 200:
-                            if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json" and 'OpenAPI_ServiceResponse' not in response.text and '제공 가능한 데이터가 없습니다' not in response.text:  # 공공데이터포털 - HTTP 에러 제외
-                                json_data = response.json()
-                            if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "xml" or 'OpenAPI_ServiceResponse' in response.text or '제공 가능한 데이터가 없습니다' in response.text:  # 공공데이터포털, 지역별 독서량_독서율(20240411 이후 변경) - HTTP 에러 시 xml 형태
-                                json_data = XMLtoDict().parse(response.text)
-                            # print("response_code!!!!!!", response_code)
-                            # json_data = response.json()
+                                    # 총 페이지 수만큼 다 돌고
+                                    elif page_no == total_page:
+                                        # 파라미터 길이만큼 덜 돌았을 때
+                                        if repeat_num < params_len:
+                                            retry_num = 0
+                                            page_no = 1
+                                            repeat_num += 1
+                                            continue
+                                        # 파라미터 길이만큼 다 돌았을 때
+                                        else:
+                                            repeat_num += 1
+                                            break
+                            # url 설정
+                            return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, link_se_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+                            # return_url = f"{base_url}{CallUrlUtil.set_url(dtst_cd, pvdr_site_cd, pvdr_inst_cd, params_dict, repeat_num, page_no)}"
+
+                            # url 호출
+                            response = CallUrlUtil.request_url(return_url, http_config)
+                            response_code = response.status_code        
+
+                            # url 호출 시 메세지 설정
+                            header, mode = CallUrlUtil.get_request_message(retry_num, repeat_num, page_no, return_url, total_page, full_file_name, header, mode)
+
+                            # response = requests.get(base_url, verify=False)
+                            # if response_code == 200 and 'NO_DATA' not in response.text:
+                            if response_code == 200:
+                                if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "json" and 'OpenAPI_ServiceResponse' not in response.text and '제공 가능한 데이터가 없습니다' not in response.text:  # 공공데이터포털 - HTTP 에러 제외
+                                    json_data = response.json()
+                                if tn_data_bsc_info.pvdr_sou_data_pvsn_stle == "xml" or 'OpenAPI_ServiceResponse' in response.text or '제공 가능한 데이터가 없습니다' in response.text:  # 공공데이터포털, 지역별 독서량_독서율(20240411 이후 변경) - HTTP 에러 시 xml 형태
+                                    json_data = XMLtoDict().parse(response.text)
+                                # print("response_code!!!!!!", response_code)
+                                # json_data = response.json()
                             
-                            #원천 파일 저장
-                            # json_file_name = os.path.join(full_file_path, f"{source_file_name}.json")
-                            # with open(json_file_name, 'w', encoding='utf-8') as f:
-                            #     f.write(response.text)
+                                #원천 파일 저장
+                                # json_file_name = os.path.join(full_file_path, f"{source_file_name}.json")
+                                # with open(json_file_name, 'w', encoding='utf-8') as f:
+                                #     f.write(response.text)
 
-                            CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
+                                CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
 
-                            # 공공데이터포털 - HTTP 에러 시
-                            if 'OpenAPI_ServiceResponse' in response.text:
-                                retry_num += 1
-                                continue
+                                # 공공데이터포털 - HTTP 에러 시
+                                if 'OpenAPI_ServiceResponse' in response.text:
+                                    retry_num = retry_policy.wait(retry_num, response, "service_error")
+                                    continue
 
-                            # json 읽어오기
-                            # result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
-                            # result = CallUrlUtil.read_json(json_data, dtst_cd)
-                            result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
-                            result_json = result['result_json_array']
-                            result_size = len(result_json)
-
-                            # 데이터 존재 시
-                            if result_size != 0:
-                                retry_num = 0  # 재시도 횟수 초기화
-                                if page_no == 1: # 첫 페이지일 때
-                                    # 페이징 계산
-                                    total_count = int(result['total_count'])
-                                    total_page = CallUrlUtil.get_total_page(total_count, result_size)
-
-                                row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                                if row_count == 0:
-                                    header = True
-                                    mode = "w"
-
-                                # csv 파일 생성
-                                CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no)
-
-                            row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                            if row_count != 0:
-                                logging.info(f"현재까지 파일 내 행 개수: {row_count}")
-
-                                data_crtr_pnttm = th_data_clct_mastr_log.data_crtr_pnttm
-                                link_file_sprtr = th_data_clct_mastr_log.link_file_sprtr
+                                # json 읽어오기
+                                # result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
+                                # result = CallUrlUtil.read_json(json_data, dtst_cd)
+                                result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
+                                result_json = result['result_json_array']
+                                result_size = len(result_json)
+
+                                # 데이터 존재 시
+                                if result_size != 0:
+                                    retry_num = 0  # 재시도 횟수 초기화
+                                    if page_no == 1: # 첫 페이지일 때
+                                        # 페이징 계산
+                                        total_count = int(result['total_count'])
+                                        total_page = CallUrlUtil.get_total_page(total_count, result_size)
+
+                                    # csv 파일 생성
+                                    csv_sink.write(result_json, page_no)
+
+                                row_count = csv_sink.row_count  # 행 개수 확인
+                                if row_count != 0:
+                                    logging.info(f"현재까지 파일 내 행 개수: {row_count}")
+
+                                    data_crtr_pnttm = th_data_clct_mastr_log.data_crtr_pnttm
+                                    link_file_sprtr = th_data_clct_mastr_log.link_file_sprtr
                                 
-                                # delete_table(tn_data_bsc_info, data_crtr_pnttm)
+                                    # delete_table(tn_data_bsc_info, data_crtr_pnttm)
 
-                                # DW 적재시 clct_sn 증가값
-                                clct_sn_counter = 1
+                                    # DW 적재시 clct_sn 증가값
+                                    clct_sn_counter = 1
                                 
-                                # 데이터셋 코드별 데이터 추출
-                                extracted_data = []
-                                for item in json_data.get('data', []):
-                                    if dtst_cd == 'data919':
-                                        extracted_data.append({
-                                            'clct_sn': clct_sn_counter , 
-                                            'category_cd': item.get('category_cd'), 
-                                            'category_nm': item.get('category_nm'), 
-                                            'collection_method': item.get('collection_method'), 
-                                            'created_at': item.get('created_at'), 
-                                            '"desc"': item.get('desc'), 
-                                            'download_cnt': item.get('download_cnt'), 
-                                            'ext': item.get('ext'), 
-                                            'id': item.get('id'), 
-                                            'is_deleted': item.get('is_deleted'), 
-                                            'is_requested_data': item.get('is_requested_data'), 
-                                            'keywords': item.get('keywords'), 
-                                            'list_type': item.get('list_type'), 
-                                            'new_category_cd': item.get('new_category_cd'), 
-                                            'new_category_nm': item.get('new_category_nm'), 
-                                            'org_cd': item.get('org_cd'), 
-                                            'org_nm': item.get('org_nm'), 
-                                            'ownership_grounds': item.get('ownership_grounds'), 
-                                            'page_url': item.get('page_url'), 
-                                            'providing_scope': item.get('providing_scope'), 
-                                            'register_status': item.get('register_status'), 
-                                            'title': item.get('title'), 
-                                            'updated_at': item.get('updated_at'), 
-                                            'view_cnt': item.get('view_cnt'), 
-                                            'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
-                                            'clct_pnttm': DateUtil.get_ymdhm(),
-                                            'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
-                                            'page_no': page_no
-                                            # 필요한 모든 필드를 추가
-                                        })
-                                        clct_sn_counter += 1
-
-                                    elif dtst_cd == 'data920':
-                                        extracted_data.append({
-                                            'clct_sn': clct_sn_counter , 
-                                            'core_data_nm': item.get('core_data_nm'),
-                                            'cost_unit': item.get('cost_unit'),
-                                            'created_at': item.get('created_at'),
-                                            'data_limit': item.get('data_limit'),
-                                            'data_type': item.get('data_type'),
-                                            'dept_nm': item.get('dept_nm'),
-                                            '"desc"': item.get('desc'),
-                                            'download_cnt': item.get('download_cnt'),
-                                            'etc': item.get('etc'),
-                                            'ext': item.get('ext'),
-                                            'id': item.get('id'),
-                                            'is_charged': item.get('is_charged'),
-                                            'is_copyrighted': item.get('is_copyrighted'),
-                                            'is_core_data': item.get('is_core_data'),
-                                            'is_deleted': item.get('is_deleted'),
-                                            'is_list_deleted': item.get('is_list_deleted'),
-                                            'is_std_data': item.get('is_std_data'),
-                                            'is_third_party_copyrighted': item.get('is_third_party_copyrighted'),
-                                            'keywords': item.get('keywords'),
-                                            'list_id': item.get('list_id'),
-                                            'list_title': item.get('list_title'),
-                                            'media_cnt': item.get('media_cnt'),
-                                            'media_type': item.get('media_type'),
-                                            'meta_url': item.get('meta_url'),
-                                            'new_category_cd': item.get('new_category_cd'),
-                                            'new_category_nm': item.get('new_category_nm'),
-                                            'next_registration_date': item.get('next_registration_date'),
-                                            'org_cd': item.get('org_cd'),
-                                            'org_nm': item.get('org_nm'),
-                                            'ownership_grounds': item.get('ownership_grounds'),
-                                            'regist_type': item.get('regist_type'),
-                                            'register_status': item.get('register_status'),
-                                            'share_scope_nm': item.get('share_scope_nm'),
-                                            'title': item.get('title'),
-                                            'update_cycle': item.get('update_cycle'),
-                                            'updated_at': item.get('updated_at'),
-                                            'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
-                                            'clct_pnttm': DateUtil.get_ymdhm(),
-                                            'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
-                                            'page_no': page_no
-                                            # 필요한 모든 필드를 추가
-                                        })
-                                        clct_sn_counter += 1
-                                    else:
-                                        extracted_data.append({
-                                            'clct_sn': clct_sn_counter ,
-                                            'category_cd': item.get('category_cd'),
-                                            'category_nm': item.get('category_nm'),
-                                            'collection_method': item.get('collection_method'),
-                                            'created_at': item.get('created_at'),
-                                            'dept_nm': item.get('dept_nm'),
-                                            '"desc"': item.get('desc'),
-                                            'id': item.get('id'),
-                                            'is_requested_data': item.get('is_requested_data'),
-                                            'keywords': item.get('keywords'),
-                                            'list_id': item.get('list_id'),
-                                            'list_title': item.get('list_title'),
-                                            'list_type': item.get('list_type'),
-                                            'new_category_cd': item.get('new_category_cd'),
-                                            'new_category_nm': item.get('new_category_nm'),
-                                            'next_registration_date': item.get('next_registration_date'),
-                                            'org_cd': item.get('org_cd'),
-                                            'org_nm': item.get('org_nm'),
-                                            'ownership_grounds': item.get('ownership_grounds'),
-                                            'providing_scope': item.get('providing_scope'),
-                                            'req_cnt': item.get('req_cnt'),
-                                            'title': item.get('title'),
-                                            'updated_dt': item.get('updated_dt'),
-                                            'updated_dt': item.get('updated_dt'),
-                                            'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
-                                            'clct_pnttm': DateUtil.get_ymdhm(),
-                                            'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
-                                            'page_no': page_no
-                                        })
-                                        clct_sn_counter += 1
-
-                                with session.begin() as conn:
-                                    for row in extracted_data:
-                                        columns = ', '.join(row.keys())
-                                        # values = ', '.join([f"'{v}'" for v in row.values()])
-                                        values = ', '.join([f"'{v}'" if v is not None else 'NULL' for v in row.values()])
-                                        insert_stmt = f'''
+                                    # 데이터셋 코드별 데이터 추출
+                                    extracted_data = []
+                                    for item in json_data.get('data', []):
+                                        if dtst_cd == 'data919':
+                                            extracted_data.append({
+                                                'clct_sn': clct_sn_counter , 
+                                                'category_cd': item.get('category_cd'), 
+                                                'category_nm': item.get('category_nm'), 
+                                                'collection_method': item.get('collection_method'), 
+                                                'created_at': item.get('created_at'), 
+                                                '"desc"': item.get('desc'), 
+                                                'download_cnt': item.get('download_cnt'), 
+                                                'ext': item.get('ext'), 
+                                                'id': item.get('id'), 
+                                                'is_deleted': item.get('is_deleted'), 
+                                                'is_requested_data': item.get('is_requested_data'), 
+                                                'keywords': item.get('keywords'), 
+                                                'list_type': item.get('list_type'), 
+                                                'new_category_cd': item.get('new_category_cd'), 
+                                                'new_category_nm': item.get('new_category_nm'), 
+                                                'org_cd': item.get('org_cd'), 
+                                                'org_nm': item.get('org_nm'), 
+                                                'ownership_grounds': item.get('ownership_grounds'), 
+                                                'page_url': item.get('page_url'), 
+                                                'providing_scope': item.get('providing_scope'), 
+                                                'register_status': item.get('register_status'), 
+                                                'title': item.get('title'), 
+                                                'updated_at': item.get('updated_at'), 
+                                                'view_cnt': item.get('view_cnt'), 
+                                                'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
+                                                'clct_pnttm': DateUtil.get_ymdhm(),
+                                                'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
+                                                'page_no': page_no
+                                                # 필요한 모든 필드를 추가
+                                            })
+                                            clct_sn_counter += 1
+
+                                        elif dtst_cd == 'data920':
+                                            extracted_data.append({
+                                                'clct_sn': clct_sn_counter , 
+                                                'core_data_nm': item.get('core_data_nm'),
+                                                'cost_unit': item.get('cost_unit'),
+                                                'created_at': item.get('created_at'),
+                                                'data_limit': item.get('data_limit'),
+                                                'data_type': item.get('data_type'),
+                                                'dept_nm': item.get('dept_nm'),
+                                                '"desc"': item.get('desc'),
+                                                'download_cnt': item.get('download_cnt'),
+                                                'etc': item.get('etc'),
+                                                'ext': item.get('ext'),
+                                                'id': item.get('id'),
+                                                'is_charged': item.get('is_charged'),
+                                                'is_copyrighted': item.get('is_copyrighted'),
+                                                'is_core_data': item.get('is_core_data'),
+                                                'is_deleted': item.get('is_deleted'),
+                                                'is_list_deleted': item.get('is_list_deleted'),
+                                                'is_std_data': item.get('is_std_data'),
+                                                'is_third_party_copyrighted': item.get('is_third_party_copyrighted'),
+                                                'keywords': item.get('keywords'),
+                                                'list_id': item.get('list_id'),
+                                                'list_title': item.get('list_title'),
+                                                'media_cnt': item.get('media_cnt'),
+                                                'media_type': item.get('media_type'),
+                                                'meta_url': item.get('meta_url'),
+                                                'new_category_cd': item.get('new_category_cd'),
+                                                'new_category_nm': item.get('new_category_nm'),
+                                                'next_registration_date': item.get('next_registration_date'),
+                                                'org_cd': item.get('org_cd'),
+                                                'org_nm': item.get('org_nm'),
+                                                'ownership_grounds': item.get('ownership_grounds'),
+                                                'regist_type': item.get('regist_type'),
+                                                'register_status': item.get('register_status'),
+                                                'share_scope_nm': item.get('share_scope_nm'),
+                                                'title': item.get('title'),
+                                                'update_cycle': item.get('update_cycle'),
+                                                'updated_at': item.get('updated_at'),
+                                                'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
+                                                'clct_pnttm': DateUtil.get_ymdhm(),
+                                                'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
+                                                'page_no': page_no
+                                                # 필요한 모든 필드를 추가
+                                            })
+                                            clct_sn_counter += 1
+                                        else:
+                                            extracted_data.append({
+                                                'clct_sn': clct_sn_counter ,
+                                                'category_cd': item.get('category_cd'),
+                                                'category_nm': item.get('category_nm'),
+                                                'collection_method': item.get('collection_method'),
+                                                'created_at': item.get('created_at'),
+                                                'dept_nm': item.get('dept_nm'),
+                                                '"desc"': item.get('desc'),
+                                                'id': item.get('id'),
+                                                'is_requested_data': item.get('is_requested_data'),
+                                                'keywords': item.get('keywords'),
+                                                'list_id': item.get('list_id'),
+                                                'list_title': item.get('list_title'),
+                                                'list_type': item.get('list_type'),
+                                                'new_category_cd': item.get('new_category_cd'),
+                                                'new_category_nm': item.get('new_category_nm'),
+                                                'next_registration_date': item.get('next_registration_date'),
+                                                'org_cd': item.get('org_cd'),
+                                                'org_nm': item.get('org_nm'),
+                                                'ownership_grounds': item.get('ownership_grounds'),
+                                                'providing_scope': item.get('providing_scope'),
+                                                'req_cnt': item.get('req_cnt'),
+                                                'title': item.get('title'),
+                                                'updated_dt': item.get('updated_dt'),
+                                                'updated_dt': item.get('updated_dt'),
+                                                'data_crtr_pnttm': th_data_clct_mastr_log.data_crtr_pnttm,
+                                                'clct_pnttm': DateUtil.get_ymdhm(),
+                                                'clct_log_sn': th_data_clct_mastr_log.clct_log_sn,
+                                                'page_no': page_no
+                                            })
+                                            clct_sn_counter += 1
+
+                                    with session.begin() as conn:
+                                        for row in extracted_data:
+                                            columns = ', '.join(row.keys())
+                                            # values = ', '.join([f"'{v}'" for v in row.values()])
+                                            values = ', '.join([f"'{v}'" if v is not None else 'NULL' for v in row.values()])
+                                            insert_stmt = f'''
                                             INSERT INTO {table_name} ({columns}) VALUES ({values});
                                         '''
-                                        conn.execute(insert_stmt)
+                                            conn.execute(insert_stmt)
 
-                                # row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                                # if row_count == 0:
-                                #     header = True
-                                #     mode = "w"
+                                    # row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
+                                    # if row_count == 0:
+                                    #     header = True
+                                    #     mode = "w"
 
-                                # # csv 파일 생성
-                                # CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no)
+                                    # # csv 파일 생성
+                                    # CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no)
                         
-                            # row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                            # if row_count != 0:
-                            #     logging.info(f"현재까지 파일 내 행 개수: {row_count}")
-                            # page_no += 1
-
-
-                            # 총 페이지 수 == 1)
-                            if total_page == 1:
-                                repeat_num += 1
-                                break
-                            else:
-                                if page_no < total_page:
-                                    page_no += 1
-                                elif page_no == total_page:
-                                    if params_len == 1:
-                                        repeat_num += 1
-                                        break
-                                    elif params_len != 1:
-                                        if repeat_num < params_len:
-                                            page_no = 1
+                                # row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
+                                # if row_count != 0:
+                                #     logging.info(f"현재까지 파일 내 행 개수: {row_count}")
+                                # page_no += 1
+
+
+                                # 총 페이지 수 == 1)
+                                if total_page == 1:
+                                    repeat_num += 1
+                                    break
+                                else:
+                                    if page_no < total_page:
+                                        page_no += 1
+                                    elif page_no == total_page:
+                                        if params_len == 1:
                                             repeat_num += 1
-                                        else: repeat_num += 1
-                                        break
-                        else:
-                            logging.info(f"call_url_process resultmsg::: NO_DATA")
-                            retry_num += 1
-                            continue
-                # 파일 사이즈 확인
-                if os.path.exists(full_file_name):
-                    file_size = os.path.getsize(full_file_name)
-                logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
-
-                # 실패 로그 개수 확인
-                fail_count = CallUrlUtil.get_fail_data_count(th_data_clct_mastr_log.clct_log_sn, session)
+                                            break
+                                        elif params_len != 1:
+                                            if repeat_num < params_len:
+                                                page_no = 1
+                                                repeat_num += 1
+                                            else: repeat_num += 1
+                                            break
+                            else:
+                                logging.info(f"call_url_process resultmsg::: NO_DATA")
+                                retry_num = retry_policy.wait(retry_num, response)
+                                continue
+                    # 파일 사이즈 확인
+                    if os.path.exists(full_file_name):
+                        file_size = os.path.getsize(full_file_name)
+                    logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
+
+                    # 실패 로그 개수 확인
+                    fail_count = CallUrlUtil.get_fail_data_count(th_data_clct_mastr_log.clct_log_sn, session)
                 
-                if row_count == 0 and fail_count == 0 and retry_num < 5:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-                    raise AirflowSkipException()
-                elif fail_count != 0 or retry_num >= 5:
-                    logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                    raise AirflowSkipException()
-                else:
-                    # tn_clct_file_info 수집파일정보
-                    tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
-                    if link_file_crt_yn == "y":
-                        CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
-            except AirflowSkipException as e:
-                raise e
-            except Exception as e:
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                logging.info(f"call_url Exception::: {e}")
-                raise e
+                    if row_count == 0 and fail_count == 0 and retry_num < retry_policy.max_retries:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+                        raise AirflowSkipException()
+                    elif fail_count != 0 or retry_num >= retry_policy.max_retries:
+                        logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                        raise AirflowSkipException()
+                    else:
+                        # tn_clct_file_info 수집파일정보
+                        tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
+                        if link_file_crt_yn == "y":
+                            CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
+                except AirflowSkipException as e:
+                    raise e
+                except Exception as e:
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                    logging.info(f"call_url Exception::: {e}")
+                    raise e
 
 
         @task(trigger_rule='all_done')
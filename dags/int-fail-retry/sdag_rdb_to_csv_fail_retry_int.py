@@ -3,7 +3,7 @@ import logging
 from datetime import datetime as dt
 from pendulum import datetime, from_format
 from airflow.decorators import dag, task, task_group
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
@@ -147,9 +147,9 @@ def rdb_to_csv_fail_retry():
             params: tn_data_bsc_info, th_data_clct_mastr_log, db_connection_url_result, file_path
             return: full_file_name 생성된 csv 파일
             """
-            import jaydebeapi as jp
             from util.date_custom_util import DateUtil
             from util.file_util import FileUtil
+            from util.db_util import DbUtil, DB_FETCH_SIZE
 
             th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_list['th_data_clct_mastr_log'])
             tn_data_bsc_info = TnDataBscInfo(**collect_data_list['tn_data_bsc_info'])
@@ -193,68 +193,66 @@ def rdb_to_csv_fail_retry():
 
             tn_db_cntn_info = TnDBCntnInfo(**db_connection_url_result['tn_db_cntn_info'])
 
-            user_id = tn_db_cntn_info.user_id
-            pswd = tn_db_cntn_info.pswd
             connection_url = db_connection_url_result['connection_url']
             jars = [f"{os.environ['PYTHONPATH']}/jars/mysql-connector-java-5.1.49.jar", f"{os.environ['PYTHONPATH']}/jars/mariadb-java-client-3.1.4.jar", f"{os.environ['PYTHONPATH']}/jars/ojdbc8.jar"]
 
             # engine 생성
-            try:
-                db_engine = jp.connect(f'{tn_db_cntn_info.driver_class_nm}', connection_url, [f'{user_id}', f'{pswd}'], jars)
+            with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+                try:
+                    db_fetch_size = int(kwargs['var']['value'].get('db_fetch_size', DB_FETCH_SIZE))  # 조회 chunk 행 수 및 JDBC fetch size
+                    connect_db = DbUtil.get_connect_db(kwargs, tn_db_cntn_info, connection_url, jars, db_fetch_size)  # JDBC 게이트웨이 풀 커넥션 (실패 시 직접 연결)
+                    db_partition = DbUtil.get_db_partition(kwargs, tn_data_bsc_info.dtst_cd)  # 키 범위 분할 병렬 조회 설정
+                    select_db_stmt = DbUtil.get_incremental_stmt(session, connect_db, tn_data_bsc_info, select_db_stmt, th_data_clct_mastr_log.clct_log_sn, tn_db_cntn_info.db_knd_cd)  # 워터마크 증분 수집 (tn_data_clct_wtrmk_info 등록 데이터셋)
 
-                # csv 파일 생성
-                os.chdir(full_file_path)
-                file_name = tn_clct_file_info.insd_file_nm + "." + tn_clct_file_info.insd_file_extn  # csv 파일명
-                df = pd.read_sql_query(select_db_stmt, db_engine)
-                df = df.replace("\n"," ", regex=True).replace("\r\n"," ", regex=True).replace("\r"," ", regex=True).apply(lambda x: (x.str.strip() if x.dtypes == 'object' and x.str._inferred_dtype == 'string' else x), axis = 0)  # 개행문자 제거, string 양 끝 공백 제거
-                df.index += 1
-                df.to_csv(file_name, sep = link_file_sprtr, header = True, index_label= "clct_sn", encoding='utf-8-sig')
-                full_file_name = full_file_path + file_name
+                    # csv 파일 생성
+                    os.chdir(full_file_path)
+                    file_name = tn_clct_file_info.insd_file_nm + "." + tn_clct_file_info.insd_file_extn  # csv 파일명
+                    full_file_name = full_file_path + file_name
+                    row_count, column_list = DbUtil.extract_to_csv(connect_db, select_db_stmt, full_file_name, link_file_sprtr, db_fetch_size, db_partition)  # chunk 단위 조회 (분할 설정 시 범위별 병렬 조회), 정제 후 csv 이어쓰기
 
-                # if dtst_cd == "data803":
-                #     # csv 한글 헤더를 DW 영문 컬럼명으로 변경
-                #     get_data_column_stmt = f"""
-                #                 SELECT column_name
-                #                 FROM information_schema.columns
-                #                 WHERE table_name = '{tn_data_bsc_info.dw_tbl_phys_nm}'
-                #                 ORDER BY ordinal_position
-                #             """
-                #     with session.begin() as conn:
-                #         dw_column_dict = []  # DW 컬럼명
-                #         for dict_row in conn.execute(get_data_column_stmt).all():
-                #             dw_column_dict.append(dict_row[0])
+                    # if dtst_cd == "data803":
+                    #     # csv 한글 헤더를 DW 영문 컬럼명으로 변경
+                    #     get_data_column_stmt = f"""
+                    #                 SELECT column_name
+                    #                 FROM information_schema.columns
+                    #                 WHERE table_name = '{tn_data_bsc_info.dw_tbl_phys_nm}'
+                    #                 ORDER BY ordinal_position
+                    #             """
+                    #     with session.begin() as conn:
+                    #         dw_column_dict = []  # DW 컬럼명
+                    #         for dict_row in conn.execute(get_data_column_stmt).all():
+                    #             dw_column_dict.append(dict_row[0])
 
-                #     if dw_column_dict != []:
-                #         df = pd.read_csv(full_file_name, sep=link_file_sprtr)
-                #         df.columns = dw_column_dict
-                #         df.to_csv(full_file_name, index= False, sep=link_file_sprtr, encoding='utf-8-sig')
+                    #     if dw_column_dict != []:
+                    #         df = pd.read_csv(full_file_name, sep=link_file_sprtr)
+                    #         df.columns = dw_column_dict
+                    #         df.to_csv(full_file_name, index= False, sep=link_file_sprtr, encoding='utf-8-sig')
 
-                # 파일 사이즈 확인
-                if os.path.exists(full_file_name):
-                    row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                    if row_count != 0:
-                        logging.info(f"현재까지 파일 내 행 개수: {row_count}")
+                    # 파일 사이즈 확인
+                    if os.path.exists(full_file_name):
+                        if row_count != 0:
+                            logging.info(f"현재까지 파일 내 행 개수: {row_count}")
 
-                    file_size = os.path.getsize(full_file_name)
-                    logging.info(f"create_csv_file full_file_name::: {full_file_name}, file_size::: {file_size}")
+                        file_size = os.path.getsize(full_file_name)
+                        logging.info(f"create_csv_file full_file_name::: {full_file_name}, file_size::: {file_size}")
 
-                # tn_clct_file_info 수집파일정보
-                tn_clct_file_info = CommonUtil.set_file_info(tn_clct_file_info, th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
+                    # tn_clct_file_info 수집파일정보
+                    tn_clct_file_info = CommonUtil.set_file_info(tn_clct_file_info, th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
                 
-                if row_count == 0:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-                    raise AirflowSkipException()
-                else:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_DB, "y")
-                    if link_file_crt_yn == "y":
-                        CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_FILE_INSD_SEND, CONST.STTS_COMP, CONST.MSG_FILE_INSD_SEND_COMP_INT, "y")
-            except AirflowSkipException as e:
-                raise e
-            except Exception as e:
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_DB, "y")
-                logging.info(f"create_csv_file Exception::: {e}")
-                raise e
+                    if row_count == 0:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+                        raise AirflowSkipException()
+                    else:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_DB, "y")
+                        if link_file_crt_yn == "y":
+                            CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_FILE_INSD_SEND, CONST.STTS_COMP, CONST.MSG_FILE_INSD_SEND_COMP_INT, "y")
+                except AirflowSkipException as e:
+                    raise e
+                except Exception as e:
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_DB, "y")
+                    logging.info(f"create_csv_file Exception::: {e}")
+                    raise e
     
         file_path = create_directory(collect_data_list)
         db_connection_url_result = get_db_connection_url(collect_data_list)
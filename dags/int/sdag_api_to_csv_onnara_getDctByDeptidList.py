@@ -5,7 +5,7 @@ from math import trunc
 
 from pendulum import datetime, from_format
 from airflow.decorators import dag, task, task_group
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from util.onnara_util import OnnaraUtil
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
@@ -86,9 +86,8 @@ def api_to_csv_onnara():
             return: file_size
             """
             import os
-            import time
             from util.file_util import FileUtil
-            from util.call_url_util import CallUrlUtil
+            from util.call_url_util import CallUrlUtil, CsvSink, RetryPolicy
             from xml_to_dict import XMLtoDict
 
             th_data_clct_mastr_log = ThDataClctMastrLog(**collect_data_list['th_data_clct_mastr_log'])
@@ -119,6 +118,8 @@ def api_to_csv_onnara():
             params_dict, params_len = CallUrlUtil.set_params(tn_data_bsc_info, session, data_interval_start, data_interval_end, kwargs)
 
             retry_num = 0  # 데이터 없을 시 재시도 횟수
+            http_config = CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)  # Variable http_client_config 재시도 설정
+            retry_policy = RetryPolicy(http_config)  # 재시도 정책 (지수 백오프)
             repeat_num = 1  # 파라미터 길이만큼 반복 호출 횟수
             page_no = 1  # 현재 페이지
             total_page = 1  # 총 페이지 수
@@ -134,198 +135,194 @@ def api_to_csv_onnara():
             link_file_sprtr = tn_data_bsc_info.link_file_sprtr
             file_size = 0  # 파일 사이즈
             row_count = 0  # 행 개수
+            csv_sink = CsvSink(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name)  # 페이지 단위 csv 파일 생성
             
             res_soap = None  # 기본값 초기화
 
-            try:
-                 # 총 데이터 건수 조회 url 호출
-                total_count = CallUrlUtil.get_total_count(tn_data_bsc_info.data_se_col_two,tn_data_bsc_info.data_se_col_one,pvdr_data_se_vl_three,authKey,dtst_cd)
-                # total_count = 190
-                logging.info(f"총 데이터 건수: {total_count}, 총 페이지 수: {total_page}")
+            with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+                try:
+                     # 총 데이터 건수 조회 url 호출
+                    total_count = CallUrlUtil.get_total_count(tn_data_bsc_info.data_se_col_two,tn_data_bsc_info.data_se_col_one,pvdr_data_se_vl_three,authKey,dtst_cd)
+                    # total_count = 190
+                    logging.info(f"총 데이터 건수: {total_count}, 총 페이지 수: {total_page}")
 
-                # 파라미터 길이만큼 반복 호출
-                while repeat_num <= params_len:
+                    # 파라미터 길이만큼 반복 호출
+                    while repeat_num <= params_len:
                     
-                    # 총 페이지 수만큼 반복 호출
-                    while page_no <= total_page:
+                        # 총 페이지 수만큼 반복 호출
+                        while page_no <= total_page:
                         
-                        # 파라미터 길이만큼 호출 시 while 종료
-                        if repeat_num > params_len:
-                            break
-                        
-                        # 재시도 5회 이상 시
-                        if retry_num >= 5:
-                            # 파라미터 길이 == 1) whlie 종료
-                            if params_len == 1:
-                                repeat_num += 1
+                            # 파라미터 길이만큼 호출 시 while 종료
+                            if repeat_num > params_len:
                                 break
-                            else:  # 파라미터 길이 != 1)
-                                # th_data_clct_contact_fail_hstry_log 에 입력
-                                CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
-
-                                # 총 페이지 수만큼 덜 돌았을 때
-                                if page_no < total_page:  # 다음 페이지 호출
-                                    retry_num = 0
-                                    page_no += 1
-                                    continue
-                                # 총 페이지 수만큼 다 돌고
-                                elif page_no == total_page:
-                                    # 파라미터 길이만큼 덜 돌았을 때
-                                    if repeat_num < params_len:
+                        
+                            # 재시도 5회 이상 시
+                            if retry_num >= retry_policy.max_retries:
+                                # 파라미터 길이 == 1) whlie 종료
+                                if params_len == 1:
+                                    repeat_num += 1
+                                    break
+                                else:  # 파라미터 길이 != 1)
+                                    # th_data_clct_contact_fail_hstry_log 에 입력
+                                    CallUrlUtil.insert_fail_history_log(th_data_clct_mastr_log, return_url, file_path, session, params_dict['param_list'][repeat_num - 1], page_no)
+
+                                    # 총 페이지 수만큼 덜 돌았을 때
+                                    if page_no < total_page:  # 다음 페이지 호출
                                         retry_num = 0
-                                        page_no = 1
-                                        repeat_num += 1
+                                        page_no += 1
                                         continue
-                                    # 파라미터 길이만큼 다 돌았을 때
-                                    else:
-                                        repeat_num += 1
-                                        break
-                        # SOAP 요청 메시지 설정
-                        message, message_bms = OnnaraUtil.make_message(dtst_cd, pvdr_data_se_vl_two, pvdr_data_se_vl_three, page_no)
-                        req_soap = OnnaraUtil.make_req_soap(dtst_cd, systemid, loginid, deptCd, authKey, message, message_bms)
-                        addr = f"{return_url}"
-
-                        logging.info(f"call_url addr::: {addr}")
-
-                        # URL 호출
-                        res_soap = OnnaraUtil.send_http_request(addr, req_soap, charset)
-                        logging.info(f"call_url res_soap::: {res_soap}")
-
-                        # 디버깅 로그 추가: mode 값 확인
-                        header, mode = CallUrlUtil.get_request_message(retry_num,repeat_num,page_no,return_url,total_page,full_file_name,header,mode)
-
-                        # SOAP 응답 파싱
-                        root = ET.fromstring(res_soap)
-                        namespaces = {
-                            "soap": "http://schemas.xmlsoap.org/soap/envelope/",
-                            "ns2": "java:gov.bms.lnk.ini.vo",
-                            "n1": "http://hamoni.mogaha.go.kr/bms",
-                        }
-                        body = root.find(".//soap:Body", namespaces=namespaces)
-                        # 응답 코드 확인
-                        res_code_element = root.find(".//ns2:recptRsltCd", namespaces)
-                        if res_code_element is None:
-                            logging.error("응답 XML에 'recptRsltCd' 태그가 존재하지 않습니다.")
-                            raise ValueError("응답 XML에서 'recptRsltCd' 태그를 찾을 수 없습니다.")
-
-                        res_code = res_code_element.text
-                        logging.info(f"응답 코드: {res_code}")
-
-                        # DOCUMENT 또는 데이터 확인
-                        dct_list_element = body.find(".//ns2:dctListVo", namespaces=namespaces)
-                        document_string = ET.tostring(dct_list_element, encoding='utf-8', method='xml').decode()
+                                    # 총 페이지 수만큼 다 돌고
+                                    elif page_no == total_page:
+                                        # 파라미터 길이만큼 덜 돌았을 때
+                                        if repeat_num < params_len:
+                                            retry_num = 0
+                                            page_no = 1
+                                            repeat_num += 1
+                                            continue
+                                        # 파라미터 길이만큼 다 돌았을 때
+                                        else:
+                                            repeat_num += 1
+                                            break
+                            # SOAP 요청 메시지 설정
+                            message, message_bms = OnnaraUtil.make_message(dtst_cd, pvdr_data_se_vl_two, pvdr_data_se_vl_three, page_no)
+                            req_soap = OnnaraUtil.make_req_soap(dtst_cd, systemid, loginid, deptCd, authKey, message, message_bms)
+                            addr = f"{return_url}"
+
+                            logging.info(f"call_url addr::: {addr}")
+
+                            # URL 호출
+                            res_soap = OnnaraUtil.send_http_request(addr, req_soap, charset)
+                            logging.info(f"call_url res_soap::: {res_soap}")
+
+                            # 디버깅 로그 추가: mode 값 확인
+                            header, mode = CallUrlUtil.get_request_message(retry_num,repeat_num,page_no,return_url,total_page,full_file_name,header,mode)
+
+                            # SOAP 응답 파싱
+                            root = ET.fromstring(res_soap)
+                            namespaces = {
+                                "soap": "http://schemas.xmlsoap.org/soap/envelope/",
+                                "ns2": "java:gov.bms.lnk.ini.vo",
+                                "n1": "http://hamoni.mogaha.go.kr/bms",
+                            }
+                            body = root.find(".//soap:Body", namespaces=namespaces)
+                            # 응답 코드 확인
+                            res_code_element = root.find(".//ns2:recptRsltCd", namespaces)
+                            if res_code_element is None:
+                                logging.error("응답 XML에 'recptRsltCd' 태그가 존재하지 않습니다.")
+                                raise ValueError("응답 XML에서 'recptRsltCd' 태그를 찾을 수 없습니다.")
+
+                            res_code = res_code_element.text
+                            logging.info(f"응답 코드: {res_code}")
+
+                            # DOCUMENT 또는 데이터 확인
+                            dct_list_element = body.find(".//ns2:dctListVo", namespaces=namespaces)
+                            document_string = ET.tostring(dct_list_element, encoding='utf-8', method='xml').decode()
                         
-                        if res_code == "INI0000":
-                            json_data = XMLtoDict().parse(document_string)
+                            if res_code == "INI0000":
+                                json_data = XMLtoDict().parse(document_string)
 
-                            # 원천 데이터 저장
-                            if link_file_crt_yn.lower() == "y":
-                                CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
+                                # 원천 데이터 저장
+                                if link_file_crt_yn.lower() == "y":
+                                    CallUrlUtil.create_source_file(json_data, source_file_name, full_file_path, mode)
 
-                            result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
-                            result_json = result['result_json_array']
-                            result_size = len(result_json)
-                            print("result_json :::::::::",result_json)
+                                result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
+                                result_json = result['result_json_array']
+                                result_size = len(result_json)
+                                print("result_json :::::::::",result_json)
                             
-                            required_fields = [
-                                "docId", "docNoSeq", "docTtl", "reportDt", "state", "stateName", "authorId",
-                                "authorName", "authorDeptNameDesc", "lastAuthorId", "lastAuthorName", "pathState",
-                                "rcvFlag", "setCardFlag", "protectFlag", "paperFlag", "distributeFlag", "enfGubun",
-                                "acterGubun", "systemType", "convBodyFlag", "firstReadId"
-                            ]
-
-                            extracted_data = []
+                                required_fields = [
+                                    "docId", "docNoSeq", "docTtl", "reportDt", "state", "stateName", "authorId",
+                                    "authorName", "authorDeptNameDesc", "lastAuthorId", "lastAuthorName", "pathState",
+                                    "rcvFlag", "setCardFlag", "protectFlag", "paperFlag", "distributeFlag", "enfGubun",
+                                    "acterGubun", "systemType", "convBodyFlag", "firstReadId"
+                                ]
+
+                                extracted_data = []
     
-                            for item in result_json:
-                                filtered_item = {}
+                                for item in result_json:
+                                    filtered_item = {}
                                 
-                                # 각 키-값 쌍을 순회하면서 처리
-                                for key, value in item.items():
-                                    # 접두어 제거: 마지막 '}' 이후의 텍스트를 키로 사용
-                                    clean_key = key.split('}')[-1] if '}' in key else key
+                                    # 각 키-값 쌍을 순회하면서 처리
+                                    for key, value in item.items():
+                                        # 접두어 제거: 마지막 '}' 이후의 텍스트를 키로 사용
+                                        clean_key = key.split('}')[-1] if '}' in key else key
                                     
-                                    # 원하는 필드만 추출
-                                    if clean_key in required_fields:
-                                        filtered_item[clean_key] = value
+                                        # 원하는 필드만 추출
+                                        if clean_key in required_fields:
+                                            filtered_item[clean_key] = value
                                 
-                                # 추출한 데이터 리스트에 추가
-                                extracted_data.append(filtered_item)
-                            print("!!!!extracted_data :::::::::",extracted_data)
-
-                            # 데이터 존재 시
-                            if result_size != 0:
-                                retry_num = 0  # 재시도 횟수 초기화
-                                if page_no == 1:  # 첫 페이지일 때
-                                    # total_count = int(result['total_count'])
-                                    total_page = CallUrlUtil.get_total_page(total_count, result_size)
-                                    logging.info(f"총 데이터 건수: {total_count}, 총 페이지 수: {total_page}")
-
-                                row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                                if row_count == 0:
-                                    header = True
-                                    mode = "w"
-
-                                # CSV 파일 생성
-                                CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, extracted_data, header, mode, page_no)
-
-
-                            row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                            if row_count != 0:
-                                logging.info(f"현재까지 파일 내 행 개수: {row_count}")
-
-                            # 총 페이지 수 == 1)
-                            if total_page == 1:
-                                repeat_num += 1
-                                break
-                            else:
-                                if page_no < total_page:
-                                    page_no += 1
-                                elif page_no == total_page:
-                                    if params_len == 1:
-                                        repeat_num += 1
-                                        break
-                                    elif params_len != 1:
-                                        if repeat_num < params_len:
-                                            page_no = 1
+                                    # 추출한 데이터 리스트에 추가
+                                    extracted_data.append(filtered_item)
+                                print("!!!!extracted_data :::::::::",extracted_data)
+
+                                # 데이터 존재 시
+                                if result_size != 0:
+                                    retry_num = 0  # 재시도 횟수 초기화
+                                    if page_no == 1:  # 첫 페이지일 때
+                                        # total_count = int(result['total_count'])
+                                        total_page = CallUrlUtil.get_total_page(total_count, result_size)
+                                        logging.info(f"총 데이터 건수: {total_count}, 총 페이지 수: {total_page}")
+
+                                    # CSV 파일 생성
+                                    csv_sink.write(extracted_data, page_no)
+
+
+                                row_count = csv_sink.row_count  # 행 개수 확인
+                                if row_count != 0:
+                                    logging.info(f"현재까지 파일 내 행 개수: {row_count}")
+
+                                # 총 페이지 수 == 1)
+                                if total_page == 1:
+                                    repeat_num += 1
+                                    break
+                                else:
+                                    if page_no < total_page:
+                                        page_no += 1
+                                    elif page_no == total_page:
+                                        if params_len == 1:
                                             repeat_num += 1
-                                        else: repeat_num += 1
-                                        break
-                        # 이상 응답
-                        else:
-                            logging.info(f"call_url res_code::: {res_code}")
-                            retry_num += 1
-                            time.sleep(5)
-                            continue
-
-                # 파일 사이즈 확인
-                if os.path.exists(full_file_name):
-                    file_size = os.path.getsize(full_file_name)
-                logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
-
-                # 실패 로그 개수 확인
-                fail_count = CallUrlUtil.get_fail_data_count(th_data_clct_mastr_log.clct_log_sn, session)
+                                            break
+                                        elif params_len != 1:
+                                            if repeat_num < params_len:
+                                                page_no = 1
+                                                repeat_num += 1
+                                            else: repeat_num += 1
+                                            break
+                            # 이상 응답
+                            else:
+                                logging.info(f"call_url res_code::: {res_code}")
+                                retry_num = retry_policy.wait(retry_num, error_class = "service_error")
+                                continue
+
+                    # 파일 사이즈 확인
+                    if os.path.exists(full_file_name):
+                        file_size = os.path.getsize(full_file_name)
+                    logging.info(f"call_url file_name::: {file_name}, file_size::: {file_size}")
+
+                    # 실패 로그 개수 확인
+                    fail_count = CallUrlUtil.get_fail_data_count(th_data_clct_mastr_log.clct_log_sn, session)
                 
-                if row_count == 0 and fail_count == 0 and retry_num < 5:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-                    raise AirflowSkipException()
-                elif fail_count != 0 or retry_num >= 5:
-                    logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                    raise AirflowSkipException()
-                else:
-                    # tn_clct_file_info 수집파일정보
-                    tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
+                    if row_count == 0 and fail_count == 0 and retry_num < retry_policy.max_retries:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+                        raise AirflowSkipException()
+                    elif fail_count != 0 or retry_num >= retry_policy.max_retries:
+                        logging.info(f"call_url ::: {CONST.MSG_CLCT_ERROR_CALL}")
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                        raise AirflowSkipException()
+                    else:
+                        # tn_clct_file_info 수집파일정보
+                        tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
                     
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
-                    if link_file_crt_yn == "y":
-                        CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_FILE_INSD_SEND, CONST.STTS_COMP, CONST.MSG_FILE_INSD_SEND_COMP_INT, "n")
-            except AirflowSkipException as e:
-                raise e
-            except Exception as e:
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                logging.info(f"call_url Exception::: {e}")
-                raise AirflowSkipException()
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
+                        if link_file_crt_yn == "y":
+                            CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_FILE_INSD_SEND, CONST.STTS_COMP, CONST.MSG_FILE_INSD_SEND_COMP_INT, "n")
+                except AirflowSkipException as e:
+                    raise e
+                except Exception as e:
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                    logging.info(f"call_url Exception::: {e}")
+                    raise AirflowSkipException()
             
         file_path = create_directory(collect_data_list)
         file_path >> call_url(collect_data_list, file_path)
@@ -7,14 +7,19 @@ from airflow.providers.postgres.hooks.postgres import PostgresHook
 from pendulum import datetime
 from datetime import datetime as dt
 from sqlalchemy.orm import sessionmaker
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from util.file_util import FileUtil
+from util.hdfs_util import HdfsUtil, HDFS_UPLOAD_MAX_WORKERS
+from util.db_util import DbUtil
+from util.dw_util import DwUtil
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
 from dto.tc_com_dtl_cd import TcCmmnDtlCd as CONST
 from airflow.providers.sftp.operators.sftp import SFTPHook
 
+DW_LOAD_POOL = "dw_load_pool"  # DW 적재 동시 실행 수 제한 pool (DW 테이블 단위 mapped task, slot 수는 운영 중 변경 가능) 예) airflow pools set dw_load_pool 4 "DW 적재"
+
 @dag(
     dag_id="sdag_csv_to_dw_hadoop",
     schedule="10,30,50 3,5,6 * * *",
@@ -227,74 +232,9 @@ def csv_to_dw_hadoop():
             logging.info(f"check_file_in_final_path ::: 최종경로 파일 존재 여부 확인 대상없음")
 
     @task
-    def get_active_namenode(**kwargs):
-        import subprocess
-        import base64
-        import logging
-        from airflow.models import Variable
-        from airflow.providers.ssh.operators.ssh import SSHOperator
-        from airflow.exceptions import AirflowException
-        from airflow.providers.ssh.hooks.ssh import SSHHook
-        """
-        Active 네임노드를 확인하는 함수
-        """
-     
-        command = "source /etc/profile && hdfs haadmin -getAllServiceState"
-    
-        # SSHOperator 설정
-        ssh_operator = SSHOperator(
-            task_id='get_active_namenode',
-            ssh_conn_id='ssh_hadoop_conn',  # SSH 연결 ID (Airflow에서 설정)
-            command=command,
-            do_xcom_push=True  # XCom에 결과 저장
-        )
-        
-        # SSHOperator 실행 및 결과 처리
-        try:
-            # result = ssh_operator.execute(context=kwargs)  # 명령 실행
-            # logging.info(f"명령어 결과: {result}")
-
-            # # Base64 디코딩
-            # decoded_result = base64.b64decode(result).decode('utf-8')
-            # logging.info(f"디코딩된 명령어 결과: {decoded_result}")
-            
-            # # 줄바꿈을 기준으로 결과 분리 및 공백 제거
-            # lines = [line.strip() for line in decoded_result.split('\n') if line.strip()]
-            ssh_hook = SSHHook(ssh_conn_id='ssh_hadoop_conn')
-            ssh_client = ssh_hook.get_conn()
-
-            # 명령 실행
-            stdin, stdout, stderr = ssh_client.exec_command(command)
-            result = stdout.read().decode('utf-8')
-            logging.info(f"명령어 결과: {result}")
-
-            # 줄바꿈을 기준으로 결과 분리 및 공백 제거
-            lines = [line.strip() for line in result.split('\n') if line.strip()]
-
-            # Active 네임노드 파싱
-            active_namenode = None
-            for line in lines:
-                if "namenode01.gbgs.go.kr:8020" in line and "active" in line:
-                    active_namenode = "192.168.1.23"  #local test
-                    # active_namenode = "172.25.20.91"   #prod 
-                elif "namenode02.gbgs.go.kr:8020" in line and "active" in line:
-                    active_namenode = "192.168.1.24"   #local test
-                    # active_namenode = "172.25.20.92"    #prod
-            
-            logging.info(f"Active 네임노드: {active_namenode}")
-            return active_namenode
-        
-        except Exception as e:
-            logging.error(f"명령어 실패: {e}")
-            raise AirflowException(f"SSH operator error: {e}")
-
-    @task
-    def move_file_to_hadoop(active_namenode, **kwargs):
-        from hdfs import InsecureClient
-        from hdfs import Client
+    def move_file_to_hadoop(**kwargs):
         import os
         import logging
-        from airflow.exceptions import AirflowException
         import urllib.parse
 
         """
@@ -336,15 +276,8 @@ def csv_to_dw_hadoop():
 
                 # HDFS 클라이언트 설정
                 try:
-                    if not active_namenode:
-                        raise AirflowException("Active 네임노드를 찾을 수 없습니다.")
-
-                    # client = InsecureClient(f"{active_namenode}", user='gsdpmng', root=hadoop_full_path)
-                    client = InsecureClient(f"http://{active_namenode}:9870", user='gsdpmng', root=hadoop_full_path)
-                    # client = Client(active_namenode, root=hadoop_full_path)
-
-                    # HDFS에 디렉토리 생성 (존재하지 않는 경우)
-                    client.makedirs(hadoop_full_path)
+                    # HDFS에 디렉토리 생성 (존재하지 않는 경우, active 네임노드 캐시 사용 및 standby 시 failover)
+                    HdfsUtil.run_with_failover(lambda client: client.makedirs(hadoop_full_path))
                     # URL 인코딩된 경로를 디코딩하여 로그 출력
                     # encoded_path = f"{active_namenode}{hadoop_full_path}"
                     # decoded_path = urllib.parse.unquote(encoded_path)
@@ -355,30 +288,11 @@ def csv_to_dw_hadoop():
                     logging.info(f"HDFS 기본 경로: {hadoop_full_path}")
                     # logging.info(f"Active 네임노드에 경로 생성됨: {active_namenode}{hadoop_full_path}")
 
-                    # 로컬에서 HDFS로 파일 전송
-                    for file in os.listdir(before_file_path):
-                        try:
-                            print("#######before_file_path : "+ before_file_path)
-                            local_file_path = os.path.join(before_file_path, file)
-                            print("#######local_file_path : "+ local_file_path)
-                            #if file == file_name and os.path.isfile(local_file_path):
-                            # file_name과 일치하는 모든 CSV 파일을 찾음
-                            #if file.endswith('.csv') and os.path.isfile(local_file_path):
-                            # '_sample.csv'이 포함되지 않고, 확장자가 .csv인 모든 파일 전송
-                            if file.endswith('.csv') and '_sample.csv' not in file and os.path.isfile(local_file_path):
-                                print("#######file : "+ file)
-                            #  print("#######file_name : "+ file_name)
-                                hdfs_file_path = f"{hadoop_full_path}{file}"
-                                print("#######hdfs_file_path : "+ hdfs_file_path)
-
-                            # HDFS에 파일 업로드
-                            with open(local_file_path, 'rb') as f:
-                                client.write(hdfs_file_path, f, overwrite=True)
-                                #print("test : " ,client.write(hdfs_file_path, f, overwrite=True))
-                        except Exception as e:
-                            logging.error(f"{file} 전송 실패 ::: {e}")
-                            continue  # 다음 파일로 넘어감
-                        logging.info(f"파일이 Active 네임노드로 전송됨 ::: {hdfs_file_path}")
+                    # 로컬에서 HDFS로 파일 전송 ('_sample.csv'이 포함되지 않고, 확장자가 .csv인 모든 파일, 변경 없는 파일은 생략)
+                    file_list = [file for file in os.listdir(before_file_path)
+                                 if file.endswith('.csv') and '_sample.csv' not in file and os.path.isfile(os.path.join(before_file_path, file))]
+                    hdfs_upload_workers = kwargs['var']['value'].get('hdfs_upload_workers', HDFS_UPLOAD_MAX_WORKERS)
+                    HdfsUtil.upload_files(before_file_path, hadoop_full_path, file_list, hdfs_upload_workers)
 
 
                     if tn_data_bsc_info.link_file_crt_yn.lower() == 'y' or dtst_cd == 'data917' or\
@@ -657,6 +571,8 @@ def csv_to_dw_hadoop():
             db_ssh_temp_path = kwargs['var']['value'].db_ssh_temp_path
             print("final_file_path : " + final_file_path)
             print("db_ssh_temp_path : " + db_ssh_temp_path)
+            if get_dw_copy_mode(kwargs) == "stdin":  # COPY FROM STDIN 적재 시 DB서버 파일 전송 불필요
+                continue
 
 
             file_name = ""
@@ -687,6 +603,11 @@ def csv_to_dw_hadoop():
         return: dw_column_dict, file_column
         """
         lists_column_info = []
+        # 적재 대상 DW 테이블 컬럼 정보 한 번에 조회 (실패 시 파일별 조회에서 로그 처리)
+        try:
+            CommonUtil.get_dw_column_info(session, [loading_data_list['tn_data_bsc_info']['dw_tbl_phys_nm'] for loading_data_list in loading_data_lists])
+        except Exception as e:
+            logging.error(f"get_data_type Exception::: {e}")
         for loading_data_list in loading_data_lists:
             tn_data_bsc_info = TnDataBscInfo(**loading_data_list['tn_data_bsc_info'])
             th_data_clct_mastr_log = ThDataClctMastrLog(**loading_data_list['th_data_clct_mastr_log'])
@@ -702,25 +623,13 @@ def csv_to_dw_hadoop():
                 file_name = tn_data_bsc_info.dtst_nm.replace(" ", "_") + ".csv"
                 full_file_name = final_file_path + file_name 
 
-            get_data_type_stmt = f"""
-                SELECT ordinal_position, column_name, 
-                    CASE WHEN udt_name = 'bpchar' AND character_maximum_length IS NOT NULL THEN udt_name || '(' || character_maximum_length || ')' 
-                    ELSE udt_name 
-                    END AS data_type
-                FROM information_schema.columns
-                WHERE table_name = '{tn_data_bsc_info.dw_tbl_phys_nm}'
-                ORDER BY ordinal_position
-            """
-
             with session.begin() as conn:
                 try:
                     # DW 컬럼명, 데이터 타입
-                    dw_column_dict = {}
-                    for dict_row in conn.execute(get_data_type_stmt).all():
-                        dw_column_dict[dict_row[1]] = dict_row[2]
+                    dw_column_dict = CommonUtil.get_dw_data_type_dict(session, tn_data_bsc_info.dw_tbl_phys_nm)
                 
                     # 파일 컬럼명
-                    file_column = pd.read_csv(full_file_name, sep= th_data_clct_mastr_log.link_file_sprtr, low_memory = False).columns.str.lower()  # 소문자로 변경
+                    file_column = pd.read_csv(full_file_name, sep= th_data_clct_mastr_log.link_file_sprtr, nrows = 0).columns.str.lower()  # 소문자로 변경 (헤더만 읽기)
                     lists_column_info.append({
                         "loading_data_list" : loading_data_list,
                         "dw_column_dict" : dw_column_dict,
@@ -734,64 +643,133 @@ def csv_to_dw_hadoop():
         return lists_column_info
     
     @task
-    def dw_loading(lists_column_info, **kwargs):
+    def group_dw_loading_lists(lists_column_info):
         """
-        DW 적재 및 DB 서버 임시파일삭제
-        params: loading_data_list, column_info
+        DW 테이블별 적재 대상 묶음 (같은 DW 테이블은 한 task 에서 순서대로 적재, 다른 DW 테이블은 병렬 적재)
+        params: lists_column_info
+        return: dw_loading_groups
         """
+        dw_loading_groups = {}
         for loading_data_list in lists_column_info:
-            th_data_clct_mastr_log = ThDataClctMastrLog(**loading_data_list['loading_data_list']['th_data_clct_mastr_log'])
-            tn_data_bsc_info = TnDataBscInfo(**loading_data_list['loading_data_list']['tn_data_bsc_info'])
-            tn_clct_file_info = TnClctFileInfo(**loading_data_list['loading_data_list']['tn_clct_file_info'])
-            log_full_file_path = loading_data_list['loading_data_list']['log_full_file_path']
-            db_ssh_temp_path = kwargs['var']['value'].db_ssh_temp_path
-            print("dw_loading_file_name_db_ssh_temp_path :"+ db_ssh_temp_path)
+            dw_tbl_phys_nm = loading_data_list['loading_data_list']['tn_data_bsc_info']['dw_tbl_phys_nm']
+            dw_loading_groups.setdefault(dw_tbl_phys_nm, []).append(loading_data_list)
+        return list(dw_loading_groups.values())
 
-            temp_table_name = "temp_" + tn_data_bsc_info.dw_tbl_phys_nm
-            data_crtr_pnttm = th_data_clct_mastr_log.data_crtr_pnttm
-            link_file_sprtr = th_data_clct_mastr_log.link_file_sprtr
-            if tn_data_bsc_info.link_file_crt_yn.lower() == 'y':
-                file_name = tn_clct_file_info.insd_file_nm + "." + tn_clct_file_info.insd_file_extn
-                print("YYYYYY_dw_loading_file_name : " + file_name)
-            else:
-                file_name = tn_data_bsc_info.dtst_nm.replace(" ", "_") + ".csv"
-                print("dw_loading_file_name : " + file_name)
+    @task(pool=DW_LOAD_POOL)
+    def dw_loading(dw_loading_group, **kwargs):
+        """
+        DW 적재 및 DB 서버 임시파일삭제 (DW 테이블별 mapped task)
+        params: dw_loading_group (같은 DW 테이블의 loading_data_list, column_info)
+        """
+        with LogRecorder(session) as log_recorder:  # 데이터셋별 상태 기록, 예외 시 블록 종료에서 기록
+            for loading_data_list in dw_loading_group:
+                th_data_clct_mastr_log = ThDataClctMastrLog(**loading_data_list['loading_data_list']['th_data_clct_mastr_log'])
+                tn_data_bsc_info = TnDataBscInfo(**loading_data_list['loading_data_list']['tn_data_bsc_info'])
+                tn_clct_file_info = TnClctFileInfo(**loading_data_list['loading_data_list']['tn_clct_file_info'])
+                log_full_file_path = loading_data_list['loading_data_list']['log_full_file_path']
+                db_ssh_temp_path = kwargs['var']['value'].db_ssh_temp_path
+                print("dw_loading_file_name_db_ssh_temp_path :"+ db_ssh_temp_path)
+                #final_file_path = kwargs['var']['value'].root_final_file_path  # local test
+                final_file_path = kwargs['var']['value'].final_file_path
+                dw_copy_mode = get_dw_copy_mode(kwargs)
+
+                temp_table_name = get_temp_table_name(tn_data_bsc_info.dw_tbl_phys_nm, th_data_clct_mastr_log.clct_log_sn)
+                data_crtr_pnttm = th_data_clct_mastr_log.data_crtr_pnttm
+                link_file_sprtr = th_data_clct_mastr_log.link_file_sprtr
+                if tn_data_bsc_info.link_file_crt_yn.lower() == 'y':
+                    file_name = tn_clct_file_info.insd_file_nm + "." + tn_clct_file_info.insd_file_extn
+                    full_file_name = final_file_path + tn_clct_file_info.insd_flpth + file_name
+                    print("YYYYYY_dw_loading_file_name : " + file_name)
+                else:
+                    file_name = tn_data_bsc_info.dtst_nm.replace(" ", "_") + ".csv"
+                    full_file_name = final_file_path + file_name
+                    print("dw_loading_file_name : " + file_name)
 
-            try:
-                # DW 적재
-                delete_temp_table(temp_table_name)
-                create_temp_table(temp_table_name, loading_data_list)
-                copy_temp_table(temp_table_name, loading_data_list, db_ssh_temp_path, file_name, link_file_sprtr)
-                delete_table(tn_data_bsc_info, data_crtr_pnttm, temp_table_name)
-                insert_table(tn_data_bsc_info, loading_data_list, temp_table_name)
-                delete_temp_table(temp_table_name)
-
-                # DW 적재 결과 확인 (copy 실패 확인)
-                result_count = check_loading_result(tn_data_bsc_info, data_crtr_pnttm)
-                if result_count == 0:  # count(data_crtr_pnttm)가 0일 때 실패로 판단
+                try:
+                    # DW 적재
+                    dw_load_mthd_cd = tn_data_bsc_info.dw_load_mthd_cd.lower()
+                    copy_count = None
+                    if get_dw_load_atomic_yn(kwargs) == "y" or dw_load_mthd_cd in ("partition", "upsert", "upsert_all"):  # 단일 트랜잭션 적재 (partition, upsert 적재는 단일 트랜잭션만 지원)
+                        copy_source = "stdin" if dw_copy_mode == "stdin" else f"'/var/lib/postgresql/temp/DwTemp/{file_name}'"
+                        copy_count = load_dw_table(tn_data_bsc_info, loading_data_list, data_crtr_pnttm, temp_table_name, full_file_name, copy_source, link_file_sprtr)
+                    else:
+                        delete_temp_table(temp_table_name)
+                        create_temp_table(temp_table_name, loading_data_list)
+                        if dw_copy_mode == "stdin":
+                            copy_temp_table_stdin(temp_table_name, loading_data_list, full_file_name, link_file_sprtr)
+                        else:
+                            copy_temp_table(temp_table_name, loading_data_list, db_ssh_temp_path, file_name, link_file_sprtr)
+                        delete_table(tn_data_bsc_info, data_crtr_pnttm, temp_table_name)
+                        insert_table(tn_data_bsc_info, loading_data_list, temp_table_name)
+                        delete_temp_table(temp_table_name)
+
+                    # DW 적재 결과 확인 (copy 실패 확인)
+                    if dw_load_mthd_cd in ("upsert", "upsert_all"):  # 변경 없는 행은 data_crtr_pnttm 이 갱신되지 않으므로 copy 건수로 확인
+                        result_count = copy_count
+                    else:
+                        result_count = check_loading_result(tn_data_bsc_info, data_crtr_pnttm)
                     with session.begin() as conn:
                         th_data_clct_mastr_log = conn.get(ThDataClctMastrLog, th_data_clct_mastr_log.clct_log_sn)
-                        CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_DW_LDADNG, CONST.STTS_ERROR, CONST.MSG_DW_LDADNG_ERROR_DW, "n")
+                    if result_count == 0:  # count(data_crtr_pnttm)가 0일 때 실패로 판단
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_DW_LDADNG, CONST.STTS_ERROR, CONST.MSG_DW_LDADNG_ERROR_DW, "n")
                         logging.error(f"dw_loading::: {CONST.MSG_DW_LDADNG_ERROR_DW}")
-                else:
-                    with session.begin() as conn:
-                        th_data_clct_mastr_log = conn.get(ThDataClctMastrLog, th_data_clct_mastr_log.clct_log_sn)
+                    else:
                         th_data_clct_mastr_log.dw_rcrd_cnt = result_count
-                        CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_DW_LDADNG, CONST.STTS_COMP, CONST.MSG_DW_LDADNG_COMP, "n")
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_DW_LDADNG, CONST.STTS_COMP, CONST.MSG_DW_LDADNG_COMP, "n")
+                    log_recorder.flush()  # DW 적재는 바로 commit 되므로 데이터셋마다 상태 기록 (워터마크 반영 전)
+                    if result_count != 0:
+                        if DbUtil.is_wtrmk_load_mthd(tn_data_bsc_info):  # 증분 수집 워터마크 반영
+                            DbUtil.commit_watermark(session, tn_data_bsc_info.dtst_cd, th_data_clct_mastr_log.clct_log_sn)
                         logging.info(f"dw_loading::: {CONST.MSG_DW_LDADNG_COMP}")
 
-                # 임시파일 삭제
-                if tn_data_bsc_info.dtst_cd not in {"data762", "data763"}:  # 부서정보, 직원정보 예외
-                    sftp_hook.delete_file(db_ssh_temp_path + file_name)
+                    # 임시파일 삭제
+                    if dw_copy_mode != "stdin" and tn_data_bsc_info.dtst_cd not in {"data762", "data763"}:  # 부서정보, 직원정보 예외
+                        sftp_hook.delete_file(db_ssh_temp_path + file_name)
 
-            except Exception as e:
-                with session.begin() as conn:
-                    th_data_clct_mastr_log = conn.get(ThDataClctMastrLog, th_data_clct_mastr_log.clct_log_sn)
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_DW_LDADNG, CONST.STTS_ERROR, CONST.MSG_DW_LDADNG_ERROR_DW, "n")
-                logging.error(f"dw_loading::: {CONST.MSG_DW_LDADNG_ERROR_DW}")
-                logging.error(f"dw_loading Exception::: {e}")
-                raise e
+                except Exception as e:
+                    with session.begin() as conn:
+                        th_data_clct_mastr_log = conn.get(ThDataClctMastrLog, th_data_clct_mastr_log.clct_log_sn)
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_DW_LDADNG, CONST.STTS_ERROR, CONST.MSG_DW_LDADNG_ERROR_DW, "n")
+                    logging.error(f"dw_loading::: {CONST.MSG_DW_LDADNG_ERROR_DW}")
+                    logging.error(f"dw_loading Exception::: {e}")
+                    raise e
     
+    def get_dw_load_atomic_yn(kwargs):
+        """
+        DW 단일 트랜잭션 적재 여부 조회 (Variable dw_load_atomic_yn, 기본값 y / n: 단계별 commit 기존 방식)
+        params: kwargs
+        return: dw_load_atomic_yn
+        """
+        try:
+            dw_load_atomic_yn = kwargs['var']['value'].get('dw_load_atomic_yn', 'y')
+        except Exception as e:
+            logging.info(f"get_dw_load_atomic_yn Exception::: {e}")
+            dw_load_atomic_yn = 'y'
+        return (dw_load_atomic_yn or 'y').lower()
+
+    def get_temp_table_name(dw_tbl_phys_nm, clct_log_sn):
+        """
+        적재별 임시 테이블명 (병렬 적재 및 DAG 실행 중복 시 충돌 방지, 63자 제한)
+        params: dw_tbl_phys_nm, clct_log_sn
+        return: temp_table_name
+        """
+        suffix = f"_{clct_log_sn}"
+        return ("temp_" + dw_tbl_phys_nm)[:63 - len(suffix)] + suffix
+
+    def get_dw_copy_mode(kwargs):
+        """
+        DW 임시 테이블 copy 방식 조회 (Variable dw_copy_mode)
+        stdin: 로컬 파일을 COPY FROM STDIN 으로 전송 (기본값), file: DB서버로 sftp 전송 후 서버 파일 COPY
+        params: kwargs
+        return: dw_copy_mode
+        """
+        try:
+            dw_copy_mode = kwargs['var']['value'].get('dw_copy_mode', 'stdin')
+        except Exception as e:
+            logging.info(f"get_dw_copy_mode Exception::: {e}")
+            dw_copy_mode = 'stdin'
+        return (dw_copy_mode or 'stdin').lower()
+
     def dtype_mapping(file_column, column_dict):
         """
         데이터 타입 매핑
@@ -829,20 +807,47 @@ def csv_to_dw_hadoop():
         logging.info(f"file_column::: {file_column}")
         logging.info(f"dw_column_dict::: {loading_data_list['dw_column_dict']}")
         try:
-            create_stmt = f"""CREATE TABLE {temp_table_name} (
-                {', '.join('"'+col+'" '+dtype for col, dtype in dtypedict.items())} )
-            """
+            create_stmt = get_create_temp_stmt(temp_table_name, dtypedict)
             logging.info(f"create_stmt::: {create_stmt}")
             with session.begin() as conn:
                 conn.execute(create_stmt)
         except Exception as e:
             logging.error(f"create_temp_table Exception::: {e}")
     
+    def get_create_temp_stmt(temp_table_name, dtypedict, temp_table_type = ""):
+        """
+        임시 테이블 생성문
+        params: temp_table_name, dtypedict, temp_table_type (TEMP: 세션 임시 테이블, 트랜잭션 종료 시 삭제)
+        return: create_stmt
+        """
+        create_stmt = f"""CREATE {temp_table_type} TABLE {temp_table_name} (
+                {', '.join('"'+col+'" '+dtype for col, dtype in dtypedict.items())} )
+            """
+        if temp_table_type == "TEMP":
+            create_stmt += " ON COMMIT DROP"
+        return create_stmt
+
     def delete_table(tn_data_bsc_info, data_crtr_pnttm, temp_table_name):
         """
         DW 테이블 delete
         params: tn_data_bsc_info, data_crtr_pnttm, temp_table_name
         """
+        delete_stmt = get_delete_stmt(tn_data_bsc_info, data_crtr_pnttm, temp_table_name)
+        if not delete_stmt.strip():  # upsert 적재 등 delete 없음
+            return
+        logging.info(f"delete_stmt::: {' '.join(delete_stmt.split())}")
+        try:
+            with session.begin() as conn:
+                conn.execute(delete_stmt)
+        except Exception as e:
+            logging.error(f"delete_table Exception::: {e}")
+
+    def get_delete_stmt(tn_data_bsc_info, data_crtr_pnttm, temp_table_name):
+        """
+        DW 테이블 delete 문 생성 (적재 방식별)
+        params: tn_data_bsc_info, data_crtr_pnttm, temp_table_name
+        return: delete_stmt
+        """
         delete_stmt = ""
         crtr_del_col_nm = tn_data_bsc_info.crtr_del_col_nm  # 삭제 기준 컬럼
         
@@ -929,14 +934,19 @@ def csv_to_dw_hadoop():
         
         if dw_load_mthd_cd == "change":
             delete_stmt = f"TRUNCATE TABLE {dw_tbl_phys_nm}"
-
-        logging.info(f"delete_stmt::: {' '.join(delete_stmt.split())}")
-        try:
-            with session.begin() as conn:
-                conn.execute(delete_stmt)
-        except Exception as e:
-            logging.error(f"delete_table Exception::: {e}")
+        return delete_stmt
         
+    def get_copy_stmt(temp_table_name, file_column, copy_source, link_file_sprtr):
+        """
+        임시 테이블 copy 문
+        params: temp_table_name, file_column, copy_source (stdin 또는 DB서버 파일 경로), link_file_sprtr
+        return: copy_stmt
+        """
+        return f"""copy {temp_table_name} (
+            "{'", "'.join(file_column)}"
+        ) from {copy_source} delimiter '{link_file_sprtr}' csv header encoding 'UTF-8';
+        """
+
     def copy_temp_table(temp_table_name, loading_data_list, db_ssh_temp_path, file_name, link_file_sprtr):
         """
         임시 테이블에 copy
@@ -949,10 +959,7 @@ def csv_to_dw_hadoop():
         #) from '{db_ssh_temp_path}{file_name}' delimiter '{link_file_sprtr}' csv header encoding 'UTF-8';
         #"""
 
-        copy_stmt = f"""copy {temp_table_name} (
-            "{'", "'.join(file_column)}"
-        ) from '/var/lib/postgresql/temp/DwTemp/{file_name}' delimiter '{link_file_sprtr}' csv header encoding 'UTF-8';
-        """
+        copy_stmt = get_copy_stmt(temp_table_name, file_column, f"'/var/lib/postgresql/temp/DwTemp/{file_name}'", link_file_sprtr)
         # local test
 
         logging.info(f"copy_stmt::: {' '.join(copy_stmt.split())}")
@@ -962,6 +969,30 @@ def csv_to_dw_hadoop():
         except Exception as e:
             logging.error(f"copy_temp_table Exception::: {e}")
     
+    def copy_temp_table_stdin(temp_table_name, loading_data_list, full_file_name, link_file_sprtr):
+        """
+        임시 테이블에 copy (로컬 파일을 COPY FROM STDIN 으로 스트리밍, DB서버 파일 전송 및 서버 파일 읽기 권한 불필요)
+        params: temp_table_name, loading_data_list, full_file_name, link_file_sprtr
+        """
+        file_column = loading_data_list['file_column']
+
+        copy_stmt = get_copy_stmt(temp_table_name, file_column, "stdin", link_file_sprtr)
+
+        logging.info(f"copy_stmt::: {' '.join(copy_stmt.split())}")
+        try:
+            conn = engine.raw_connection()  # gsdpdb_db_conn 커넥션 풀 사용
+            try:
+                with conn.cursor() as cursor, open(full_file_name, 'rb') as file:
+                    cursor.copy_expert(copy_stmt, file)
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+            finally:
+                conn.close()
+        except Exception as e:
+            logging.error(f"copy_temp_table_stdin Exception::: {e}")
+
     def insert_table(tn_data_bsc_info, loading_data_list, temp_table_name):
         """
         DW 테이블에 입력
@@ -973,11 +1004,7 @@ def csv_to_dw_hadoop():
         file_column = loading_data_list['file_column']
 
         # if dtst_cd != 'data32':
-        insert_stmt = f"""
-            INSERT INTO {dw_tbl_phys_nm} (
-                "{'", "'.join(file_column)}"
-            ) SELECT "{'", "'.join(file_column)}" FROM {temp_table_name}
-        """
+        insert_stmt = get_insert_stmt(dw_tbl_phys_nm, file_column, temp_table_name)
 
         logging.info(f"insert_stmt::: {' '.join(insert_stmt.split())}")
         try:
@@ -986,6 +1013,63 @@ def csv_to_dw_hadoop():
         except Exception as e:
             logging.error(f"insert_table Exception::: {e}")
 
+    def get_insert_stmt(dw_tbl_phys_nm, file_column, temp_table_name):
+        """
+        임시 테이블 -> DW 테이블 입력문
+        params: dw_tbl_phys_nm, file_column, temp_table_name
+        return: insert_stmt
+        """
+        return f"""
+            INSERT INTO {dw_tbl_phys_nm} (
+                "{'", "'.join(file_column)}"
+            ) SELECT "{'", "'.join(file_column)}" FROM {temp_table_name}
+        """
+
+    def load_dw_table(tn_data_bsc_info, loading_data_list, data_crtr_pnttm, temp_table_name, full_file_name, copy_source, link_file_sprtr):
+        """
+        임시 테이블 생성, copy, DW 테이블 delete, insert 를 하나의 트랜잭션으로 실행 (실패 시 전체 rollback 후 raise)
+        임시 테이블은 TEMP (WAL 미기록, commit 시 삭제), 조회 세션에는 commit 전까지 기존 DW 데이터가 보임
+        params: tn_data_bsc_info, loading_data_list, data_crtr_pnttm, temp_table_name, full_file_name, copy_source (stdin 또는 DB서버 파일 경로), link_file_sprtr
+        return: copy_count 임시 테이블 copy 건수
+        """
+        file_column = loading_data_list['file_column']
+        dtypedict = dtype_mapping(file_column, loading_data_list['dw_column_dict'])
+        stmt_list = [
+            ("create_stmt", get_create_temp_stmt(temp_table_name, dtypedict, "TEMP")),
+            ("copy_stmt", get_copy_stmt(temp_table_name, file_column, copy_source, link_file_sprtr)),
+            ("delete_stmt", get_delete_stmt(tn_data_bsc_info, data_crtr_pnttm, temp_table_name)),
+            ("insert_stmt", DwUtil.get_upsert_stmt(tn_data_bsc_info, file_column, temp_table_name) if tn_data_bsc_info.dw_load_mthd_cd.lower() in ("upsert", "upsert_all")
+                            else get_insert_stmt(tn_data_bsc_info.dw_tbl_phys_nm, file_column, temp_table_name)),
+        ]
+        copy_count = 0
+        conn = engine.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                for stmt_name, stmt in stmt_list:
+                    if stmt_name == "delete_stmt" and tn_data_bsc_info.dw_load_mthd_cd.lower() == "partition":
+                        for partition_stmt in DwUtil.get_partition_stmt_list(cursor, tn_data_bsc_info, temp_table_name):
+                            logging.info(f"partition_stmt::: {partition_stmt}")
+                            cursor.execute(partition_stmt)
+                        continue
+                    if not stmt.strip():
+                        continue
+                    logging.info(f"{stmt_name}::: {' '.join(stmt.split())}")
+                    if stmt_name == "copy_stmt" and copy_source == "stdin":
+                        with open(full_file_name, 'rb') as file:
+                            cursor.copy_expert(stmt, file)
+                    else:
+                        cursor.execute(stmt)
+                    if stmt_name == "copy_stmt":
+                        copy_count = cursor.rowcount
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"load_dw_table Exception::: {e}")
+            raise e
+        finally:
+            conn.close()
+        return copy_count
+
     def check_loading_result(tn_data_bsc_info, data_crtr_pnttm):
         """
         DW 적재 결과 확인 (copy 실패 확인)
@@ -1011,11 +1095,11 @@ def csv_to_dw_hadoop():
 
     
     ext_data_list = select_ext_data_list_info()
-    active_namenode = get_active_namenode()
     loading_data_lists = select_loading_data_list_info()
     lists_column_info = get_data_type(loading_data_lists)
+    dw_loading_groups = group_dw_loading_lists(lists_column_info)
 
-    ext_data_list >> unzip_decrypt_file(ext_data_list) >> check_file_in_final_path() >> move_file_to_hadoop(active_namenode) >> loading_data_lists >> create_temp_file_in_db(loading_data_lists) >> lists_column_info >> dw_loading(lists_column_info)
+    ext_data_list >> unzip_decrypt_file(ext_data_list) >> check_file_in_final_path() >> move_file_to_hadoop() >> loading_data_lists >> create_temp_file_in_db(loading_data_lists) >> lists_column_info >> dw_loading_groups >> dw_loading.expand(dw_loading_group = dw_loading_groups)
 
 dag_object = csv_to_dw_hadoop()
 
@@ -4,7 +4,7 @@ import os
 
 from pendulum import datetime, now, from_format
 from airflow.decorators import dag, task, task_group
-from util.common_util import CommonUtil
+from util.common_util import CommonUtil, LogRecorder
 from dto.tn_data_bsc_info import TnDataBscInfo
 from dto.th_data_clct_mastr_log import ThDataClctMastrLog
 from dto.tn_clct_file_info import TnClctFileInfo
@@ -126,210 +126,201 @@ def xml_to_csv_esb():
             row_count = 0  # 행 개수
             file_exist = False  # 파일 존재 여부
 
-            try:
-                for file in os.listdir(esb_file_path):
-                    print("비교하는 file명 : "+file)
-                    print("실행하는 날짜 확인 : "+data_interval_end.strftime("%Y%m%d"))
-                    if (file.startswith(data_interval_end.strftime("%Y%m%d"))):
-                        source_file_name = file
+            with LogRecorder(session) as log_recorder:  # 상태 로그는 task 종료 시 (예외 포함) 모아서 기록
+                try:
+                    for file in os.listdir(esb_file_path):
+                        print("비교하는 file명 : "+file)
+                        print("실행하는 날짜 확인 : "+data_interval_end.strftime("%Y%m%d"))
+                        if (file.startswith(data_interval_end.strftime("%Y%m%d"))):
+                            source_file_name = file
+                            # source_file_full_path = os.path.join(esb_file_path, source_file_name)
+                            # error_file_full_path = os.path.join(error_file_path, source_file_name)
+                            file_exist = True
+                            logging.info(f"파일 발견: {source_file_name}")
+                            break
+
+                    if file_exist == False:  # 파일 존재하지않을 때
+                        logging.error("파일이 존재하지 않습니다.")
+                        raise Exception(CONST.MSG_CLCT_COMP_NO_DATA)
+                
+                        # source_file_name = file
                         # source_file_full_path = os.path.join(esb_file_path, source_file_name)
                         # error_file_full_path = os.path.join(error_file_path, source_file_name)
-                        file_exist = True
-                        logging.info(f"파일 발견: {source_file_name}")
-                        break
-
-                if file_exist == False:  # 파일 존재하지않을 때
-                    logging.error("파일이 존재하지 않습니다.")
-                    raise Exception(CONST.MSG_CLCT_COMP_NO_DATA)
-                
-                    # source_file_name = file
-                    # source_file_full_path = os.path.join(esb_file_path, source_file_name)
-                    # error_file_full_path = os.path.join(error_file_path, source_file_name)
 
-                # 가능한 인코딩 목록 정의
-                xml_content = None
-                encodings = ['utf-8', 'euc-kr', 'cp949']
+                    # 가능한 인코딩 목록 정의
+                    xml_content = None
+                    encodings = ['utf-8', 'euc-kr', 'cp949']
                 
-                for encoding in encodings:
-                    try:
-                        logging.info(f"Source file path: {os.path.join(esb_file_path, source_file_name)}")
-                        logging.info(f"Does source file exist: {os.path.exists(os.path.join(esb_file_path, source_file_name))}")
+                    for encoding in encodings:
+                        try:
+                            logging.info(f"Source file path: {os.path.join(esb_file_path, source_file_name)}")
+                            logging.info(f"Does source file exist: {os.path.exists(os.path.join(esb_file_path, source_file_name))}")
     
-                        # 파일을 시도된 인코딩으로 읽음
-                        with open(os.path.join(esb_file_path, source_file_name), 'r', encoding=encoding) as f:
-                            xml_content = f.read()
-                        logging.info(f"파일을 성공적으로 읽었습니다. 인코딩: {encoding}")
-                        logging.info(f"sssss First 300 characters of XML content: {xml_content[:300]}")                            
-                        break  # 성공적으로 읽었다면 루프 종료
-                    except UnicodeDecodeError:
-                        logging.warning(f"Encoding {encoding} failed for file {source_file_name}. Trying next...")
-                    except FileNotFoundError:
-                        logging.error(f"File not found: {os.path.join(esb_file_path, source_file_name)}")
-                        break
-                    except Exception as e:
-                        logging.error(f"Unexpected error while reading file {source_file_name}: {e}")
-                        break
-
-                # 파일 읽기가 실패한 경우 건너뛰기
-                if xml_content is None:
-                    logging.error("XML 내용을 읽지 못했습니다.")
-                    raise Exception("파일 읽기 실패")
-                    # try:
-                    #     shutil.move(source_file_full_path, error_file_full_path)
-                    #     logging.warning(f"Moved failed file {source_file_name} to error directory {error_file_path}.")
-                    # except Exception as e:
-                    #     logging.error(f"Failed to move file {source_file_name} to error directory: {e}")
+                            # 파일을 시도된 인코딩으로 읽음
+                            with open(os.path.join(esb_file_path, source_file_name), 'r', encoding=encoding) as f:
+                                xml_content = f.read()
+                            logging.info(f"파일을 성공적으로 읽었습니다. 인코딩: {encoding}")
+                            logging.info(f"sssss First 300 characters of XML content: {xml_content[:300]}")                            
+                            break  # 성공적으로 읽었다면 루프 종료
+                        except UnicodeDecodeError:
+                            logging.warning(f"Encoding {encoding} failed for file {source_file_name}. Trying next...")
+                        except FileNotFoundError:
+                            logging.error(f"File not found: {os.path.join(esb_file_path, source_file_name)}")
+                            break
+                        except Exception as e:
+                            logging.error(f"Unexpected error while reading file {source_file_name}: {e}")
+                            break
+
+                    # 파일 읽기가 실패한 경우 건너뛰기
+                    if xml_content is None:
+                        logging.error("XML 내용을 읽지 못했습니다.")
+                        raise Exception("파일 읽기 실패")
+                        # try:
+                        #     shutil.move(source_file_full_path, error_file_full_path)
+                        #     logging.warning(f"Moved failed file {source_file_name} to error directory {error_file_path}.")
+                        # except Exception as e:
+                        #     logging.error(f"Failed to move file {source_file_name} to error directory: {e}")
                     
 
-                # XML 내용 일부를 로깅 (xml_content가 None이 아닌 경우에만)
-                # logging.info(f"First 300 characters of XML content in {source_file_name}: {xml_content[:300]}")
+                    # XML 내용 일부를 로깅 (xml_content가 None이 아닌 경우에만)
+                    # logging.info(f"First 300 characters of XML content in {source_file_name}: {xml_content[:300]}")
 
-                # XML 파싱
-                try:
-                    json_data = XMLtoDict().parse(xml_content)
-                    logging.info(f"구문 분석 성공한 xml 파일 : {source_file_name}")
+                    # XML 파싱
+                    try:
+                        json_data = XMLtoDict().parse(xml_content)
+                        logging.info(f"구문 분석 성공한 xml 파일 : {source_file_name}")
 
-                    # JSON 데이터 확인
-                    logging.info(f"JSON 변환 성공. 첫 300자: {str(json_data)[:300]}")
-                except Exception as e:
-                    logging.error(f"Error parsing XML file {source_file_name}: {e}")
-                    raise
+                        # JSON 데이터 확인
+                        logging.info(f"JSON 변환 성공. 첫 300자: {str(json_data)[:300]}")
+                    except Exception as e:
+                        logging.error(f"Error parsing XML file {source_file_name}: {e}")
+                        raise
 
-                result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
-                result_json = result['result_json_array']
+                    result = CallUrlUtil.read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, tn_data_bsc_info.data_se_col_one)
+                    result_json = result['result_json_array']
 
-                logging.info(f"dtst_nm: {tn_data_bsc_info.dtst_nm}")
-                logging.info(f"clct_data_nm: {th_data_clct_mastr_log.clct_data_nm}")
+                    logging.info(f"dtst_nm: {tn_data_bsc_info.dtst_nm}")
+                    logging.info(f"clct_data_nm: {th_data_clct_mastr_log.clct_data_nm}")
 
-                dtst_se_val = {
-                    "국민신문고_신문고민원_신청" : "Petition",
-                    "국민신문고_신문고민원_접수" : "Receipt",
-                    "국민신문고_신문고민원_처리" : "Process" }.get(th_data_clct_mastr_log.clct_data_nm)
+                    dtst_se_val = {
+                        "국민신문고_신문고민원_신청" : "Petition",
+                        "국민신문고_신문고민원_접수" : "Receipt",
+                        "국민신문고_신문고민원_처리" : "Process" }.get(th_data_clct_mastr_log.clct_data_nm)
                 
-                result_json = [item for item in result_json if item.get('dtst_se') == dtst_se_val]
+                    result_json = [item for item in result_json if item.get('dtst_se') == dtst_se_val]
                 
-                # # JSON 데이터 필터링
-                # dtst_se_val_normalized = dtst_se_val.lower()
-                # filtered_result_json = [
-                #     item for item in result_json if item.get('dtst_se', '').strip().lower() == dtst_se_val_normalized
-                # ]
-
-                # # 필터링된 결과 확인
-                # if not filtered_result_json:
-                #     logging.error(f"No matching data for dtst_se_val: {dtst_se_val_normalized}. Check source JSON.")
-                #     logging.info(f"Full JSON data: {result_json[:5]}")  # 디버깅용
-                #     raise ValueError(f"No matching data for dtst_se_val: {dtst_se_val_normalized}")
-                # else:
-                #     logging.info(f"Filtered JSON data: {filtered_result_json[:3]}")
-
-            # 컬럼 존재하지않는 경우 예외 처리
-                get_data_column_stmt = f"""
-                    SELECT column_name
-                    FROM information_schema.columns
-                    WHERE table_name = '{tn_data_bsc_info.dw_tbl_phys_nm}'
-                    AND column_name NOT IN ('data_crtr_pnttm','clct_sn','clct_pnttm','clct_log_sn','page_no')
-                    ORDER BY ordinal_position
-                """
-                # json 결과 값이랑 db 컬럼이랑 비교해서 없는 컬럼들 데이터값은 None값으로 한 걸 추가해서 new json result 값으로 만든다음에 csv 로 만듦.
-                with session.begin() as conn:
-                    dw_column_dict = []  # DW 컬럼명
-                    for dict_row in conn.execute(get_data_column_stmt).all():
-                        dw_column_dict.append(dict_row[0])
-
-                new_result_json = []
-                for dict_value in result_json:
-                    new_dict = {}
-                    # dict_value의 키들을 소문자로 변환한 새로운 딕셔너리 생성
-                    for key, value in dict_value.items():
-                        if isinstance(value, dict):
-                            for sub_key, sub_value in value.items():
-                                new_key = f'{key}_{sub_key}'
-                                new_dict[new_key] = sub_value
-                        else:
-                            new_dict[key] = value
-
-                    # 소문자로 변환한 딕셔너리로 누락된 컬럼을 체크하기 위해 lowercase_new_dict 생성
-                    lowercase_new_dict = {key.lower(): value for key, value in new_dict.items()}
+                    # # JSON 데이터 필터링
+                    # dtst_se_val_normalized = dtst_se_val.lower()
+                    # filtered_result_json = [
+                    #     item for item in result_json if item.get('dtst_se', '').strip().lower() == dtst_se_val_normalized
+                    # ]
+
+                    # # 필터링된 결과 확인
+                    # if not filtered_result_json:
+                    #     logging.error(f"No matching data for dtst_se_val: {dtst_se_val_normalized}. Check source JSON.")
+                    #     logging.info(f"Full JSON data: {result_json[:5]}")  # 디버깅용
+                    #     raise ValueError(f"No matching data for dtst_se_val: {dtst_se_val_normalized}")
+                    # else:
+                    #     logging.info(f"Filtered JSON data: {filtered_result_json[:3]}")
+
+                # 컬럼 존재하지않는 경우 예외 처리
+                    # json 결과 값이랑 db 컬럼이랑 비교해서 없는 컬럼들 데이터값은 None값으로 한 걸 추가해서 new json result 값으로 만든다음에 csv 로 만듦.
+                    dw_column_dict = CommonUtil.get_dw_column_list(session, tn_data_bsc_info.dw_tbl_phys_nm)  # DW 컬럼명 (캐시 사용)
+
+                    new_result_json = []
+                    for dict_value in result_json:
+                        new_dict = {}
+                        # dict_value의 키들을 소문자로 변환한 새로운 딕셔너리 생성
+                        for key, value in dict_value.items():
+                            if isinstance(value, dict):
+                                for sub_key, sub_value in value.items():
+                                    new_key = f'{key}_{sub_key}'
+                                    new_dict[new_key] = sub_value
+                            else:
+                                new_dict[key] = value
+
+                        # 소문자로 변환한 딕셔너리로 누락된 컬럼을 체크하기 위해 lowercase_new_dict 생성
+                        lowercase_new_dict = {key.lower(): value for key, value in new_dict.items()}
                     
-                    # dw_column_dict에서 누락된 컬럼을 new_dict에 추가
-                    for missing_column in dw_column_dict:
-                        if missing_column not in lowercase_new_dict and dtst_se_val != 'Process':
-                            # update_column에 대해 적절한 대소문자 형태로 지정
-                            update_column = {
-                                "cancel_date": "Cancel_date",
-                                "cancel_datetime": "Cancel_dateTime",
-                                "cancel_reason": "Cancel_reason",
-                                "expand_title": "Expand_title",
-                                "expand_reason": "Expand_reason",
-                                "satisfy_content": "Satisfy_Content",
-                                "satisfy_moreword": "Satisfy_moreWord",
-                                "satisfy_regdate": "Satisfy_regDate",
-                                "satisfy_regdatetime": "Satisfy_regDateTime"
-                            }.get(missing_column, missing_column)  # 매핑이 없으면 기본적으로 소문자로 추가
-
-                            new_dict[update_column] = None  # 누락된 컬럼을 None으로 추가
-
-                    # 누락된 컬럼이 모두 추가된 new_dict를 new_result_json에 포함
-                    new_result_json.append(new_dict)
-
-                result_size = len(new_result_json)
-                logging.info(f"최종 JSON 데이터 크기 (CSV 변환용): {result_size}")
-
-                if result_size > 0:
-                    # JSON 데이터의 첫 3개 로깅
-                    logging.info(f"First 3 entries of new_result_json: {new_result_json[:3]}")
-                else:
-                    logging.warning("new_result_json is empty after filtering.")
-
-                # 신문고민원_처리 데이터 비식별 처리
-                if dtst_se_val == 'Process':
-                    for item in new_result_json:
-                        #logging.info(f"dutyId: {item['dutyId']}, dutyName: {item['dutyName']}") 
-                        item['dutyId'] = CallUrlUtil.anonymize(item.get('dutyId', ''))
-                        item['dutyName'] = CallUrlUtil.anonymize(item.get('dutyName', ''))
-                        # 비식별화된 데이터 로깅
-                        #logging.info(f"비식별화된 dutyId: {item['dutyId']}, dutyName: {item['dutyName']}")
+                        # dw_column_dict에서 누락된 컬럼을 new_dict에 추가
+                        for missing_column in dw_column_dict:
+                            if missing_column not in lowercase_new_dict and dtst_se_val != 'Process':
+                                # update_column에 대해 적절한 대소문자 형태로 지정
+                                update_column = {
+                                    "cancel_date": "Cancel_date",
+                                    "cancel_datetime": "Cancel_dateTime",
+                                    "cancel_reason": "Cancel_reason",
+                                    "expand_title": "Expand_title",
+                                    "expand_reason": "Expand_reason",
+                                    "satisfy_content": "Satisfy_Content",
+                                    "satisfy_moreword": "Satisfy_moreWord",
+                                    "satisfy_regdate": "Satisfy_regDate",
+                                    "satisfy_regdatetime": "Satisfy_regDateTime"
+                                }.get(missing_column, missing_column)  # 매핑이 없으면 기본적으로 소문자로 추가
+
+                                new_dict[update_column] = None  # 누락된 컬럼을 None으로 추가
+
+                        # 누락된 컬럼이 모두 추가된 new_dict를 new_result_json에 포함
+                        new_result_json.append(new_dict)
+
+                    result_size = len(new_result_json)
+                    logging.info(f"최종 JSON 데이터 크기 (CSV 변환용): {result_size}")
+
+                    if result_size > 0:
+                        # JSON 데이터의 첫 3개 로깅
+                        logging.info(f"First 3 entries of new_result_json: {new_result_json[:3]}")
+                    else:
+                        logging.warning("new_result_json is empty after filtering.")
+
+                    # 신문고민원_처리 데이터 비식별 처리
+                    if dtst_se_val == 'Process':
+                        for item in new_result_json:
+                            #logging.info(f"dutyId: {item['dutyId']}, dutyName: {item['dutyName']}") 
+                            item['dutyId'] = CallUrlUtil.anonymize(item.get('dutyId', ''))
+                            item['dutyName'] = CallUrlUtil.anonymize(item.get('dutyName', ''))
+                            # 비식별화된 데이터 로깅
+                            #logging.info(f"비식별화된 dutyId: {item['dutyId']}, dutyName: {item['dutyName']}")
                         
-                # 신문고민원_신청 데이터 비식별 처리 (cellPhone    linePhone    birthDate    sex)
-                if dtst_se_val == 'Petition': 
-                    for item in new_result_json:
-                        logging.info(f"Petitioner_cellPhone: {item['Petitioner_cellPhone']}") 
-                        item['Petitioner_cellPhone'] = CallUrlUtil.anonymize(item.get('Petitioner_cellPhone', ''))
-                        item['Petitioner_linePhone'] = CallUrlUtil.anonymize(item.get('Petitioner_linePhone', ''))
-                        item['Petitioner_birthDate'] = CallUrlUtil.anonymize(item.get('Petitioner_birthDate', ''))
-                        item['Petitioner_sex'] = CallUrlUtil.anonymize(item.get('Petitioner_sex', ''))
-                        logging.info(f"비식별화된 Petitioner_cellPhone: {item['Petitioner_cellPhone']}, Petitioner_sex: {item['Petitioner_sex']}")
-
-                # 데이터 존재 시
-                if result_size != 0:
-                    # csv 파일 생성
-                    CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, new_result_json, header, mode, page_no)
-
-                row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
-                if row_count != 0:
-                    logging.info(f"현재까지 파일 내 행 개수: {row_count}")
+                    # 신문고민원_신청 데이터 비식별 처리 (cellPhone    linePhone    birthDate    sex)
+                    if dtst_se_val == 'Petition': 
+                        for item in new_result_json:
+                            logging.info(f"Petitioner_cellPhone: {item['Petitioner_cellPhone']}") 
+                            item['Petitioner_cellPhone'] = CallUrlUtil.anonymize(item.get('Petitioner_cellPhone', ''))
+                            item['Petitioner_linePhone'] = CallUrlUtil.anonymize(item.get('Petitioner_linePhone', ''))
+                            item['Petitioner_birthDate'] = CallUrlUtil.anonymize(item.get('Petitioner_birthDate', ''))
+                            item['Petitioner_sex'] = CallUrlUtil.anonymize(item.get('Petitioner_sex', ''))
+                            logging.info(f"비식별화된 Petitioner_cellPhone: {item['Petitioner_cellPhone']}, Petitioner_sex: {item['Petitioner_sex']}")
+
+                    # 데이터 존재 시
+                    if result_size != 0:
+                        # csv 파일 생성
+                        CallUrlUtil.create_csv_file(link_file_sprtr, th_data_clct_mastr_log.data_crtr_pnttm, th_data_clct_mastr_log.clct_log_sn, full_file_path, file_name, new_result_json, header, mode, page_no)
+
+                    row_count = FileUtil.check_csv_length(link_file_sprtr, full_file_name)  # 행 개수 확인
+                    if row_count != 0:
+                        logging.info(f"현재까지 파일 내 행 개수: {row_count}")
                 
-                # 파일 사이즈 확인
-                if os.path.exists(full_file_name):
-                    file_size = os.path.getsize(full_file_name)
-                logging.info(f"call_url file_size::: {file_size}")
-
-                # logging.info(f"수집 끝")
-                if row_count == 0:
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
-                    raise AirflowSkipException()
-                else:
-                    # tn_clct_file_info 수집파일정보
-                    tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
+                    # 파일 사이즈 확인
+                    if os.path.exists(full_file_name):
+                        file_size = os.path.getsize(full_file_name)
+                    logging.info(f"call_url file_size::: {file_size}")
+
+                    # logging.info(f"수집 끝")
+                    if row_count == 0:
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP_NO_DATA, "n")
+                        raise AirflowSkipException()
+                    else:
+                        # tn_clct_file_info 수집파일정보
+                        tn_clct_file_info = CommonUtil.set_file_info(TnClctFileInfo(), th_data_clct_mastr_log, tn_clct_file_info.insd_file_nm, file_path, tn_data_bsc_info.link_file_extn, file_size, None)
                     
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
-                    if link_file_crt_yn == "y":
-                        CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
-                    CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_FILE_INSD_SEND, CONST.STTS_COMP, CONST.MSG_FILE_INSD_SEND_COMP_INT, "n")
-            except Exception as e:
-                CommonUtil.update_log_table(log_full_file_path, tn_clct_file_info, session, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
-                logging.error(f"call_url Exception::: {e}")
-                raise e
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_COMP, CONST.MSG_CLCT_COMP, "n")
+                        if link_file_crt_yn == "y":
+                            CommonUtil.update_file_info_table(session, th_data_clct_mastr_log, tn_clct_file_info, tn_clct_file_info.insd_file_nm, file_path, tn_clct_file_info.insd_file_extn, file_size)
+                        log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_FILE_INSD_SEND, CONST.STTS_COMP, CONST.MSG_FILE_INSD_SEND_COMP_INT, "n")
+                except Exception as e:
+                    log_recorder.record(log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, CONST.STEP_CLCT, CONST.STTS_ERROR, CONST.MSG_CLCT_ERROR_CALL, "n")
+                    logging.error(f"call_url Exception::: {e}")
+                    raise e
     
         file_path = create_directory(collect_data_list)
         file_path >> call_url(collect_data_list, file_path)
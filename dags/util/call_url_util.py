@@ -1,21 +1,48 @@
 import os
+import codecs
 import pandas as pd
 import logging
 from math import trunc
 import json
 import re
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from util.date_custom_util import DateUtil
 from util.file_util import FileUtil
 from dto.tc_com_dtl_cd import TcCmmnDtlCd as CONST
 # import 
 
+# http 연결 기본 설정 (Variable http_client_config 의 default, pvdr_site_cd, dtst_cd 순으로 덮어씀)
+HTTP_CONFIG_DEFAULT = {
+    "pool_connections" : 1,  # host별 connection pool 개수
+    "pool_maxsize" : 10,  # pool 내 최대 connection 개수
+    "connect_timeout" : 10,  # 연결 timeout (초)
+    "read_timeout" : 300,  # 응답 timeout (초)
+    "keep_alive" : True,  # connection 재사용 여부
+    "verify" : False,  # ssl 인증서 검증 여부
+    "page_concurrency" : 1,  # total_page 확인 후 동시 호출 페이지 수 (1: 순차 호출)
+    "retry_max" : 5,  # 최대 재시도 횟수
+    "retry_base_delay" : 1,  # 재시도 대기 기본 시간 (초), 재시도마다 2배
+    "retry_max_delay" : 60,  # 재시도 대기 최대 시간 (초)
+    "retry_rules" : {},  # 에러 유형별 재시도 규칙 덮어쓰기 예) {"http_4xx": {"max_retries": 0}, "no_data": {"base_delay": 30, "jitter": false}}
+}
+http_session_dict = {}  # 제공처 host별 requests.Session (worker 프로세스 내 재사용)
+http_session_lock = threading.Lock()
+json_path_plan_dict = {}  # dtst_cd별 list_keywords, search_keyword 경로 (첫 페이지에서 확인 후 재사용)
+
 class CallUrlUtil:
     def read_json(json_data, pvdr_site_cd, pvdr_inst_cd, dtst_cd, add_column):
         """
         json_data 를 search_keyword, list_keyword에 따라 parsing
+        dtst_cd별 list_keywords, search_keyword 경로를 저장해 다음 페이지부터 경로로 바로 조회 (응답 형태가 다르면 전체 탐색)
         params: json_data
         return: result_json_array, total_count (json파일에 나와있는 데이터 총 개수)
         """
@@ -25,7 +52,15 @@ class CallUrlUtil:
         result_json_array = []  # list_keywords 에 해당하는 데이터 리스트
         total_count = 0
         ignore_column = CallUrlUtil.get_ignore_column(dtst_cd)
-        result_json_array = CallUrlUtil.recursive_json_for_keyword(json_data, list_keywords, search_keyword, search_result, result_json_array,ignore_column, add_column, dtst_cd)
+
+        json_path_plan = json_path_plan_dict.get(dtst_cd)
+        if json_path_plan is not None:
+            result_json_array = CallUrlUtil.read_json_path(json_data, json_path_plan, list_keywords, search_keyword, search_result, ignore_column, add_column)
+        if json_path_plan is None or result_json_array is None:
+            search_result = {}
+            json_path_plan = {"list_paths" : [], "search_path" : None}
+            result_json_array = CallUrlUtil.recursive_json_for_keyword(json_data, list_keywords, search_keyword, search_result, [], ignore_column, add_column, dtst_cd, (), json_path_plan)
+            CallUrlUtil.set_json_path_plan(json_data, json_path_plan, list_keywords, dtst_cd)
 
         if len(result_json_array) != 0:
             if search_keyword == "":
@@ -39,7 +74,55 @@ class CallUrlUtil:
             'result_json_array' : result_json_array,
             'total_count' : total_count
             }
-    
+
+    def set_json_path_plan(json_data, json_path_plan, list_keywords, dtst_cd):
+        """
+        전체 탐색 결과 경로 저장 (배열 내부 경로, 데이터 없는 응답은 저장하지 않음)
+        params: json_data, json_path_plan, list_keywords, dtst_cd
+        """
+        list_paths = json_path_plan['list_paths']
+        search_path = json_path_plan['search_path']
+        if list_keywords == "" or not list_paths or any(None in path for path in list_paths) or (search_path is not None and None in search_path):
+            json_path_plan_dict.pop(dtst_cd, None)
+            return
+        if all(isinstance(CallUrlUtil.get_json_path_value(json_data, path), (dict, list)) for path in list_paths):
+            json_path_plan_dict[dtst_cd] = json_path_plan
+
+    def get_json_path_value(json_data, json_path):
+        """
+        경로에 해당하는 값 조회
+        params: json_data, json_path (key tuple)
+        return: value (경로 없으면 None)
+        """
+        for key in json_path:
+            if not isinstance(json_data, dict) or key not in json_data:
+                return None
+            json_data = json_data[key]
+        return json_data
+
+    def read_json_path(json_data, json_path_plan, list_keywords, search_keyword, search_result, ignore_column, add_column):
+        """
+        저장된 경로로 list_keywords, search_keyword 값 조회
+        params: json_data, json_path_plan, list_keywords, search_keyword, search_result, ignore_column, add_column
+        return: result_json_array (경로가 맞지 않으면 None)
+        """
+        list_values = []
+        for list_path in json_path_plan['list_paths']:
+            value = CallUrlUtil.get_json_path_value(json_data, list_path)
+            if not isinstance(value, (dict, list)):
+                return None
+            list_values.append((list_path[-1], value))
+        if json_path_plan['search_path'] is not None:
+            search_value = CallUrlUtil.get_json_path_value(json_data, json_path_plan['search_path'])
+            if search_value is None:
+                return None
+            search_result[search_keyword] = search_value
+
+        result_json_array = []
+        for list_keyword, value in list_values:
+            CallUrlUtil.parsing_list_keyword(value, list_keyword, list_keywords, result_json_array, ignore_column, add_column)
+        return result_json_array
+
     def get_ignore_column(dtst_cd):
         """
         dtst_cd별 수집하지 않을 key 설정
@@ -51,7 +134,7 @@ class CallUrlUtil:
                         }.get(dtst_cd, "")
         return ignore_column
     
-    def recursive_json_for_keyword(json_data, list_keywords, search_keyword, search_result, result_json_array,ignore_column, add_column,dtst_cd):
+    def recursive_json_for_keyword(json_data, list_keywords, search_keyword, search_result, result_json_array,ignore_column, add_column,dtst_cd, json_path = (), json_path_plan = None):
         # # json 배열인 경우
         if isinstance(json_data, list):
             for item in json_data:
@@ -64,38 +147,52 @@ class CallUrlUtil:
                             temp_dict = CallUrlUtil.parsing_value(temp_dict, key, values, ignore_column)
                         result_json_array.append(temp_dict)
                     else:
-                        # 재귀적으로 하위 객체에서 데이터를 추출하여 배열에 담음
-                        CallUrlUtil.recursive_json_for_keyword(item, list_keywords, search_keyword, search_result, result_json_array,ignore_column, add_column, dtst_cd)
+                        # 재귀적으로 하위 객체에서 데이터를 추출하여 배열에 담음 (배열 내부 경로는 None)
+                        CallUrlUtil.recursive_json_for_keyword(item, list_keywords, search_keyword, search_result, result_json_array,ignore_column, add_column, dtst_cd, json_path + (None,), json_path_plan)
         # json 객체인 경우
         if isinstance(json_data, dict):
             # list_keyword 에 해당하는 경우
             for list_keyword in list_keywords:
                 if list_keyword in json_data:
-                    value = json_data.get(list_keyword)
-                    if isinstance(value, dict):  # 객체일 경우
-                        temp_dict = {}
-                        for key, values in value.items():
-                            if ignore_column == key:
-                                continue
-                            temp_dict = CallUrlUtil.parsing_value(temp_dict, key, values,ignore_column)
-                        result_json_array.append(temp_dict)
-                    elif isinstance(value, list):  # 배열일 경우
-                        for item in value:
-                            temp_dict = {}
-                            for key, values in item.items():
-                                temp_dict = CallUrlUtil.parsing_value(temp_dict, key, values,ignore_column)
-                                if len(list_keywords) > 1:  # 도서관별 인기대출도서 통합 예외 (list_keywords 컬럼 구분 값 추가), 신문고 민원
-                                    add_dict = {add_column : list_keyword}
-                                    temp_dict.update(add_dict)
-                            result_json_array.append(temp_dict)
+                    CallUrlUtil.parsing_list_keyword(json_data.get(list_keyword), list_keyword, list_keywords, result_json_array, ignore_column, add_column)
+                    if json_path_plan is not None:
+                        json_path_plan['list_paths'].append(json_path + (list_keyword,))
             # 재귀적으로 하위 객체에서 데이터를 추출하여 배열에 담음
             for key, value in json_data.items():
                 if (isinstance(value, dict) or isinstance(value, list)) and (key not in list_keywords):
-                    CallUrlUtil.recursive_json_for_keyword(value, list_keywords, search_keyword, search_result, result_json_array,ignore_column, add_column, dtst_cd)
+                    CallUrlUtil.recursive_json_for_keyword(value, list_keywords, search_keyword, search_result, result_json_array,ignore_column, add_column, dtst_cd, json_path + (key,), json_path_plan)
                 # search_keyword 에 해당하는 값 search_result 에 담기
                 if search_keyword == key:
                     search_result[key] = value
+                    if json_path_plan is not None:
+                        json_path_plan['search_path'] = json_path + (key,)
         return result_json_array
+
+    def parsing_list_keyword(value, list_keyword, list_keywords, result_json_array, ignore_column, add_column):
+        """
+        list_keyword 에 해당하는 값을 result_json_array 에 담음
+        params: value, list_keyword, list_keywords, result_json_array, ignore_column, add_column
+        """
+        if isinstance(value, dict):  # 객체일 경우
+            temp_dict = {}
+            for key, values in value.items():
+                if ignore_column == key:
+                    continue
+                temp_dict = CallUrlUtil.parsing_value(temp_dict, key, values,ignore_column)
+            result_json_array.append(temp_dict)
+        elif isinstance(value, list):  # 배열일 경우
+            for item in value:
+                # 하위 json 없는 경우 그대로 복사
+                if len(list_keywords) == 1 and not any(isinstance(values, (dict, list)) for values in item.values()):
+                    result_json_array.append(dict(item))
+                    continue
+                temp_dict = {}
+                for key, values in item.items():
+                    temp_dict = CallUrlUtil.parsing_value(temp_dict, key, values,ignore_column)
+                    if len(list_keywords) > 1:  # 도서관별 인기대출도서 통합 예외 (list_keywords 컬럼 구분 값 추가), 신문고 민원
+                        add_dict = {add_column : list_keyword}
+                        temp_dict.update(add_dict)
+                result_json_array.append(temp_dict)
     
     def parsing_value(temp_dict, key, values, ignore_column):
         """
@@ -382,6 +479,80 @@ class CallUrlUtil:
 
 
 
+    def set_http_config(tn_data_bsc_info, kwargs):
+        """
+        제공처별 http 연결 설정
+        Variable http_client_config 예) {"default": {"read_timeout": 300}, "ps00010": {"pool_maxsize": 4}, "data19": {"read_timeout": 600}}
+        params: tn_data_bsc_info, kwargs
+        return: http_config
+        """
+        pvdr_site_cd = (tn_data_bsc_info.pvdr_site_cd or "").lower()
+        pvdr_inst_cd = (tn_data_bsc_info.pvdr_inst_cd or "").lower()  # 내부 연계 (새올, 온나라) 는 없을 수 있음
+        dtst_cd = tn_data_bsc_info.dtst_cd.lower()
+
+        http_config = dict(HTTP_CONFIG_DEFAULT)
+        http_client_config = CallUrlUtil.get_json_variable('http_client_config', kwargs)
+        for key in ("default", pvdr_site_cd, dtst_cd):
+            http_config.update(http_client_config.get(key, {}))
+
+        # 제공처(pvdr_inst_cd > pvdr_site_cd)별 호출 속도 제한
+        http_config['rate_limiter'] = RateLimiter.get_rate_limiter(CallUrlUtil.get_json_variable('rate_limit_config', kwargs), pvdr_site_cd, pvdr_inst_cd)
+        return http_config
+
+    def get_json_variable(key, kwargs):
+        """
+        json 형식 Variable 조회 (없으면 빈 dict)
+        params: key, kwargs
+        return: dict
+        """
+        try:
+            value = kwargs['var']['value'].get(key, None)
+        except Exception as e:
+            logging.info(f"get_json_variable Exception::: {e}")
+            value = None
+        if not value:
+            return {}
+        if isinstance(value, str):
+            value = json.loads(value)
+        return value
+
+    def get_http_session(return_url, http_config):
+        """
+        host별 connection pool 을 가진 keep-alive 세션 조회 (없으면 생성)
+        params: return_url, http_config
+        return: session
+        """
+        url_parts = urlparse(return_url)
+        pool_maxsize = max(int(http_config['pool_maxsize']), int(http_config.get('page_concurrency', 1)))  # 동시 호출 수 이상으로 pool 설정
+        session_key = (url_parts.scheme, url_parts.netloc, pool_maxsize, http_config['keep_alive'])
+        with http_session_lock:
+            session = http_session_dict.get(session_key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections= http_config['pool_connections'], pool_maxsize= pool_maxsize, max_retries= 0)
+                session.mount(f"{url_parts.scheme}://", adapter)
+                if not http_config['keep_alive']:
+                    session.headers['Connection'] = 'close'
+                http_session_dict[session_key] = session
+        return session
+
+    def request_url(return_url, http_config, method = "get", **request_kwargs):
+        """
+        host별 keep-alive 세션으로 url 호출 (timeout 기본 적용)
+        params: return_url, http_config, method, request_kwargs (requests 파라미터)
+        return: response
+        """
+        session = CallUrlUtil.get_http_session(return_url, http_config)
+        request_kwargs.setdefault("timeout", (http_config['connect_timeout'], http_config['read_timeout']))
+        request_kwargs.setdefault("verify", http_config['verify'])
+        rate_limiter = http_config.get('rate_limiter')
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        response = session.request(method, return_url, **request_kwargs)
+        if rate_limiter is not None:
+            rate_limiter.update(response, request_kwargs.get("stream", False))
+        return response
+
     def get_total_page(total_count, result_size):
         """
         총 페이지 수 계산
@@ -416,16 +587,54 @@ class CallUrlUtil:
             logging.info(f"{repeat_num}번째{url_message}호출 url: {return_url}")
         return header, mode
         
-    def create_csv_file(link_file_sprtr, data_crtr_pnttm, clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no):
+    def set_csv_dataframe(result_json, data_crtr_pnttm, clct_log_sn, page_no, add_column_dict = None, dw_column_list = None, dw_column_only = False):
         """
-        공통 헤더 컬럼, 값 추가 및 csv 파일 생성
-        params: link_file_sprtr, data_crtr_pnttm, clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no
+        공통 헤더 컬럼, 값 추가 및 csv 생성용 데이터프레임 설정
+        params: result_json, data_crtr_pnttm, clct_log_sn, page_no, add_column_dict (데이터 구분 컬럼, 값), dw_column_list (DW 컬럼명, 없는 컬럼은 빈 값으로 추가), dw_column_only (DW 컬럼명으로 변경 후 DW 컬럼만 저장)
+        return: df
         """
+        df = pd.json_normalize(result_json, sep= "_")
+        # 데이터프레임 비어 있는지 확인
+        if df.empty:
+            logging.error("데이터프레임이 비어 있음. CSV 파일 생성 중단.")
+            raise ValueError("데이터프레임이 비어 있음. CSV 파일 생성 불가.")
+
+        # 데이터 구분 컬럼, 값 추가
+        for add_column, add_value in (add_column_dict or {}).items():
+            df[add_column] = add_value
+
+        # 컬럼 존재하지않는 경우 예외 처리 (대소문자 구분 없이 없는 DW 컬럼 추가)
+        if dw_column_list and dw_column_only:
+            dw_column_map = {dw_column.lower(): dw_column for dw_column in dw_column_list}
+            df = df.loc[:, ~df.columns.str.lower().duplicated()]
+            df = df.rename(columns = lambda column: dw_column_map.get(column.lower(), column)).reindex(columns = dw_column_list)
+        elif dw_column_list:
+            lowercase_columns = set(df.columns.str.lower())
+            missing_columns = [missing_column for missing_column in dw_column_list if missing_column not in lowercase_columns]
+            df = df.reindex(columns = df.columns.tolist() + missing_columns)
+
         # 공통 헤더 컬럼, 값 추가
         common_dict = {"data_crtr_pnttm" : data_crtr_pnttm, "clct_pnttm" : DateUtil.get_ymdhm(), "clct_log_sn" : clct_log_sn, "page_no" : page_no}
-        for dict_value in result_json:
-            dict_value.update(common_dict)
+        for common_column, common_value in common_dict.items():
+            df[common_column] = common_value
+        df = df.replace("\n"," ", regex=True).replace("\r\n"," ", regex=True).replace("\r"," ", regex=True).apply(lambda x: (x.str.strip() if x.dtypes == 'object' and x.str._inferred_dtype == 'string' else x), axis = 0)  # 개행문자 제거, string 양 끝 공백 제거
+        return df
 
+    def is_no_clct_sn_file(file_name):
+        """
+        clct_sn 을 생성하지 않는 파일 여부 확인
+        5분_소통정보, 대기오염정보_측정소별_실시간_측정정보_조회(->대기오염_국가측정망_시간대별_측정정보), 실시간_측정정보_조회(->대기오염_자체측정망_시간대별_측정정보)
+        params: file_name
+        return: True / False
+        """
+        return '5분_소통정보' in file_name or '대기오염_국가측정망_시간대별_측정정보' in file_name or '대기오염_자체측정망_시간대별_측정정보' in file_name
+
+    def create_csv_file(link_file_sprtr, data_crtr_pnttm, clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no):
+        """
+        공통 헤더 컬럼, 값 추가 및 csv 파일 생성
+        페이지 단위로 반복 호출하는 경우 기존 파일을 매번 다시 읽지 않는 CsvSink 사용
+        params: link_file_sprtr, data_crtr_pnttm, clct_log_sn, full_file_path, file_name, result_json, header, mode, page_no
+        """
         # csv 파일 생성
         try:
             # os.chdir(full_file_path)
@@ -434,16 +643,11 @@ class CallUrlUtil:
                 os.makedirs(full_file_path)
             os.chdir(full_file_path)
 
-            df = pd.json_normalize(result_json, sep= "_")
-            # 데이터프레임 비어 있는지 확인
-            if df.empty:
-                logging.error("데이터프레임이 비어 있음. CSV 파일 생성 중단.")
-                raise ValueError("데이터프레임이 비어 있음. CSV 파일 생성 불가.")
-            df = df.replace("\n"," ", regex=True).replace("\r\n"," ", regex=True).replace("\r"," ", regex=True).apply(lambda x: (x.str.strip() if x.dtypes == 'object' and x.str._inferred_dtype == 'string' else x), axis = 0)  # 개행문자 제거, string 양 끝 공백 제거
+            df = CallUrlUtil.set_csv_dataframe(result_json, data_crtr_pnttm, clct_log_sn, page_no)
             
             full_file_name = full_file_path + file_name
             # 5분_소통정보, 대기오염정보_측정소별_실시간_측정정보_조회(->대기오염_국가측정망_시간대별_측정정보), 실시간_측정정보_조회(->대기오염_자체측정망_시간대별_측정정보) - clct_sn 생성하지않음
-            if '5분_소통정보' in file_name or '대기오염_국가측정망_시간대별_측정정보' in file_name or '대기오염_자체측정망_시간대별_측정정보' in file_name:
+            if CallUrlUtil.is_no_clct_sn_file(file_name):
                 df.to_csv(full_file_name, sep= link_file_sprtr, header= header, index=False, mode= mode, encoding='utf-8-sig')
             else:
                 # clct_sn 로그 순번 설정
@@ -663,7 +867,7 @@ class CallUrlUtil:
             logging.info(f"Sending SOAP request to URL: {service_url}")
             logging.info(f"SOAP Request:\n{soap_request}")
             # 서비스 호출
-            response = requests.post(service_url, data=soap_request, headers=headers)
+            response = CallUrlUtil.request_url(service_url, dict(HTTP_CONFIG_DEFAULT), "post", data=soap_request, headers=headers, verify=True)
             response.raise_for_status()  # HTTP 에러 발생 시 예외 처리
 
             # 응답 출력
@@ -695,3 +899,455 @@ class CallUrlUtil:
         except ET.ParseError as e:
             logging.error(f"Error parsing SOAP response: {e}")
             return 0
+
+
+class RateLimiter:
+    """
+    제공처별 token bucket 호출 속도 제한
+    Variable rate_limit_config 예) {"default": {"rate": 20}, "ps00002": {"rate": 10, "burst": 10}, "pi00004": {"rate": 30, "min_rate": 1}}
+    호출 제한 응답 (HTTP 429/5xx, 공공데이터포털 OpenAPI_ServiceResponse 트래픽 초과) 시 속도를 절반으로 줄이고, 정상 응답 시 설정 속도까지 점진적으로 복구
+    worker 프로세스 내 모든 수집 task, thread 가 같은 제공처 limiter 를 공유
+    """
+    rate_limiter_dict = {}  # 제공처 코드 (pvdr_inst_cd 또는 pvdr_site_cd): RateLimiter
+    rate_limiter_lock = threading.Lock()
+    QUOTA_ERROR_KEYWORDS = ("LIMITED_NUMBER_OF_SERVICE_REQUESTS", "<returnReasonCode>22<", "<returnReasonCode>23<")
+
+    def __init__(self, key, rate, burst = None, min_rate = None):
+        self.key = key
+        self.config = (rate, burst, min_rate)  # 생성 시 설정 (설정 변경 확인용)
+        self.max_rate = float(rate)  # 초당 최대 호출 수
+        self.rate = self.max_rate  # 현재 초당 호출 수
+        self.min_rate = float(min_rate) if min_rate else min(1.0, self.max_rate)
+        self.burst = float(burst) if burst else max(1.0, self.max_rate)
+        self.tokens = self.burst
+        self.last_time = time.monotonic()
+        self.blocked_until = 0  # Retry-After 대기 종료 시각
+        self.lock = threading.Lock()
+
+    def get_rate_limiter(rate_limit_config, pvdr_site_cd, pvdr_inst_cd):
+        """
+        제공처별 limiter 조회 (설정 없으면 None)
+        설정은 pvdr_inst_cd > pvdr_site_cd > default 순으로 처음 있는 설정 사용, token bucket 은 제공처 (pvdr_inst_cd 또는 pvdr_site_cd) 별로 따로 유지
+        설정이 바뀌면 새 설정으로 limiter 다시 생성
+        params: rate_limit_config, pvdr_site_cd, pvdr_inst_cd
+        return: rate_limiter
+        """
+        limiter_key = pvdr_inst_cd or pvdr_site_cd or "default"
+        for config_key in (pvdr_inst_cd, pvdr_site_cd, "default"):
+            config = rate_limit_config.get(config_key) if config_key else None
+            if config and config.get("rate"):
+                limiter_config = (config["rate"], config.get("burst"), config.get("min_rate"))
+                with RateLimiter.rate_limiter_lock:
+                    rate_limiter = RateLimiter.rate_limiter_dict.get(limiter_key)
+                    if rate_limiter is None or rate_limiter.config != limiter_config:
+                        rate_limiter = RateLimiter(limiter_key, *limiter_config)
+                        RateLimiter.rate_limiter_dict[limiter_key] = rate_limiter
+                return rate_limiter
+        return None
+
+    def acquire(self):
+        """
+        호출 가능할 때까지 대기 후 token 1개 사용
+        """
+        while True:
+            with self.lock:
+                now_time = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now_time - self.last_time) * self.rate)
+                self.last_time = now_time
+                if now_time >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = max(self.blocked_until - now_time, (1 - self.tokens) / self.rate)
+            time.sleep(wait_time)
+
+    def update(self, response, stream = False):
+        """
+        응답에 따라 호출 속도 조정
+        params: response, stream (stream 응답은 본문 확인하지 않음)
+        """
+        if response.status_code == 429 or response.status_code >= 500 \
+            or (not stream and response.status_code == 200 and 'OpenAPI_ServiceResponse' in response.text and any(keyword in response.text for keyword in RateLimiter.QUOTA_ERROR_KEYWORDS)):
+            self.backoff(response.headers.get("Retry-After"))
+        else:
+            self.recover()
+
+    def backoff(self, retry_after = None):
+        """
+        호출 제한 응답 시 속도 절반으로 감소, Retry-After (초) 존재 시 해당 시간 동안 호출 중지
+        params: retry_after
+        """
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 1)
+            if retry_after is not None and str(retry_after).isdigit():
+                self.blocked_until = max(self.blocked_until, time.monotonic() + int(retry_after))
+        logging.info(f"호출 제한 응답, 제공처: {self.key}, 초당 호출 수: {self.rate:.2f}, Retry-After: {retry_after}")
+
+    def recover(self):
+        """
+        정상 응답 시 설정 속도까지 점진적 복구
+        """
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+    def get_concurrency(self, max_concurrency):
+        """
+        현재 속도 비율에 맞춘 동시 호출 수
+        params: max_concurrency
+        return: concurrency
+        """
+        return max(1, int(max_concurrency * self.rate / self.max_rate))
+
+
+class RetryPolicy:
+    """
+    재시도 정책 (지수 백오프 + jitter, Retry-After 반영, 에러 유형별 규칙)
+    재시도 대기 시간: min(max_delay, base_delay * 2^retry_num) 의 50~100% 임의 값 (규칙 jitter 가 False 면 계산값 그대로)
+    """
+    # 에러 유형별 기본 규칙 (max_retries 미지정 시 retry_max 사용)
+    RETRY_RULE_DEFAULT = {
+        "http_429" : {},  # 호출 제한
+        "http_5xx" : {},  # 제공처 서버 에러
+        "http_4xx" : {"max_retries" : 2},  # 잘못된 요청, 재시도 효과 적음
+        "service_error" : {},  # 공공데이터포털 OpenAPI_ServiceResponse 에러
+        "connection_error" : {},  # 연결 실패, timeout
+        "no_data" : {"base_delay" : 5, "max_delay" : 120},  # 제공처 데이터 미생성
+    }
+    RETRY_AFTER_MAX = 600  # Retry-After 최대 반영 시간 (초)
+
+    def __init__(self, http_config, **retry_rules):
+        """
+        params: http_config, retry_rules (DAG별 에러 유형 규칙, Variable 설정이 우선)
+        """
+        self.max_retries = int(http_config.get('retry_max', 5))
+        self.base_delay = float(http_config.get('retry_base_delay', 1))
+        self.max_delay = float(http_config.get('retry_max_delay', 60))
+        self.retry_rules = {error_class: dict(rule) for error_class, rule in RetryPolicy.RETRY_RULE_DEFAULT.items()}
+        for rules in (retry_rules, http_config.get('retry_rules', {})):
+            for error_class, rule in rules.items():
+                self.retry_rules.setdefault(error_class, {}).update(rule)
+
+    def get_error_class(response):
+        """
+        응답 에러 유형 확인
+        params: response
+        return: error_class
+        """
+        if response is None:
+            return "connection_error"
+        if response.status_code == 429:
+            return "http_429"
+        if response.status_code >= 500:
+            return "http_5xx"
+        if response.status_code >= 400:
+            return "http_4xx"
+        return "service_error"
+
+    def get_delay(self, retry_num, error_class, retry_after = None):
+        """
+        재시도 대기 시간 계산
+        params: retry_num, error_class, retry_after
+        return: delay (초)
+        """
+        rule = self.retry_rules.get(error_class, {})
+        max_delay = rule.get('max_delay', self.max_delay)
+        delay = min(max_delay, rule.get('base_delay', self.base_delay) * (2 ** retry_num))
+        if rule.get('jitter', True):
+            delay = random.uniform(delay / 2, delay)
+        if retry_after is not None and str(retry_after).isdigit():
+            delay = max(delay, min(int(retry_after), RetryPolicy.RETRY_AFTER_MAX))
+        return delay
+
+    def wait(self, retry_num, response = None, error_class = None):
+        """
+        에러 유형별 재시도 가능 여부 확인 후 대기
+        params: retry_num, response, error_class (미지정 시 response 로 확인)
+        return: retry_num 증가된 재시도 횟수 (재시도 불가 시 max_retries)
+        """
+        if error_class is None:
+            error_class = RetryPolicy.get_error_class(response)
+        rule = self.retry_rules.get(error_class, {})
+        retry_num += 1
+        if retry_num >= min(self.max_retries, rule.get('max_retries', self.max_retries)):
+            logging.info(f"재시도 중지, 에러 유형: {error_class}, 재시도 횟수: {retry_num}")
+            return self.max_retries
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        delay = self.get_delay(retry_num - 1, error_class, retry_after)
+        logging.info(f"재시도 대기, 에러 유형: {error_class}, 재시도 횟수: {retry_num}, 대기 시간: {delay:.1f}초")
+        time.sleep(delay)
+        return retry_num
+
+
+class JsonArrayStream:
+    """
+    json 배열 응답 스트리밍 parsing (국가통계포털 등 대용량 단건 응답)
+    응답 전체를 문자열, dict 로 올리지 않고 받은 만큼 배열 항목 단위로 parsing 하여 원천 파일, csv 파일에 저장
+    request_url(..., stream=True) 응답 사용, 배열이 아닌 응답 (에러 메세지 등) 은 read_text() 로 전체 조회
+    """
+    CHUNK_SIZE = 1024 * 1024  # 응답 읽기 단위 (byte)
+    BATCH_SIZE = 10000  # 파일 저장 단위 (행)
+
+    def __init__(self, response):
+        self.chunks = response.iter_content(chunk_size = JsonArrayStream.CHUNK_SIZE)
+        self.text_decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors = "replace")
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        # 첫 문자로 배열 여부 확인
+        while not self.eof and not self.buffer.lstrip("\ufeff \t\r\n"):
+            self.read_chunk()
+        self.buffer = self.buffer.lstrip("\ufeff \t\r\n")
+        self.is_array = self.buffer.startswith("[")
+
+    def read_chunk(self):
+        """
+        응답 chunk 읽어서 buffer 에 추가
+        return: True / False (응답 끝)
+        """
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.buffer += self.text_decoder.decode(b"", final = True)
+            self.eof = True
+            return False
+        self.buffer += self.text_decoder.decode(chunk)
+        return True
+
+    def read_text(self):
+        """
+        응답 전체 문자열 조회 (배열이 아닌 응답)
+        return: text
+        """
+        while self.read_chunk():
+            pass
+        return self.buffer
+
+    def skip_whitespace(self):
+        """
+        공백 건너뛰고 다음 문자 조회 (buffer 부족 시 읽기)
+        return: 다음 문자 (응답 끝이면 "")
+        """
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_chunk():
+                return ""
+
+    def iter_items(self):
+        """
+        json 배열 항목 순서대로 반환
+        return: item generator
+        """
+        self.pos = 1  # "[" 다음
+        while True:
+            char = self.skip_whitespace()
+            if char == "]":
+                return
+            if char == ",":
+                self.pos += 1
+                char = self.skip_whitespace()
+            if char == "":
+                raise ValueError("json 배열이 완료되지 않음")
+            try:
+                item, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+                # 숫자 등 buffer 끝에서 잘린 값 방지
+                if end >= len(self.buffer) and not self.eof:
+                    raise json.JSONDecodeError("buffer end", self.buffer, end)
+            except json.JSONDecodeError as e:
+                if not self.read_chunk():
+                    raise e
+                continue
+            self.pos = end
+            # 처리 완료 buffer 삭제
+            if self.pos > JsonArrayStream.CHUNK_SIZE:
+                self.buffer = self.buffer[self.pos:]
+                self.pos = 0
+            yield item
+
+    def write_file(self, csv_sink, page_no, source_file_name, full_file_path, mode, ignore_column = ""):
+        """
+        json 배열 항목을 BATCH_SIZE 단위로 원천 파일, csv 파일에 저장
+        params: csv_sink, page_no, source_file_name, full_file_path, mode (원천 파일 쓰기 모드), ignore_column
+        return: result_size (저장한 항목 개수)
+        """
+        result_size = 0
+        item_list = []
+        for item in self.iter_items():
+            item_list.append(item)
+            if len(item_list) >= JsonArrayStream.BATCH_SIZE:
+                result_size += self.write_batch(item_list, csv_sink, page_no, source_file_name, full_file_path, mode, ignore_column)
+                item_list = []
+                mode = "a"
+        if item_list or result_size == 0:
+            result_size += self.write_batch(item_list, csv_sink, page_no, source_file_name, full_file_path, mode, ignore_column)
+        return result_size
+
+    def write_batch(self, item_list, csv_sink, page_no, source_file_name, full_file_path, mode, ignore_column):
+        """
+        원천 파일 저장 후 read_json 과 같은 방식으로 parsing 하여 csv 파일 저장
+        params: item_list, csv_sink, page_no, source_file_name, full_file_path, mode, ignore_column
+        return: 저장한 행 개수
+        """
+        CallUrlUtil.create_source_file(item_list, source_file_name, full_file_path, mode)
+        result_json = CallUrlUtil.recursive_json_for_keyword(item_list, "", "", {}, [], ignore_column, "", "")
+        if result_json:
+            csv_sink.write(result_json, page_no)
+        return len(result_json)
+
+
+class PageFetcher:
+    """
+    total_page 확인 후 다음 페이지 url 을 page_concurrency 개의 thread 로 미리 호출
+    응답은 기존 호출 loop 에서 페이지 순서대로 꺼내 사용하므로 csv 적재 순서(page_no, clct_sn)는 순차 호출과 동일
+    """
+    def __init__(self, http_config, **request_kwargs):
+        self.http_config = http_config
+        self.request_kwargs = request_kwargs
+        self.max_workers = int(http_config.get('page_concurrency', 1))
+        self.rate_limiter = http_config.get('rate_limiter')
+        self.executor = None
+        self.pending_urls = deque()  # 호출 대기 url
+        self.futures = {}  # 호출 중이거나 응답 대기 중인 url: future
+
+    def prefetch(self, url_list):
+        """
+        url_list 병렬 호출 예약 (page_concurrency <= 1 이거나 url 이 페이지별로 구분되지 않으면 순차 호출 유지)
+        params: url_list (2페이지 ~ total_page 호출 url)
+        """
+        self.clear()
+        if self.max_workers <= 1 or len(url_list) == 0 or len(set(url_list)) != len(url_list):
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers= self.max_workers)
+        self.pending_urls.extend(url_list)
+        self.fill()
+        logging.info(f"페이지 병렬 호출 예약: {len(url_list)}건, 동시 호출 수: {self.max_workers}")
+
+    def fill(self):
+        """
+        메모리 사용 제한을 위해 최대 page_concurrency * 2 개까지만 응답 보관
+        """
+        max_workers = self.max_workers
+        if self.rate_limiter is not None:  # 제공처 제한 응답 시 동시 호출 수 축소
+            max_workers = self.rate_limiter.get_concurrency(self.max_workers)
+        while self.pending_urls and len(self.futures) < max_workers * 2:
+            url = self.pending_urls.popleft()
+            self.futures[url] = self.executor.submit(CallUrlUtil.request_url, url, self.http_config, **self.request_kwargs)
+
+    def get(self, return_url):
+        """
+        미리 호출한 응답 조회 (없으면 순차 호출)
+        params: return_url
+        return: response
+        """
+        future = self.futures.pop(return_url, None)
+        if future is None:
+            return CallUrlUtil.request_url(return_url, self.http_config, **self.request_kwargs)
+        self.fill()
+        return future.result()
+
+    def clear(self):
+        """
+        예약된 호출 취소
+        """
+        for future in self.futures.values():
+            future.cancel()
+        self.futures.clear()
+        self.pending_urls.clear()
+
+    def close(self):
+        """
+        thread pool 종료
+        """
+        self.clear()
+        if self.executor is not None:
+            self.executor.shutdown(wait= True)
+            self.executor = None
+
+
+class CsvSink:
+    """
+    페이지 단위 csv 파일 append
+    행 개수(clct_sn offset), 컬럼 순서를 메모리에 유지하여 페이지마다 기존 csv 파일을 다시 읽지 않음
+    """
+    def __init__(self, link_file_sprtr, data_crtr_pnttm, clct_log_sn, full_file_path, file_name):
+        self.link_file_sprtr = link_file_sprtr
+        self.data_crtr_pnttm = data_crtr_pnttm
+        self.clct_log_sn = clct_log_sn
+        self.full_file_path = full_file_path
+        self.file_name = file_name
+        self.full_file_name = full_file_path + file_name
+        self.clct_sn_yn = not CallUrlUtil.is_no_clct_sn_file(file_name)  # clct_sn 생성 여부
+        self.row_count = 0  # 파일 내 행 개수
+        self.column_order = None  # 파일 헤더 컬럼 순서 (clct_sn 제외)
+        self.loaded = False
+
+    def load(self):
+        """
+        첫 write 시 기존 파일 존재하면 행 개수, 헤더 컬럼 순서 1회 조회
+        (첫 호출 시 get_request_message 에서 기존 파일 삭제 후 조회되도록 지연 조회)
+        """
+        self.loaded = True
+        if not os.path.exists(self.full_file_name):
+            return
+        try:
+            self.row_count = FileUtil.check_csv_length(self.link_file_sprtr, self.full_file_name)
+            if self.row_count != 0:
+                columns = pd.read_csv(self.full_file_name, sep= self.link_file_sprtr, nrows= 0, encoding='utf-8-sig').columns
+                self.column_order = columns.drop('clct_sn') if self.clct_sn_yn and 'clct_sn' in columns else columns
+        except Exception as e:
+            logging.warning(f"기존 CSV 파일의 행 개수 확인 실패. 초기값 사용: {e}")
+            self.row_count = 0
+            self.column_order = None
+
+    def write(self, result_json, page_no, add_column_dict = None, dw_column_list = None, dw_column_only = False):
+        """
+        공통 헤더 컬럼, 값 추가 및 csv 파일 append
+        params: result_json, page_no, add_column_dict (데이터 구분 컬럼, 값), dw_column_list (DW 컬럼명), dw_column_only (DW 컬럼만 저장)
+        return: row_count (현재까지 파일 내 행 개수)
+        """
+        df = CallUrlUtil.set_csv_dataframe(result_json, self.data_crtr_pnttm, self.clct_log_sn, page_no, add_column_dict, dw_column_list, dw_column_only)
+        return self.write_dataframe(df)
+
+    def write_dataframe(self, df):
+        """
+        데이터프레임 csv 파일 append
+        params: df
+        return: row_count (현재까지 파일 내 행 개수)
+        """
+        try:
+            if not os.path.exists(self.full_file_path):
+                os.makedirs(self.full_file_path)
+            os.chdir(self.full_file_path)
+            if not self.loaded:
+                self.load()
+
+            header = self.row_count == 0  # 파일 헤더 모드
+            mode = "w" if self.row_count == 0 else "a"  # 파일 쓰기 모드
+            df = df.reset_index(drop=True)
+            if '신문고민원_접수' in self.file_name:
+                df = df.iloc[:, :34]
+            elif self.clct_sn_yn and self.column_order is not None:  # csv 헤더 컬럼 순서 지정
+                df = df.reindex(columns=self.column_order, fill_value=None)
+
+            if self.clct_sn_yn:
+                # clct_sn 로그 순번 설정
+                df.index += self.row_count + 1
+                df.to_csv(self.full_file_name, sep= self.link_file_sprtr, header= header, index_label= "clct_sn", mode= mode, encoding='utf-8-sig')
+            else:
+                df.to_csv(self.full_file_name, sep= self.link_file_sprtr, header= header, index=False, mode= mode, encoding='utf-8-sig')
+
+            if self.column_order is None:
+                self.column_order = df.columns
+            self.row_count += len(df)
+            logging.info(f"CSV 파일 생성 성공: {self.full_file_name}")
+        except PermissionError:
+            logging.error(f"파일 쓰기 권한이 없습니다: {self.full_file_name}")
+            raise
+        except Exception as e:
+            logging.error(f"CsvSink write Exception::: {e}")
+            raise
+        return self.row_count
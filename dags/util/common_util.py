@@ -1,6 +1,8 @@
 import csv
 import logging
 import os
+import threading
+import time
 from datetime import timedelta, timezone, datetime as dt
 from pendulum import now
 
@@ -11,6 +13,12 @@ from dto.th_data_clct_stts_hstry_log import ThDataClctSttsHistLog
 from dto.tn_clct_file_info import TnClctFileInfo
 from dto.tc_com_dtl_cd import TcCmmnDtlCd as CONST
 
+# DW 테이블 컬럼 정보 캐시 (worker 프로세스 내 재사용)
+DW_COLUMN_CACHE_TTL = 600  # 캐시 유지 시간 (초)
+DW_COMMON_COLUMN = ('data_crtr_pnttm', 'clct_sn', 'clct_pnttm', 'clct_log_sn', 'page_no')  # 수집 공통 컬럼
+dw_column_cache = {}  # dw_tbl_phys_nm: (조회 시각, [(column_name, data_type)])
+dw_column_cache_lock = threading.Lock()
+
 class CommonUtil:
     def set_data_crtr_pnttm(link_clct_cycle_cd, data_interval_start):
         """
@@ -205,35 +213,43 @@ class CommonUtil:
             logging.info(f"create_log_file_directory OSError::: {e}")
         return log_full_file_path
 
-    def create_log_file(log_full_file_path, tn_clct_file_info, session):
+    def create_log_file(log_full_file_path, tn_clct_file_info, session, log_message = None, step_se_cd = None):
         """
-        수집로그파일 생성
-        params: log_full_file_path, tn_clct_file_info, session
+        수집로그파일 생성 (log_message 가 없으면 th_data_clct_mastr_log 에서 조회)
+        params: log_full_file_path, tn_clct_file_info, session, log_message, step_se_cd
         """
         try:
             os.chdir(log_full_file_path)
-            insd_file_nm = ""
-            insd_file_size = ""
-            clct_log_sn = f" (clct_log_sn={tn_clct_file_info['clct_log_sn']}) "
-            if tn_clct_file_info['dtst_cd'] == 'data648':  # 지방행정인허가
-                log_file_name = tn_clct_file_info['clct_data_nm'] + "_" + tn_clct_file_info['data_crtr_pnttm'] + ".csv"
-                insd_file_nm = f" {tn_clct_file_info['insd_file_nm']:<50} "
-            else:
-                log_file_name = tn_clct_file_info['insd_file_nm'] + ".csv"
-            mode = "w"  # 파일 쓰기 모드
-            with session.begin() as conn:
-                th_data_clct_mastr_log = conn.get(ThDataClctMastrLog, tn_clct_file_info['clct_log_sn'])
-                log_message = th_data_clct_mastr_log.stts_msg
-                if tn_clct_file_info['insd_file_size'] != None and th_data_clct_mastr_log.step_se_cd == CONST.STEP_CLCT:
-                    insd_file_size = f" file_size={tn_clct_file_info['insd_file_size']}(byte)"
-                if os.path.exists(log_full_file_path + log_file_name):
-                    mode = "a"
-            data_list = [f"[{now().format('YYYY-MM-DD HH:mm:ss.SSSSSS')}]{clct_log_sn}{insd_file_nm} {log_message:<20}{insd_file_size:<20}"]
-            with open(log_file_name, mode) as file:
+            if log_message is None:
+                with session.begin() as conn:
+                    th_data_clct_mastr_log = conn.get(ThDataClctMastrLog, tn_clct_file_info['clct_log_sn'])
+                    log_message = th_data_clct_mastr_log.stts_msg
+                    step_se_cd = th_data_clct_mastr_log.step_se_cd
+            log_file_name, data_list = CommonUtil.get_log_file_row(tn_clct_file_info, log_message, step_se_cd)
+            with open(log_file_name, "a") as file:  # 없으면 생성
                 write = csv.writer(file, delimiter = "|")
                 write.writerow(data_list)
         except Exception as e:
             logging.info(f"create_log_file Exception::: {e}")
+
+    def get_log_file_row(tn_clct_file_info, log_message, step_se_cd):
+        """
+        수집로그파일명 및 로그 행 생성
+        params: tn_clct_file_info, log_message, step_se_cd
+        return: log_file_name, data_list
+        """
+        insd_file_nm = ""
+        insd_file_size = ""
+        clct_log_sn = f" (clct_log_sn={tn_clct_file_info['clct_log_sn']}) "
+        if tn_clct_file_info['dtst_cd'] == 'data648':  # 지방행정인허가
+            log_file_name = tn_clct_file_info['clct_data_nm'] + "_" + tn_clct_file_info['data_crtr_pnttm'] + ".csv"
+            insd_file_nm = f" {tn_clct_file_info['insd_file_nm']:<50} "
+        else:
+            log_file_name = tn_clct_file_info['insd_file_nm'] + ".csv"
+        if tn_clct_file_info['insd_file_size'] != None and step_se_cd == CONST.STEP_CLCT:
+            insd_file_size = f" file_size={tn_clct_file_info['insd_file_size']}(byte)"
+        data_list = [f"[{now().format('YYYY-MM-DD HH:mm:ss.SSSSSS')}]{clct_log_sn}{insd_file_nm} {log_message:<20}{insd_file_size:<20}"]
+        return log_file_name, data_list
             
 
     def create_directory(collect_data_list, session, data_interval_end, root_collect_file_path, reclect_yn):
@@ -299,8 +315,8 @@ class CommonUtil:
                 # th_data_clct_stts_hstry_log
                 CommonUtil.insert_history_log(conn, th_data_clct_mastr_log, reclect_yn)
 
-            # 수집로그파일 생성
-            CommonUtil.create_log_file(log_full_file_path, tn_clct_file_info.as_dict(), session)
+            # 수집로그파일 생성 (메시지 재조회 없이 전달)
+            CommonUtil.create_log_file(log_full_file_path, tn_clct_file_info.as_dict(), session, message, step_se_cd)
 
         except Exception as e:
             logging.info(f"update_log_table Exception::: {e}")
@@ -405,3 +421,132 @@ class CommonUtil:
             th_data_clct_mastr_log = conn.get(ThDataClctMastrLog, dict_row.clct_log_sn)
             th_data_clct_mastr_log.crt_dt = th_data_clct_mastr_log.crt_dt.astimezone(timezone.utc)
         return th_data_clct_mastr_log
+
+    def get_dw_column_info(session, dw_tbl_phys_nm_list, ttl = DW_COLUMN_CACHE_TTL):
+        """
+        DW 테이블 컬럼명, 데이터 타입 조회 (캐시에 없거나 만료된 테이블만 한 번에 조회)
+        params: session, dw_tbl_phys_nm_list, ttl (캐시 유지 시간, 초)
+        return: dw_column_info {dw_tbl_phys_nm: [(column_name, data_type)]}
+        """
+        dw_tbl_phys_nm_list = list(dict.fromkeys(dw_tbl_phys_nm for dw_tbl_phys_nm in dw_tbl_phys_nm_list if dw_tbl_phys_nm))
+        now_time = time.monotonic()
+        with dw_column_cache_lock:
+            select_tbl_list = [dw_tbl_phys_nm for dw_tbl_phys_nm in dw_tbl_phys_nm_list
+                               if dw_tbl_phys_nm not in dw_column_cache or now_time - dw_column_cache[dw_tbl_phys_nm][0] > ttl]
+        if select_tbl_list:
+            table_names = ", ".join(f"'{dw_tbl_phys_nm}'" for dw_tbl_phys_nm in select_tbl_list)
+            get_data_type_stmt = f"""
+                SELECT table_name, column_name, 
+                    CASE WHEN udt_name = 'bpchar' AND character_maximum_length IS NOT NULL THEN udt_name || '(' || character_maximum_length || ')' 
+                    ELSE udt_name 
+                    END AS data_type
+                FROM information_schema.columns
+                WHERE table_name IN ({table_names})
+                ORDER BY table_name, ordinal_position
+            """
+            select_column_info = {dw_tbl_phys_nm: [] for dw_tbl_phys_nm in select_tbl_list}
+            try:
+                with session.begin() as conn:
+                    for dict_row in conn.execute(get_data_type_stmt).all():
+                        select_column_info[dict_row[0]].append((dict_row[1], dict_row[2]))
+            except Exception as e:
+                logging.info(f"get_dw_column_info Exception::: {e}")
+                raise e
+            with dw_column_cache_lock:
+                for dw_tbl_phys_nm, column_info in select_column_info.items():
+                    dw_column_cache[dw_tbl_phys_nm] = (now_time, column_info)
+        with dw_column_cache_lock:
+            return {dw_tbl_phys_nm: list(dw_column_cache[dw_tbl_phys_nm][1]) for dw_tbl_phys_nm in dw_tbl_phys_nm_list}
+
+    def get_dw_column_list(session, dw_tbl_phys_nm, except_common_column = True):
+        """
+        DW 테이블 컬럼명 조회 (캐시 사용)
+        params: session, dw_tbl_phys_nm, except_common_column (수집 공통 컬럼 제외 여부)
+        return: dw_column_list
+        """
+        column_info = CommonUtil.get_dw_column_info(session, [dw_tbl_phys_nm]).get(dw_tbl_phys_nm, [])
+        return [column_name for column_name, data_type in column_info if not (except_common_column and column_name in DW_COMMON_COLUMN)]
+
+    def get_dw_data_type_dict(session, dw_tbl_phys_nm):
+        """
+        DW 테이블 컬럼명별 데이터 타입 조회 (캐시 사용)
+        params: session, dw_tbl_phys_nm
+        return: dw_column_dict {column_name: data_type}
+        """
+        column_info = CommonUtil.get_dw_column_info(session, [dw_tbl_phys_nm]).get(dw_tbl_phys_nm, [])
+        return {column_name: data_type for column_name, data_type in column_info}
+
+
+class LogRecorder:
+    """
+    수집 로그 상태 변경을 모아서 한 번에 기록 (th_data_clct_mastr_log merge, th_data_clct_stts_hstry_log insert 는 한 트랜잭션, 수집로그파일은 파일별 한 번 쓰기)
+    with LogRecorder(session) as log_recorder: 블록 종료 시 (예외 포함) flush
+    """
+    def __init__(self, session):
+        self.session = session
+        self.mastr_log_dict = {}  # clct_log_sn: th_data_clct_mastr_log (마지막 상태)
+        self.history_log_list = []
+        self.log_file_dict = {}  # 수집로그파일 전체 경로: [data_list]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.flush()
+        except Exception as e:
+            if exc_type is None:  # 블록 예외가 있으면 블록 예외를 우선
+                raise e
+        return False
+
+    def record(self, log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, step_se_cd, status_code, message, reclect_yn):
+        """
+        상태 변경 기록 (CommonUtil.update_log_table 과 같은 값, flush 전까지 메모리에 보관)
+        params: log_full_file_path, tn_clct_file_info, th_data_clct_mastr_log, step_se_cd, status_code, message, reclect_yn
+        """
+        th_data_clct_mastr_log.step_se_cd = step_se_cd
+        th_data_clct_mastr_log.stts_cd = status_code
+        th_data_clct_mastr_log.stts_dt = now(tz="UTC")
+        th_data_clct_mastr_log.stts_msg = message
+        th_data_clct_mastr_log.crt_dt = th_data_clct_mastr_log.crt_dt.astimezone(timezone.utc)
+        self.mastr_log_dict[th_data_clct_mastr_log.clct_log_sn] = th_data_clct_mastr_log
+
+        th_data_clct_stts_hstry_log = ThDataClctSttsHistLog()
+        th_data_clct_stts_hstry_log.clct_log_sn = th_data_clct_mastr_log.clct_log_sn
+        th_data_clct_stts_hstry_log.reclect_yn = reclect_yn
+        th_data_clct_stts_hstry_log.step_se_cd = step_se_cd
+        th_data_clct_stts_hstry_log.stts_cd = status_code
+        th_data_clct_stts_hstry_log.stts_dt = th_data_clct_mastr_log.stts_dt
+        th_data_clct_stts_hstry_log.stts_msg = message
+        self.history_log_list.append(th_data_clct_stts_hstry_log)
+
+        try:
+            log_file_name, data_list = CommonUtil.get_log_file_row(tn_clct_file_info.as_dict(), message, step_se_cd)
+            self.log_file_dict.setdefault(os.path.join(log_full_file_path, log_file_name), []).append(data_list)
+        except Exception as e:
+            logging.info(f"LogRecorder.record Exception::: {e}")
+
+    def flush(self):
+        """
+        모아둔 상태 변경 기록
+        """
+        if self.mastr_log_dict or self.history_log_list:
+            try:
+                with self.session.begin() as conn:
+                    for th_data_clct_mastr_log in self.mastr_log_dict.values():
+                        conn.merge(th_data_clct_mastr_log)
+                    conn.add_all(self.history_log_list)
+            except Exception as e:
+                logging.info(f"LogRecorder.flush Exception::: {e}")
+                raise e
+            finally:
+                self.mastr_log_dict = {}
+                self.history_log_list = []
+
+        for log_file_name, data_list in self.log_file_dict.items():
+            try:
+                with open(log_file_name, "a") as file:
+                    csv.writer(file, delimiter = "|").writerows(data_list)
+            except Exception as e:
+                logging.info(f"LogRecorder.flush Exception::: {e}")
+        self.log_file_dict = {}
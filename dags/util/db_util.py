@@ -0,0 +1,424 @@
+import datetime as dt
+import decimal
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from numbers import Number
+
+import pandas as pd
+
+from dto.tn_data_clct_wtrmk_info import TnDataClctWtrmkInfo
+
+DB_FETCH_SIZE = 10000  # 연계 DB 조회 chunk 행 수 및 JDBC fetch size (Variable db_fetch_size 로 변경)
+DB_PARTITION_MAX = 8  # 분할 조회 최대 동시 커넥션 수
+WTRMK_LOAD_MTHD_CD = ("upsert", "upsert_all")  # 증분 수집 가능 DW 적재 방식 (키 기준 upsert, append 는 crtr_del_col_nm 설정 시만 가능)
+DB_NATIVE_KND_CD = ("oracle", "mysql", "mariadb")  # native python driver 조회 가능 DB 종류 (tibero 등은 JDBC)
+WTRMK_NUMBER_TYPE_NM = ("BIGINT", "INTEGER", "SMALLINT", "TINYINT", "DECIMAL", "NUMERIC", "FLOAT", "REAL", "DOUBLE")  # 숫자 워터마크 JDBC 유형명
+WTRMK_MYSQL_NUMBER_TYPE = (0, 1, 2, 3, 4, 5, 8, 9, 13, 246)  # pymysql 숫자 FIELD_TYPE (DECIMAL, TINY, SHORT, LONG, FLOAT, DOUBLE, LONGLONG, INT24, YEAR, NEWDECIMAL)
+WTRMK_MYSQL_DATE_TYPE = (7, 10, 12, 14)  # pymysql 날짜 FIELD_TYPE (TIMESTAMP, DATE, DATETIME, NEWDATE)
+
+class DbUtil:
+    def get_jdbc_driver_args(driver_class_nm, user_id, pswd, fetch_size = DB_FETCH_SIZE):
+        """
+        JDBC 접속 속성 (driver 별 fetch size 설정)
+        params: driver_class_nm, user_id, pswd, fetch_size
+        return: driver_args
+        """
+        driver_args = {"user": f"{user_id}", "password": f"{pswd}"}
+        driver_class_nm = (driver_class_nm or "").lower()
+        if "oracle" in driver_class_nm:
+            driver_args["defaultRowPrefetch"] = str(fetch_size)
+        elif "mysql" in driver_class_nm or "mariadb" in driver_class_nm:  # 서버 cursor 로 fetch size 단위 조회
+            driver_args["useCursorFetch"] = "true"
+            driver_args["defaultFetchSize"] = str(fetch_size)
+        return driver_args
+
+    def get_connect_db(kwargs, tn_db_cntn_info, connection_url, jars, fetch_size = DB_FETCH_SIZE):
+        """
+        연계 DB 커넥션 생성 함수
+        1) Variable db_native_driver_yn 이 y 이고 DB 종류가 DB_NATIVE_KND_CD 이면 native python driver
+        2) Variable jdbc_gateway_yn 이 y 이면 로컬 JDBC 게이트웨이 풀 커넥션
+        3) task 내 JDBC 직접 연결 (앞 단계 연결 실패 시 이후 연결도 다음 단계 사용)
+        params: kwargs, tn_db_cntn_info, connection_url, jars, fetch_size
+        return: connect_db
+        """
+        driver_args = DbUtil.get_jdbc_driver_args(tn_db_cntn_info.driver_class_nm, tn_db_cntn_info.user_id, tn_db_cntn_info.pswd, fetch_size)
+        try:
+            db_native_driver_yn = (kwargs['var']['value'].get('db_native_driver_yn', 'y') or 'y').lower()
+            jdbc_gateway_yn = (kwargs['var']['value'].get('jdbc_gateway_yn', 'y') or 'y').lower()
+        except Exception as e:
+            logging.info(f"get_connect_db Exception::: {e}")
+            db_native_driver_yn = jdbc_gateway_yn = 'y'
+        connect_state = {"native_yn": db_native_driver_yn == 'y' and (tn_db_cntn_info.db_knd_cd or "").lower() in DB_NATIVE_KND_CD, "use_yn": jdbc_gateway_yn == 'y'}
+
+        def connect_db():
+            if connect_state['native_yn']:
+                try:
+                    return DbUtil.connect_native(tn_db_cntn_info, fetch_size)
+                except Exception as e:
+                    logging.info(f"connect_db::: native driver 연결 실패, JDBC 연결 ({e})")
+                    connect_state['native_yn'] = False
+            if connect_state['use_yn']:
+                from util.jdbc_gateway import JdbcGateway
+                try:
+                    return JdbcGateway.connect(tn_db_cntn_info.link_db_id, tn_db_cntn_info.driver_class_nm, connection_url, driver_args, jars)
+                except Exception as e:
+                    logging.info(f"connect_db::: JDBC 게이트웨이 연결 실패, 직접 연결 ({e})")
+                    connect_state['use_yn'] = False
+            import jaydebeapi as jp
+            return jp.connect(f'{tn_db_cntn_info.driver_class_nm}', connection_url, driver_args, jars)
+        return connect_db
+
+    def connect_native(tn_db_cntn_info, fetch_size = DB_FETCH_SIZE):
+        """
+        native python driver 연결 (oracle: oracledb thin 모드, mysql/mariadb: pymysql 서버 cursor)
+        params: tn_db_cntn_info, fetch_size
+        return: NativeConnection
+        """
+        db_knd_cd = tn_db_cntn_info.db_knd_cd.lower()
+        if db_knd_cd == "oracle":
+            import oracledb
+            db_conn = oracledb.connect(user = tn_db_cntn_info.user_id, password = tn_db_cntn_info.pswd, dsn = oracledb.makedsn(tn_db_cntn_info.ip, int(tn_db_cntn_info.port), sid = tn_db_cntn_info.sid))
+        else:
+            import pymysql
+            db_conn = pymysql.connect(host = tn_db_cntn_info.ip, port = int(tn_db_cntn_info.port), user = tn_db_cntn_info.user_id, password = tn_db_cntn_info.pswd, database = tn_db_cntn_info.sid, charset = "utf8mb4", cursorclass = pymysql.cursors.SSCursor)
+        logging.info(f"connect_native::: {tn_db_cntn_info.link_db_id} {db_knd_cd} native driver 연결")
+        return NativeConnection(db_conn, db_knd_cd, fetch_size)
+
+    def convert_native_value(value, number_yn = False):
+        """
+        native driver 조회 값을 JDBC (jaydebeapi) 조회 값과 같은 형식으로 변환 (csv 결과 동일)
+        NUMBER, DECIMAL -> float, 날짜/시간 -> 문자열, LOB -> 내용
+        params: value, number_yn (oracle NUMBER 컬럼 여부)
+        return: value
+        """
+        if isinstance(value, decimal.Decimal) or (number_yn and isinstance(value, int) and not isinstance(value, bool)):
+            return float(value)
+        if isinstance(value, (dt.datetime, dt.date)):
+            return str(value)
+        if isinstance(value, dt.timedelta):  # mysql TIME
+            total_seconds = int(value.total_seconds())
+            return f"{total_seconds // 3600:02d}:{total_seconds % 3600 // 60:02d}:{total_seconds % 60:02d}"
+        if hasattr(value, "read"):  # oracle LOB
+            return value.read()
+        return value
+
+    def clean_dataframe(df):
+        """
+        개행문자 제거, string 양 끝 공백 제거
+        params: df
+        return: df
+        """
+        return df.replace("\n"," ", regex=True).replace("\r\n"," ", regex=True).replace("\r"," ", regex=True).apply(lambda x: (x.str.strip() if x.dtypes == 'object' and x.str._inferred_dtype == 'string' else x), axis = 0)
+
+    def write_csv_chunked(db_conn, select_db_stmt, full_file_name, link_file_sprtr, fetch_size = DB_FETCH_SIZE, part_yn = False):
+        """
+        연계 DB 조회 결과를 fetch_size 행 단위로 읽어서 정제 후 csv 파일에 이어쓰기 (clct_sn 은 1 부터 연속)
+        params: db_conn (DB-API 커넥션), select_db_stmt, full_file_name, link_file_sprtr, fetch_size, part_yn (분할 조회 part 파일: 헤더, clct_sn 없음)
+        return: row_count, column_list
+        """
+        cursor = db_conn.cursor()
+        try:
+            cursor.execute(select_db_stmt)
+            column_list = [description[0] for description in cursor.description]
+            row_count = 0
+            with open(full_file_name, 'w', encoding='utf-8' if part_yn else 'utf-8-sig', newline='') as file:
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    df = DbUtil.clean_dataframe(pd.DataFrame.from_records(rows, columns = column_list))
+                    df.index = pd.RangeIndex(row_count + 1, row_count + len(df) + 1)
+                    df.to_csv(file, sep = link_file_sprtr, header = row_count == 0 and not part_yn, index = not part_yn, index_label= "clct_sn")
+                    row_count += len(df)
+                    logging.info(f"write_csv_chunked::: {os.path.basename(full_file_name)} {row_count} 행")
+                if row_count == 0 and not part_yn:  # 헤더만 기록
+                    pd.DataFrame(columns = column_list).to_csv(file, sep = link_file_sprtr, header = True, index_label= "clct_sn")
+        finally:
+            cursor.close()
+        return row_count, column_list
+
+    def get_db_partition(kwargs, dtst_cd):
+        """
+        dtst_cd 별 분할 조회 설정 (Variable db_partition_config, 설정 없으면 None)
+        ex) {"data794": {"key_column": "sn", "partition_count": 4}}
+        params: kwargs, dtst_cd
+        return: db_partition {key_column, partition_count}
+        """
+        try:
+            db_partition_config = kwargs['var']['value'].get('db_partition_config', None) or {}
+            if isinstance(db_partition_config, str):
+                db_partition_config = json.loads(db_partition_config)
+            db_partition = db_partition_config.get(dtst_cd)
+            if db_partition and db_partition.get('key_column') and int(db_partition.get('partition_count', 1)) > 1:
+                return db_partition
+        except Exception as e:
+            logging.info(f"get_db_partition Exception::: {e}")
+        return None
+
+    def extract_to_csv(connect_db, select_db_stmt, full_file_name, link_file_sprtr, fetch_size = DB_FETCH_SIZE, db_partition = None):
+        """
+        연계 DB 조회 결과 csv 파일 생성 (db_partition 설정 시 키 범위 분할 병렬 조회)
+        params: connect_db (DB-API 커넥션 생성 함수), select_db_stmt, full_file_name, link_file_sprtr, fetch_size, db_partition
+        return: row_count, column_list
+        """
+        if db_partition:
+            return DbUtil.write_csv_partitioned(connect_db, select_db_stmt, full_file_name, link_file_sprtr, db_partition['key_column'], int(db_partition['partition_count']), fetch_size)
+        db_conn = connect_db()
+        try:
+            return DbUtil.write_csv_chunked(db_conn, select_db_stmt, full_file_name, link_file_sprtr, fetch_size)
+        finally:
+            db_conn.close()
+
+    def get_partition_stmt_list(select_db_stmt, key_column, min_key, max_key, partition_count):
+        """
+        키 범위 분할 조회문 생성 (마지막 범위는 최대값 포함, 키가 NULL 인 행은 첫 범위에 포함)
+        params: select_db_stmt, key_column, min_key, max_key, partition_count
+        return: partition_stmt_list
+        """
+        step = (max_key - min_key) / partition_count
+        boundary_list = [min_key + step * i for i in range(1, partition_count)]
+        partition_stmt_list = []
+        for i in range(partition_count):
+            where_list = []
+            if i > 0:
+                where_list.append(f"{key_column} >= {boundary_list[i - 1]}")
+            if i < partition_count - 1:
+                where_list.append(f"{key_column} < {boundary_list[i]}")
+            where_stmt = " AND ".join(where_list)
+            if i == 0:
+                where_stmt = f"({where_stmt} OR {key_column} IS NULL)"
+            partition_stmt_list.append(f"SELECT * FROM ({select_db_stmt}) p WHERE {where_stmt}")
+        return partition_stmt_list
+
+    def write_csv_partitioned(connect_db, select_db_stmt, full_file_name, link_file_sprtr, key_column, partition_count, fetch_size = DB_FETCH_SIZE):
+        """
+        키 범위 분할 병렬 조회 (범위별 커넥션으로 part 파일 작성 후 하나의 csv 로 병합, clct_sn 연속)
+        키가 숫자가 아니거나 분할할 범위가 없으면 단일 조회
+        params: connect_db (DB-API 커넥션 생성 함수), select_db_stmt, full_file_name, link_file_sprtr, key_column, partition_count, fetch_size
+        return: row_count, column_list
+        """
+        partition_count = min(partition_count, DB_PARTITION_MAX)
+        db_conn = connect_db()
+        try:
+            cursor = db_conn.cursor()
+            try:
+                cursor.execute(f"SELECT MIN({key_column}), MAX({key_column}) FROM ({select_db_stmt}) p")
+                min_key, max_key = cursor.fetchone()
+            finally:
+                cursor.close()
+            if not (isinstance(min_key, Number) and isinstance(max_key, Number)) or min_key == max_key:
+                logging.info(f"write_csv_partitioned::: 분할 불가 ({key_column}: {min_key} ~ {max_key}), 단일 조회")
+                return DbUtil.write_csv_chunked(db_conn, select_db_stmt, full_file_name, link_file_sprtr, fetch_size)
+        finally:
+            db_conn.close()
+
+        partition_stmt_list = DbUtil.get_partition_stmt_list(select_db_stmt, key_column, min_key, max_key, partition_count)
+        part_file_list = [f"{full_file_name}.part{i}" for i in range(partition_count)]
+
+        def write_part(partition_stmt, part_file_name):
+            part_conn = connect_db()
+            try:
+                return DbUtil.write_csv_chunked(part_conn, partition_stmt, part_file_name, link_file_sprtr, fetch_size, True)
+            finally:
+                part_conn.close()
+
+        try:
+            with ThreadPoolExecutor(max_workers = partition_count) as executor:
+                result_list = list(executor.map(write_part, partition_stmt_list, part_file_list))
+            column_list = result_list[0][1]
+
+            # part 파일 병합 (정제 후 개행문자가 없으므로 한 줄이 한 행, 행마다 clct_sn 추가)
+            row_count = 0
+            with open(full_file_name, 'w', encoding='utf-8-sig', newline='') as file:
+                pd.DataFrame(columns = column_list).to_csv(file, sep = link_file_sprtr, header = True, index_label= "clct_sn")
+                for part_file_name in part_file_list:
+                    with open(part_file_name, 'r', encoding='utf-8', newline='') as part_file:
+                        for line in part_file:
+                            row_count += 1
+                            file.write(f"{row_count}{link_file_sprtr}{line}")
+            logging.info(f"write_csv_partitioned::: {key_column} {partition_count}개 범위 {[result[0] for result in result_list]} 행")
+        finally:
+            for part_file_name in part_file_list:
+                if os.path.exists(part_file_name):
+                    os.remove(part_file_name)
+        return row_count, column_list
+
+    def get_incremental_stmt(session, connect_db, tn_data_bsc_info, select_db_stmt, clct_log_sn, db_knd_cd = None):
+        """
+        워터마크 증분 수집 조회문 (tn_data_clct_wtrmk_info 에 dtst_cd 가 등록되고 증분 수집 가능 적재 방식인 경우, is_wtrmk_load_mthd)
+        이전 워터마크 초과 ~ 현재 최대값 이하 범위만 조회, 현재 최대값은 대기 워터마크로 저장 후 DW 적재 완료 시 반영 (commit_watermark)
+        워터마크 비교 값은 컬럼 유형별 리터럴 (숫자, 날짜, 문자열) 로 생성
+        params: session, connect_db, tn_data_bsc_info, select_db_stmt, clct_log_sn, db_knd_cd
+        return: select_db_stmt (증분 대상 아니면 그대로)
+        """
+        with session.begin() as conn:
+            wtrmk_info = conn.get(TnDataClctWtrmkInfo, tn_data_bsc_info.dtst_cd)
+        if wtrmk_info is None or not wtrmk_info.wtrmk_col_nm:
+            return select_db_stmt
+        if not DbUtil.is_wtrmk_load_mthd(tn_data_bsc_info):
+            logging.warning(f"get_incremental_stmt::: {tn_data_bsc_info.dtst_cd} 적재 방식 {tn_data_bsc_info.dw_load_mthd_cd} (crtr_del_col_nm {tn_data_bsc_info.crtr_del_col_nm}) 는 증분 수집 불가, 전체 조회")
+            return select_db_stmt
+
+        wtrmk_col_nm = wtrmk_info.wtrmk_col_nm
+        db_conn = connect_db()
+        try:
+            cursor = db_conn.cursor()
+            try:
+                cursor.execute(f"SELECT MAX({wtrmk_col_nm}) FROM ({select_db_stmt}) p")
+                max_wtrmk_vl = cursor.fetchone()[0]
+                wtrmk_type_cd = DbUtil.get_wtrmk_type_cd(cursor.description[0][1])
+            finally:
+                cursor.close()
+        finally:
+            db_conn.close()
+        if max_wtrmk_vl is None:  # 조회 대상 없음
+            return select_db_stmt
+
+        max_wtrmk_vl = DbUtil.normalize_wtrmk_vl(max_wtrmk_vl, wtrmk_type_cd)
+        where_list = [f"{wtrmk_col_nm} <= {DbUtil.get_wtrmk_literal(max_wtrmk_vl, wtrmk_type_cd, db_knd_cd)}"]
+        if wtrmk_info.wtrmk_vl is not None:
+            where_list.insert(0, f"{wtrmk_col_nm} > {DbUtil.get_wtrmk_literal(DbUtil.normalize_wtrmk_vl(wtrmk_info.wtrmk_vl, wtrmk_type_cd), wtrmk_type_cd, db_knd_cd)}")
+        with session.begin() as conn:
+            wtrmk_info = conn.get(TnDataClctWtrmkInfo, tn_data_bsc_info.dtst_cd)
+            wtrmk_info.pndng_wtrmk_vl = max_wtrmk_vl
+            wtrmk_info.pndng_clct_log_sn = clct_log_sn
+            wtrmk_info.mdfcn_dt = dt.datetime.now()
+        logging.info(f"get_incremental_stmt::: {wtrmk_col_nm} ({wtrmk_type_cd}) {wtrmk_info.wtrmk_vl} ~ {max_wtrmk_vl}")
+        return f"SELECT * FROM ({select_db_stmt}) p WHERE {' AND '.join(where_list)}"
+
+    def is_wtrmk_load_mthd(tn_data_bsc_info):
+        """
+        증분 수집 가능 적재 방식 여부 (upsert, upsert_all 또는 crtr_del_col_nm 이 설정된 append)
+        crtr_del_col_nm 없는 append 는 data_crtr_pnttm 단위 delete 후 적재하므로, 워터마크 반영 후 같은 data_crtr_pnttm 재실행 시 이전 증분 행이 삭제되어 유실
+        params: tn_data_bsc_info
+        return: True / False
+        """
+        dw_load_mthd_cd = (tn_data_bsc_info.dw_load_mthd_cd or "").lower()
+        if dw_load_mthd_cd in WTRMK_LOAD_MTHD_CD:
+            return True
+        return dw_load_mthd_cd == "append" and bool((tn_data_bsc_info.crtr_del_col_nm or "").strip())
+
+    def get_wtrmk_type_cd(type_code):
+        """
+        워터마크 컬럼 유형 (cursor.description 의 type_code: jaydebeapi DBAPITypeObject, 게이트웨이 JDBC 유형명 tuple, oracledb DbType, pymysql FIELD_TYPE)
+        params: type_code
+        return: wtrmk_type_cd (number, date, string)
+        """
+        if isinstance(type_code, int) and not isinstance(type_code, bool):  # pymysql FIELD_TYPE
+            if type_code in WTRMK_MYSQL_DATE_TYPE:
+                return "date"
+            return "number" if type_code in WTRMK_MYSQL_NUMBER_TYPE else "string"
+        if isinstance(type_code, (tuple, list)):
+            type_name_list = type_code
+        elif isinstance(getattr(type_code, "values", None), (tuple, list)):
+            type_name_list = type_code.values
+        else:
+            type_name_list = [getattr(type_code, "name", None) or str(type_code)]
+        type_name_list = [str(type_name).upper() for type_name in type_name_list]
+        if any("DATE" in type_name or "TIMESTAMP" in type_name for type_name in type_name_list):
+            return "date"
+        if any(type_name in WTRMK_NUMBER_TYPE_NM or type_name.startswith(("DB_TYPE_NUMBER", "DB_TYPE_BINARY_")) for type_name in type_name_list):
+            return "number"
+        return "string"
+
+    def normalize_wtrmk_vl(wtrmk_vl, wtrmk_type_cd):
+        """
+        워터마크 저장 값 정규화 (숫자: 정수면 소수점 제거, 날짜: YYYY-MM-DD HH:MM:SS.ffffff)
+        params: wtrmk_vl, wtrmk_type_cd
+        return: wtrmk_vl (문자열)
+        """
+        if wtrmk_type_cd == "number":
+            number = decimal.Decimal(str(wtrmk_vl))
+            return str(int(number)) if number == number.to_integral_value() else format(number, "f")
+        if wtrmk_type_cd == "date":
+            wtrmk_date = wtrmk_vl if isinstance(wtrmk_vl, dt.datetime) else dt.datetime.fromisoformat(str(wtrmk_vl).strip())
+            return wtrmk_date.strftime("%Y-%m-%d %H:%M:%S.%f")
+        return str(wtrmk_vl)
+
+    def get_wtrmk_literal(wtrmk_vl, wtrmk_type_cd, db_knd_cd = None):
+        """
+        워터마크 비교 리터럴 (숫자: 따옴표 없음, 날짜: oracle, tibero 는 TO_TIMESTAMP, 그 외 문자열)
+        params: wtrmk_vl (normalize_wtrmk_vl 결과), wtrmk_type_cd, db_knd_cd
+        return: literal
+        """
+        if wtrmk_type_cd == "number":
+            return wtrmk_vl
+        if wtrmk_type_cd == "date" and (db_knd_cd or "").lower() in ("oracle", "tibero"):
+            return f"TO_TIMESTAMP('{DbUtil.escape_literal(wtrmk_vl)}', 'YYYY-MM-DD HH24:MI:SS.FF')"
+        return f"'{DbUtil.escape_literal(wtrmk_vl)}'"
+
+    def commit_watermark(session, dtst_cd, clct_log_sn):
+        """
+        DW 적재 완료 시 대기 워터마크 반영 (같은 clct_log_sn 으로 수집한 경우만)
+        params: session, dtst_cd, clct_log_sn
+        """
+        try:
+            with session.begin() as conn:
+                wtrmk_info = conn.get(TnDataClctWtrmkInfo, dtst_cd)
+                if wtrmk_info is not None and wtrmk_info.pndng_clct_log_sn == clct_log_sn:
+                    wtrmk_info.wtrmk_vl = wtrmk_info.pndng_wtrmk_vl
+                    wtrmk_info.pndng_wtrmk_vl = None
+                    wtrmk_info.pndng_clct_log_sn = None
+                    wtrmk_info.mdfcn_dt = dt.datetime.now()
+                    logging.info(f"commit_watermark::: {dtst_cd} {wtrmk_info.wtrmk_col_nm} = {wtrmk_info.wtrmk_vl}")
+        except Exception as e:
+            logging.error(f"commit_watermark Exception::: {e}")
+            raise e
+
+    def escape_literal(value):
+        """
+        SQL 문자열 리터럴 escape
+        params: value
+        return: escaped value
+        """
+        return str(value).replace("'", "''")
+
+class NativeConnection:
+    """
+    native driver 커넥션 (cursor 조회 값을 JDBC 조회 값 형식으로 변환)
+    """
+    def __init__(self, db_conn, db_knd_cd, fetch_size = DB_FETCH_SIZE):
+        self.db_conn = db_conn
+        self.db_knd_cd = db_knd_cd
+        self.fetch_size = fetch_size
+
+    def cursor(self):
+        cursor = self.db_conn.cursor()
+        cursor.arraysize = self.fetch_size
+        if self.db_knd_cd == "oracle":
+            cursor.prefetchrows = self.fetch_size + 1
+        return NativeCursor(cursor, self.db_knd_cd)
+
+    def close(self):
+        self.db_conn.close()
+
+class NativeCursor:
+    """
+    native driver cursor (execute, description, fetchmany, fetchone, close)
+    """
+    def __init__(self, cursor, db_knd_cd):
+        self.cursor = cursor
+        self.db_knd_cd = db_knd_cd
+        self.description = None
+        self.number_list = []
+
+    def execute(self, stmt):
+        self.cursor.execute(stmt)
+        self.description = self.cursor.description
+        if self.db_knd_cd == "oracle":
+            import oracledb
+            self.number_list = [description[1] is oracledb.DB_TYPE_NUMBER for description in self.description]
+        else:
+            self.number_list = [False] * len(self.description)
+
+    def fetchmany(self, size):
+        return [tuple(None if value is None else DbUtil.convert_native_value(value, number_yn) for value, number_yn in zip(row, self.number_list)) for row in self.cursor.fetchmany(size)]
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        self.cursor.close()
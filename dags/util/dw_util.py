@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import re
+
+from util.common_util import DW_COMMON_COLUMN
+
+DW_PARTITION_NAME_MAX = 63  # PostgreSQL 식별자 최대 길이
+
+class DwUtil:
+    """
+    DW 적재 SQL 유틸 (sdag_csv_to_dw_hadoop)
+    """
+    def get_upsert_stmt(tn_data_bsc_info, file_column, temp_table_name):
+        """
+        임시 테이블 -> DW 테이블 upsert 문 (dw_load_mthd_cd: upsert, upsert_all)
+        crtr_del_col_nm (콤마 구분) 을 키 컬럼으로 INSERT ... ON CONFLICT DO UPDATE, DW 테이블에 키 컬럼 unique index 필요
+        파일 내 키 중복 시 마지막 행 적재 (clct_sn 역순, clct_sn 없으면 copy 순서 역순)
+        upsert: 수집 공통 컬럼을 제외한 값이 바뀐 행만 update / upsert_all: 키가 같은 행 모두 update
+        params: tn_data_bsc_info, file_column, temp_table_name
+        return: upsert_stmt
+        """
+        dw_tbl_phys_nm = tn_data_bsc_info.dw_tbl_phys_nm
+        key_column_list = [column.strip().strip('"').lower() for column in (tn_data_bsc_info.crtr_del_col_nm or "").split(",") if column.strip()]
+        if not key_column_list:
+            raise ValueError(f"upsert 키 컬럼 (crtr_del_col_nm) 없음::: {dw_tbl_phys_nm}")
+        update_column_list = [column for column in file_column if column not in key_column_list]
+        compare_column_list = [column for column in update_column_list if column not in DW_COMMON_COLUMN]
+        order_column = '"clct_sn" DESC' if "clct_sn" in file_column else "ctid DESC"
+
+        upsert_stmt = f"""
+            INSERT INTO {dw_tbl_phys_nm} AS t (
+                "{'", "'.join(file_column)}"
+            ) SELECT DISTINCT ON ("{'", "'.join(key_column_list)}") "{'", "'.join(file_column)}" FROM {temp_table_name}
+            ORDER BY "{'", "'.join(key_column_list)}", {order_column}
+            ON CONFLICT ("{'", "'.join(key_column_list)}") DO
+        """
+        if not update_column_list:
+            return upsert_stmt + " NOTHING"
+        upsert_stmt += f""" UPDATE SET {', '.join(f'"{column}" = EXCLUDED."{column}"' for column in update_column_list)}"""
+        if tn_data_bsc_info.dw_load_mthd_cd.lower() == "upsert" and compare_column_list:  # 변경 없는 행 update 제외
+            upsert_stmt += f"""
+                WHERE ROW({', '.join(f't."{column}"' for column in compare_column_list)})
+                    IS DISTINCT FROM ROW({', '.join(f'EXCLUDED."{column}"' for column in compare_column_list)})
+            """
+        return upsert_stmt
+
+    def get_partition_name(dw_tbl_phys_nm, partition_value):
+        """
+        DW 테이블 파티션명 ({dw_tbl_phys_nm}_{파티션값}, 63자 초과 시 파티션값 md5 사용)
+        params: dw_tbl_phys_nm, partition_value
+        return: partition_name
+        """
+        partition_name = f"{dw_tbl_phys_nm}_{re.sub('[^0-9a-zA-Z_]', '_', partition_value)}".lower()
+        if len(partition_name) > DW_PARTITION_NAME_MAX:
+            suffix = "_" + hashlib.md5(partition_value.encode()).hexdigest()[:12]
+            partition_name = dw_tbl_phys_nm[:DW_PARTITION_NAME_MAX - len(suffix)].lower() + suffix
+        return partition_name
+
+    def get_partition_key(cursor, dw_tbl_phys_nm, partition_column):
+        """
+        DW 테이블 LIST 파티션 키 유형 조회 (파티션 테이블이 아니거나, 다중 컬럼 키, 설정 컬럼과 다른 키면 ValueError)
+        params: cursor, dw_tbl_phys_nm, partition_column
+        return: partition_key_type (format_type, ex. integer, date, character varying(8))
+        """
+        cursor.execute(f"""SELECT a.attname, format_type(a.atttypid, a.atttypmod), pt.partnatts, pt.partstrat
+                           FROM pg_partitioned_table pt LEFT JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+                           WHERE pt.partrelid = '{dw_tbl_phys_nm}'::regclass""")
+        partition_key = cursor.fetchone()
+        if partition_key is None:
+            raise ValueError(f"파티션 테이블 아님::: {dw_tbl_phys_nm}")
+        key_column_nm, partition_key_type, partnatts, partstrat = partition_key
+        if partnatts != 1 or partstrat != "l" or key_column_nm is None:
+            raise ValueError(f"단일 컬럼 LIST 파티션만 지원::: {dw_tbl_phys_nm} (partnatts {partnatts}, partstrat {partstrat})")
+        if key_column_nm != partition_column:
+            raise ValueError(f"파티션 키 컬럼 불일치::: {dw_tbl_phys_nm} 파티션 키 {key_column_nm}, crtr_del_col_nm {partition_column}")
+        return partition_key_type
+
+    def get_partition_stmt_list(cursor, tn_data_bsc_info, temp_table_name):
+        """
+        partition 적재 (dw_load_mthd_cd: partition) 시 행 단위 delete 대신 파티션 생성 및 truncate
+        DW 테이블은 crtr_del_col_nm (없으면 data_crtr_pnttm) 단일 컬럼 기준 LIST 파티션 테이블이어야 하며, 파티션 1개는 적재 1건의 데이터만 포함
+        (국가통계포털, 생활SOC 처럼 같은 data_crtr_pnttm 에 여러 적재가 있는 테이블은 crtr_del_col_nm 을 파티션 키로 설정)
+        기존 파티션은 파티션 범위 문자열이 아닌 파티션 제약조건에 키 유형으로 변환한 값을 대입해 확인 (integer, date 등 text 외 키 지원)
+        params: cursor, tn_data_bsc_info, temp_table_name
+        return: partition_stmt_list
+        """
+        dw_tbl_phys_nm = tn_data_bsc_info.dw_tbl_phys_nm
+        partition_column = (tn_data_bsc_info.crtr_del_col_nm or "data_crtr_pnttm").strip().strip('"').lower()
+        if "," in partition_column:
+            raise ValueError(f"다중 컬럼 파티션 키 미지원 (crtr_del_col_nm 단일 컬럼 설정 필요)::: {dw_tbl_phys_nm} {tn_data_bsc_info.crtr_del_col_nm}")
+        partition_key_type = DwUtil.get_partition_key(cursor, dw_tbl_phys_nm, partition_column)
+
+        cursor.execute(f'SELECT DISTINCT "{partition_column}"::text FROM {temp_table_name} WHERE "{partition_column}" IS NOT NULL')
+        partition_value_list = [partition_value for (partition_value,) in cursor.fetchall()]
+        # 기존 파티션 (DEFAULT 파티션 제외) 파티션명, 제약조건
+        cursor.execute(f"""SELECT c.relname, pg_get_partition_constraintdef(c.oid)
+                           FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                           WHERE i.inhparent = '{dw_tbl_phys_nm}'::regclass AND pg_get_expr(c.relpartbound, c.oid) <> 'DEFAULT'""")
+        partition_list = cursor.fetchall()
+
+        partition_dict = {}  # 파티션값 -> 기존 파티션명
+        for partition_name, partition_constraint in partition_list:
+            remain_value_list = [partition_value for partition_value in partition_value_list if partition_value not in partition_dict]
+            if not remain_value_list:
+                break
+            cursor.execute(f"""SELECT p.partition_value FROM (
+                                   SELECT partition_value, partition_value::{partition_key_type} AS "{partition_column}" FROM unnest(%s::text[]) partition_value
+                               ) p WHERE {partition_constraint.replace('%', '%%')}""", (remain_value_list,))
+            for (partition_value,) in cursor.fetchall():
+                partition_dict[partition_value] = partition_name
+
+        partition_stmt_list = []
+        for partition_value in partition_value_list:
+            partition_name = partition_dict.get(partition_value)
+            if partition_name is None:
+                partition_name = DwUtil.get_partition_name(dw_tbl_phys_nm, partition_value)
+                partition_stmt_list.append(f"""CREATE TABLE {partition_name} PARTITION OF {dw_tbl_phys_nm} FOR VALUES IN ('{partition_value.replace("'", "''")}')""")
+            else:
+                logging.info(f"get_partition_stmt_list::: {dw_tbl_phys_nm} {partition_column} {partition_value} 기존 파티션 {partition_name}")
+            partition_stmt_list.append(f"TRUNCATE TABLE {partition_name}")
+        return partition_stmt_list
@@ -1,12 +1,33 @@
 import os
+import json
 import logging
 import pandas as pd
+import shutil
+import struct
+import tempfile
 import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
 from Crypto.Protocol.KDF import PBKDF2
 
+try:
+    import zstandard
+except ImportError:  # zstandard 미설치 시 deflate 로 대체
+    zstandard = None
+
+ENCRYPT_CHUNK_SIZE = 8 * 1024 * 1024  # 암호화/복호화 읽기 단위 (byte)
+ENCRYPT_FORMAT_MAGIC = b"GSDPENC1"  # 암호화 파일 형식 버전 1 (salt, nonce, ciphertext, tag 순서) 식별자
+ZIP_CHUNK_SIZE = 1024 * 1024  # zip 압축 읽기 단위 (byte)
+ZIP_MAX_WORKERS = min(4, os.cpu_count() or 1)  # zip 병렬 압축 프로세스 수
+ZIP_STORED_EXTN = ('.zip', '.gz', '.7z', '.xlsx', '.jpg', '.jpeg', '.png')  # 이미 압축된 파일 확장자 (재압축하지 않음)
+ZIP_ZSTANDARD = getattr(zipfile, 'ZIP_ZSTANDARD', 93)  # zip 압축 방식 번호 (APPNOTE 93: zstd)
+ZIP_CODEC_DEFAULT = {"codec": "deflate", "level": 3}  # 내부 전송 zip 압축 코덱 기본값 (Variable zip_codec_config 로 pvdr_site_cd 별 변경)
+ZIP_UINT32_MAX = 0xFFFFFFFF  # zip 헤더 4byte 필드 최대값 (이상이면 zip64 확장 필드 사용)
+ZIP_UINT16_MAX = 0xFFFF  # zip 헤더 2byte 필드 최대값
+
 class FileUtil:        
     def check_csv_length(link_file_sprtr, full_file_name):
         """
@@ -21,10 +42,10 @@ class FileUtil:
         return row_count
     
     
-    def zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle):
+    def zip_file(full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle, zip_codec = None):
         """
-        파일 zip 압축
-        params: full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle
+        파일 zip 압축 (zip_codec 이 zstd 인 경우 zstd 로 압축, 압축 방식은 zip 헤더에 기록)
+        params: full_file_path, pvdr_site_nm, link_file_extn, pvdr_sou_data_pvsn_stle, zip_codec
         """
         # #국가통계포털 수집 전 20240903
         # try:
@@ -44,17 +65,105 @@ class FileUtil:
         try:
             os.chdir(full_file_path)
             full_zip_path = FileUtil.set_full_zip_path(full_file_path, pvdr_site_nm, pvdr_sou_data_pvsn_stle)
-            zip_file = zipfile.ZipFile(full_zip_path, "w")  # "w": write 모드, 존재 시 덮어쓰기
-            for file in os.listdir(full_file_path):
-                file_path = os.path.join(full_file_path, file)
-                if (file.endswith(link_file_extn) or file.endswith(pvdr_sou_data_pvsn_stle) or (link_file_extn == 'xls' and file.endswith('xls_sample.csv'))) and not file.endswith('.zip'):  # csv, xml, json, TXT # 국가통계포털 - db인 경우: csv, json / download인 경우: xls, xls_sample.csv
-                    zip_file.write(file, compress_type = zipfile.ZIP_DEFLATED)
-            zip_file.close()
+            file_list = [file for file in os.listdir(full_file_path)
+                         if (file.endswith(link_file_extn) or file.endswith(pvdr_sou_data_pvsn_stle) or (link_file_extn == 'xls' and file.endswith('xls_sample.csv'))) and not file.endswith('.zip')]  # csv, xml, json, TXT # 국가통계포털 - db인 경우: csv, json / download인 경우: xls, xls_sample.csv
+            zip_codec = zip_codec or ZIP_CODEC_DEFAULT
+            if zip_codec['codec'] == 'zstd' or (len(file_list) > 1 and ZIP_MAX_WORKERS > 1):
+                FileUtil.zip_file_parallel(full_file_path, full_zip_path, file_list, zip_codec = zip_codec)
+            else:
+                zip_file = zipfile.ZipFile(full_zip_path, "w")  # "w": write 모드, 존재 시 덮어쓰기
+                for file in file_list:
+                    zip_file.write(file, compress_type = FileUtil.get_compress_type(file))
+                zip_file.close()
         except Exception as e:
             logging.info(f"zip_file Exception::: {e}")
             raise e
         logging.info(f"zip_file full_zip_path::: {full_zip_path}")
 
+    def get_zip_codec(kwargs, pvdr_site_cd):
+        """
+        pvdr_site_cd 별 내부 전송 zip 압축 코덱 조회 (Variable zip_codec_config, zstandard 미설치 시 deflate)
+        ex) {"default": {"codec": "deflate"}, "ps00010": {"codec": "zstd", "level": 6}}
+        params: kwargs, pvdr_site_cd
+        return: zip_codec {"codec": deflate/zstd, "level": 압축 레벨}
+        """
+        zip_codec = dict(ZIP_CODEC_DEFAULT)
+        try:
+            zip_codec_config = kwargs['var']['value'].get('zip_codec_config', None) or {}
+            if isinstance(zip_codec_config, str):
+                zip_codec_config = json.loads(zip_codec_config)
+            zip_codec_config = {str(key).lower(): value for key, value in zip_codec_config.items()}
+            zip_codec.update(zip_codec_config.get('default', {}))
+            zip_codec.update(zip_codec_config.get(str(pvdr_site_cd).lower(), {}))
+        except Exception as e:
+            logging.info(f"get_zip_codec Exception::: {e}")
+        if zip_codec['codec'] == 'zstd' and zstandard is None:
+            logging.warning(f"get_zip_codec::: {pvdr_site_cd} zstd 설정, zstandard 모듈 미설치로 deflate 로 압축")
+            zip_codec['codec'] = 'deflate'
+        elif zip_codec['codec'] not in ('zstd', 'deflate'):
+            logging.warning(f"get_zip_codec::: {zip_codec['codec']} 사용 불가, deflate 로 압축")
+            zip_codec['codec'] = 'deflate'
+        return zip_codec
+
+    def get_compress_type(file_name, store_compressed = True, zip_codec = None):
+        """
+        파일별 zip 압축 방식 (이미 압축된 파일은 저장만)
+        params: file_name, store_compressed, zip_codec
+        return: compress_type
+        """
+        if store_compressed and file_name.lower().endswith(ZIP_STORED_EXTN):
+            return zipfile.ZIP_STORED
+        if zip_codec and zip_codec['codec'] == 'zstd':
+            return ZIP_ZSTANDARD
+        return zipfile.ZIP_DEFLATED
+
+    def compress_member(file_name, temp_file_name, compress_type, compress_level = 3):
+        """
+        zip 멤버 1개 압축 (프로세스 풀에서 실행, 압축 데이터는 temp_file_name 에 저장)
+        params: file_name, temp_file_name, compress_type, compress_level (zstd 압축 레벨)
+        return: crc, compress_size, file_size
+        """
+        crc = 0
+        file_size = 0
+        compressor = None
+        if compress_type == zipfile.ZIP_DEFLATED:
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        elif compress_type == ZIP_ZSTANDARD:
+            compressor = zstandard.ZstdCompressor(level = compress_level).compressobj()
+        with open(file_name, 'rb') as in_file, open(temp_file_name, 'wb') as out_file:
+            for chunk in iter(lambda: in_file.read(ZIP_CHUNK_SIZE), b""):
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                out_file.write(compressor.compress(chunk) if compressor else chunk)
+            if compressor:
+                out_file.write(compressor.flush())
+            compress_size = out_file.tell()
+        return crc, compress_size, file_size
+
+    def zip_file_parallel(full_file_path, full_zip_path, file_list, max_workers = ZIP_MAX_WORKERS, store_compressed = True, zip_codec = None):
+        """
+        파일별 압축을 프로세스 풀에서 병렬로 실행 후 표준 zip 파일로 조립 (zip64 포함)
+        params: full_file_path, full_zip_path, file_list, max_workers, store_compressed (이미 압축된 파일 재압축 여부), zip_codec
+        """
+        zip_codec = zip_codec or ZIP_CODEC_DEFAULT
+        temp_path = tempfile.mkdtemp(dir = full_file_path)
+        try:
+            with ProcessPoolExecutor(max_workers = max(1, min(max_workers, len(file_list)))) as executor:
+                futures = []
+                for index, file in enumerate(file_list):
+                    compress_type = FileUtil.get_compress_type(file, store_compressed, zip_codec)
+                    temp_file_name = os.path.join(temp_path, str(index))
+                    futures.append((file, compress_type, temp_file_name, executor.submit(FileUtil.compress_member, os.path.join(full_file_path, file), temp_file_name, compress_type, zip_codec['level'])))
+
+                # 파일 순서대로 local header + 압축 데이터 기록, 중앙 디렉터리는 close 시 기록
+                with ZipAssembler(full_zip_path) as zip_assembler:
+                    for file, compress_type, temp_file_name, future in futures:
+                        crc, compress_size, file_size = future.result()
+                        zip_assembler.write_member(os.path.join(full_file_path, file), file, temp_file_name, compress_type, crc, compress_size, file_size)
+                        os.remove(temp_file_name)
+        finally:
+            shutil.rmtree(temp_path, ignore_errors = True)
+
     def set_full_zip_path(full_file_path, pvdr_site_nm, pvdr_sou_data_pvsn_stle):
         """
         full_zip_path 설정
@@ -69,10 +178,12 @@ class FileUtil:
         full_zip_path += ".zip"
         return full_zip_path
     
-    def encrypt_file(full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle):
+    def encrypt_file(full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle, enc_format_version = 0):
         """
-        zip 파일 AES-256 암호화
-        params: full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle
+        zip 파일 AES-256 암호화 (ENCRYPT_CHUNK_SIZE 단위로 읽어서 암호화)
+        enc_format_version 0: salt, nonce, tag, ciphertext (기존 형식, tag 자리 비워두고 암호화 후 기록)
+        enc_format_version 1: ENCRYPT_FORMAT_MAGIC, salt, nonce, ciphertext, tag (tag 후행, 순차 쓰기만 가능한 경우)
+        params: full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle, enc_format_version
         return: full_file_name 암호화된 zip 파일
         """
         try:
@@ -90,16 +201,23 @@ class FileUtil:
 
             salt = get_random_bytes(16)
             key = PBKDF2(encrypt_key, salt, dkLen=32, count=100000)
-            cipher = AES.new(key, AES.MODE_GCM)
             for file in os.listdir(full_file_path):
                 if ((pvdr_site_nm == "국가통계포털" and pvdr_sou_data_pvsn_stle == "json" and file.endswith("db.zip")) or (pvdr_site_nm == "국가통계포털" and pvdr_sou_data_pvsn_stle == "xls" and file.endswith("download.zip"))
                     or (pvdr_site_nm != "국가통계포털" and file.endswith("zip"))) and not file.endswith("enc.zip") and not file.startswith("경기도BMS시스템_SHP") and not file.startswith("YANGJU_SHAPE"):
-                    with open(file, 'rb') as f:
-                        plaintext = f.read()
-                    ciphertext, tag = cipher.encrypt_and_digest(plaintext)
-                    
-                    with open(full_file_name, 'wb') as f:
-                        [f.write(x) for x in (salt, cipher.nonce, tag, ciphertext)]
+                    cipher = AES.new(key, AES.MODE_GCM)
+                    with open(file, 'rb') as in_file, open(full_file_name, 'wb') as out_file:
+                        if enc_format_version == 1:
+                            [out_file.write(x) for x in (ENCRYPT_FORMAT_MAGIC, salt, cipher.nonce)]
+                        else:
+                            [out_file.write(x) for x in (salt, cipher.nonce, bytes(16))]  # tag 자리
+                        for chunk in iter(lambda: in_file.read(ENCRYPT_CHUNK_SIZE), b""):
+                            out_file.write(cipher.encrypt(chunk))
+                        tag = cipher.digest()
+                        if enc_format_version == 1:
+                            out_file.write(tag)
+                        else:
+                            out_file.seek(32)
+                            out_file.write(tag)
                     
                     # zip 파일 삭제
                     # os.remove(file)
@@ -111,7 +229,7 @@ class FileUtil:
 
     def decrypt_file(full_file_path, pvdr_site_nm, encrypt_key, pvdr_sou_data_pvsn_stle):
         """
-        zip 파일 AES-256 복호화
+        zip 파일 AES-256 복호화 (ENCRYPT_CHUNK_SIZE 단위로 읽어서 복호화, 형식 버전 자동 확인)
         params: full_file_path, pvdr_site_nm, encrypt_key
         """
         full_file_name = pvdr_site_nm
@@ -128,17 +246,42 @@ class FileUtil:
 
             for file in os.listdir(full_file_path):
                 if file.endswith(enc_zip_file_name):
-                    with open(file, 'rb') as f:
-                        salt, nonce, tag, ciphertext = [f.read(x) for x in (16, 16, 16, -1)]
-                    key = PBKDF2(encrypt_key, salt, dkLen=32, count=100000)
-                    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
-                    plaintext = cipher.decrypt_and_verify(ciphertext, tag)
-                    with open(full_file_name, 'wb') as f:
-                        f.write(plaintext)
+                    FileUtil.decrypt_stream(file, full_file_name, encrypt_key)
         except Exception as e:
             logging.info(f"decrypt_file Exception::: {e}")
             raise e
         return full_file_name
+
+    def decrypt_stream(enc_file_name, full_file_name, encrypt_key):
+        """
+        암호화 파일 복호화 후 tag 검증 (검증 실패 시 복호화 파일 삭제)
+        params: enc_file_name, full_file_name, encrypt_key
+        """
+        file_size = os.path.getsize(enc_file_name)
+        with open(enc_file_name, 'rb') as in_file:
+            if in_file.read(len(ENCRYPT_FORMAT_MAGIC)) == ENCRYPT_FORMAT_MAGIC:  # 형식 버전 1
+                salt, nonce = [in_file.read(x) for x in (16, 16)]
+                in_file.seek(file_size - 16)
+                tag = in_file.read(16)
+                in_file.seek(len(ENCRYPT_FORMAT_MAGIC) + 32)
+                remain_size = file_size - len(ENCRYPT_FORMAT_MAGIC) - 48
+            else:  # 형식 버전 0
+                in_file.seek(0)
+                salt, nonce, tag = [in_file.read(x) for x in (16, 16, 16)]
+                remain_size = file_size - 48
+            key = PBKDF2(encrypt_key, salt, dkLen=32, count=100000)
+            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+            try:
+                with open(full_file_name, 'wb') as out_file:
+                    while remain_size > 0:
+                        chunk = in_file.read(min(ENCRYPT_CHUNK_SIZE, remain_size))
+                        remain_size -= len(chunk)
+                        out_file.write(cipher.decrypt(chunk))
+                cipher.verify(tag)
+            except Exception as e:
+                if os.path.exists(full_file_name):
+                    os.remove(full_file_name)
+                raise e
     
     def unzip_file(full_file_path, pvdr_site_nm, pvdr_sou_data_pvsn_stle):
         """
@@ -148,12 +291,47 @@ class FileUtil:
         try:
             full_zip_path = FileUtil.set_full_zip_path(full_file_path, pvdr_site_nm, pvdr_sou_data_pvsn_stle)
             with zipfile.ZipFile(full_zip_path, "r") as zf:
-                zf.extractall(full_file_path)
+                for zip_info in zf.infolist():
+                    if zip_info.compress_type == ZIP_ZSTANDARD and not hasattr(zipfile, 'ZIP_ZSTANDARD'):
+                        FileUtil.unzip_zstd_member(full_zip_path, zip_info, full_file_path)
+                    else:
+                        zf.extract(zip_info, full_file_path)
         except Exception as e:
             logging.info(f"unzip_file Exception::: {e}")
             raise e
         logging.info(f"unzip_file full_zip_path::: {full_zip_path}")
 
+    def unzip_zstd_member(full_zip_path, zip_info, full_file_path):
+        """
+        zstd 압축 zip 멤버 압축 해제 (zipfile 미지원 버전용, local header 이후 압축 데이터를 직접 읽어서 해제 및 crc 검증)
+        params: full_zip_path, zip_info, full_file_path
+        """
+        if zstandard is None:
+            raise RuntimeError(f"zstandard 미설치, zstd 압축 해제 불가::: {zip_info.filename}")
+        out_file_name = os.path.join(full_file_path, os.path.basename(zip_info.filename))
+        with open(full_zip_path, 'rb') as in_file:
+            in_file.seek(zip_info.header_offset)
+            local_header = in_file.read(zipfile.sizeFileHeader)
+            file_name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            in_file.seek(file_name_length + extra_length, os.SEEK_CUR)
+            decompressor = zstandard.ZstdDecompressor().decompressobj()
+            crc = 0
+            remain_size = zip_info.compress_size
+            try:
+                with open(out_file_name, 'wb') as out_file:
+                    while remain_size > 0:
+                        chunk = in_file.read(min(ZIP_CHUNK_SIZE, remain_size))
+                        remain_size -= len(chunk)
+                        data = decompressor.decompress(chunk)
+                        crc = zlib.crc32(data, crc)
+                        out_file.write(data)
+                if crc != zip_info.CRC:
+                    raise zipfile.BadZipFile(f"CRC 불일치::: {zip_info.filename}")
+            except Exception as e:
+                if os.path.exists(out_file_name):
+                    os.remove(out_file_name)
+                raise e
+
     def check_file_exist(full_file_name):
         """
         파일의 존재 여부 확인
@@ -165,4 +343,100 @@ class FileUtil:
         except FileExistsError as e:
             logging.info(f"check_file_exist FileExistsError::: {e}")
             raise e
-        return result
\ No newline at end of file
+        return result
+
+class ZipAssembler:
+    """
+    압축이 끝난 멤버 파일을 표준 zip 파일로 조립 (zipfile 내부 상태를 사용하지 않고 APPNOTE 형식대로 local header, 중앙 디렉터리 직접 기록)
+    크기, offset, 멤버 수가 헤더 필드 범위를 넘으면 zip64 확장 필드 및 zip64 end of central directory 기록
+    """
+    def __init__(self, full_zip_path, force_zip64 = False):
+        self.zip_file = open(full_zip_path, 'wb')
+        self.force_zip64 = force_zip64
+        self.member_list = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.zip_file.close()
+        return False
+
+    def write_member(self, file_name, arcname, temp_file_name, compress_type, crc, compress_size, file_size):
+        """
+        멤버 1개 기록 (local header + temp_file_name 의 압축 데이터)
+        params: file_name (원본 파일, 수정 시각 및 권한), arcname, temp_file_name, compress_type, crc, compress_size, file_size
+        """
+        zip_info = zipfile.ZipInfo.from_file(file_name, arcname)
+        try:
+            file_name_bytes = zip_info.filename.encode('ascii')
+            flag_bits = 0
+        except UnicodeEncodeError:
+            file_name_bytes = zip_info.filename.encode('utf-8')
+            flag_bits = 0x800  # 파일명 utf-8
+        zip64_yn = self.force_zip64 or file_size >= ZIP_UINT32_MAX or compress_size >= ZIP_UINT32_MAX
+        if compress_type == ZIP_ZSTANDARD:
+            extract_version = 63  # zstd 해제 필요 버전
+        elif zip64_yn:
+            extract_version = 45
+        else:
+            extract_version = 20
+        year, month, day, hour, minute, second = zip_info.date_time
+        dos_date = (year - 1980) << 9 | month << 5 | day
+        dos_time = hour << 11 | minute << 5 | second // 2
+
+        header_offset = self.zip_file.tell()
+        extra = struct.pack("<HHQQ", 1, 16, file_size, compress_size) if zip64_yn else b""
+        self.zip_file.write(struct.pack("<IHHHHHIIIHH", 0x04034b50, extract_version, flag_bits, compress_type, dos_time, dos_date, crc,
+                                        ZIP_UINT32_MAX if zip64_yn else compress_size, ZIP_UINT32_MAX if zip64_yn else file_size, len(file_name_bytes), len(extra)))
+        self.zip_file.write(file_name_bytes)
+        self.zip_file.write(extra)
+        with open(temp_file_name, 'rb') as temp_file:
+            shutil.copyfileobj(temp_file, self.zip_file, ZIP_CHUNK_SIZE)
+        self.member_list.append({"file_name_bytes": file_name_bytes, "flag_bits": flag_bits, "extract_version": extract_version, "compress_type": compress_type,
+                                 "dos_time": dos_time, "dos_date": dos_date, "crc": crc, "compress_size": compress_size, "file_size": file_size,
+                                 "external_attr": zip_info.external_attr, "header_offset": header_offset})
+
+    def close(self):
+        """
+        중앙 디렉터리, end of central directory 기록 후 파일 닫기
+        """
+        try:
+            central_dir_offset = self.zip_file.tell()
+            for member in self.member_list:
+                zip64_list = []  # zip64 확장 필드 순서: 원본 크기, 압축 크기, local header offset
+                file_size = member['file_size']
+                compress_size = member['compress_size']
+                header_offset = member['header_offset']
+                if self.force_zip64 or file_size >= ZIP_UINT32_MAX:
+                    zip64_list.append(file_size)
+                    file_size = ZIP_UINT32_MAX
+                if self.force_zip64 or compress_size >= ZIP_UINT32_MAX:
+                    zip64_list.append(compress_size)
+                    compress_size = ZIP_UINT32_MAX
+                if self.force_zip64 or header_offset >= ZIP_UINT32_MAX:
+                    zip64_list.append(header_offset)
+                    header_offset = ZIP_UINT32_MAX
+                extra = struct.pack(f"<HH{len(zip64_list)}Q", 1, 8 * len(zip64_list), *zip64_list) if zip64_list else b""
+                extract_version = max(member['extract_version'], 45) if zip64_list else member['extract_version']
+                self.zip_file.write(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014b50, 3 << 8 | extract_version, extract_version, member['flag_bits'], member['compress_type'],
+                                                member['dos_time'], member['dos_date'], member['crc'], compress_size, file_size,
+                                                len(member['file_name_bytes']), len(extra), 0, 0, 0, member['external_attr'], header_offset))
+                self.zip_file.write(member['file_name_bytes'])
+                self.zip_file.write(extra)
+            central_dir_size = self.zip_file.tell() - central_dir_offset
+            member_count = len(self.member_list)
+
+            if self.force_zip64 or member_count >= ZIP_UINT16_MAX or central_dir_offset >= ZIP_UINT32_MAX or central_dir_size >= ZIP_UINT32_MAX:
+                zip64_end_offset = self.zip_file.tell()
+                self.zip_file.write(struct.pack("<IQHHIIQQQQ", 0x06064b50, 44, 3 << 8 | 45, 45, 0, 0, member_count, member_count, central_dir_size, central_dir_offset))
+                self.zip_file.write(struct.pack("<IIQI", 0x07064b50, 0, zip64_end_offset, 1))
+                member_count = min(member_count, ZIP_UINT16_MAX)
+                central_dir_size = min(central_dir_size, ZIP_UINT32_MAX)
+                central_dir_offset = min(central_dir_offset, ZIP_UINT32_MAX)
+            self.zip_file.write(struct.pack("<IHHHHIIH", 0x06054b50, 0, 0, member_count, member_count, central_dir_size, central_dir_offset, 0))
+        finally:
+            self.zip_file.close()
@@ -0,0 +1,184 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+HDFS_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # HDFS 전송 읽기 단위 (byte)
+HDFS_UPLOAD_MAX_WORKERS = 4  # HDFS 동시 전송 파일 수 (Variable hdfs_upload_workers 로 변경)
+HDFS_UPLOAD_MANIFEST = ".hdfs_upload_manifest.json"  # 전송 이력 (hdfs_file_path: size, mtime, checksum)
+HDFS_USER = "gsdpmng"
+HDFS_NAMENODE_HOSTS = ["192.168.1.23", "192.168.1.24"]  # local test
+# HDFS_NAMENODE_HOSTS = ["172.25.20.91", "172.25.20.92"]  # prod
+HDFS_NAMENODE_HTTP_PORT = 9870
+HDFS_NAMENODE_CACHE_TTL = 600  # active 네임노드 캐시 유지 시간 (초)
+HDFS_NAMENODE_CACHE_FILE = os.path.join(tempfile.gettempdir(), "hdfs_active_namenode.json")  # 프로세스 간 active 네임노드 캐시
+active_namenode_cache = {}  # host, time
+active_namenode_lock = threading.Lock()
+hdfs_client_dict = {}  # (host, hdfs_user): InsecureClient
+
+class HdfsUtil:
+    def get_active_namenode(refresh = False, namenode_hosts = None):
+        """
+        active 네임노드 조회 (캐시 유지 시간 내에는 캐시 사용, 없으면 WebHDFS JMX 로 네임노드 상태 확인)
+        params: refresh (캐시 무시), namenode_hosts
+        return: active_namenode
+        """
+        namenode_hosts = namenode_hosts or HDFS_NAMENODE_HOSTS
+        with active_namenode_lock:
+            if not refresh:
+                if not active_namenode_cache:
+                    try:
+                        with open(HDFS_NAMENODE_CACHE_FILE, 'r', encoding='utf-8') as f:
+                            active_namenode_cache.update(json.load(f))
+                    except Exception:
+                        pass
+                if active_namenode_cache.get('host') in namenode_hosts and time.time() - active_namenode_cache.get('time', 0) < HDFS_NAMENODE_CACHE_TTL:
+                    return active_namenode_cache['host']
+
+            # 캐시된 네임노드 먼저 확인
+            previous_host = active_namenode_cache.get('host')
+            for host in sorted(namenode_hosts, key = lambda host: host != previous_host):
+                if HdfsUtil.get_namenode_state(host) == "active":
+                    active_namenode_cache.update({"host": host, "time": time.time()})
+                    try:
+                        with open(HDFS_NAMENODE_CACHE_FILE, 'w', encoding='utf-8') as f:
+                            json.dump(active_namenode_cache, f)
+                    except Exception as e:
+                        logging.info(f"get_active_namenode Exception::: {e}")
+                    logging.info(f"Active 네임노드: {host}")
+                    return host
+        raise Exception(f"Active 네임노드를 찾을 수 없습니다. {namenode_hosts}")
+
+    def get_namenode_state(host):
+        """
+        네임노드 HA 상태 조회 (JMX NameNodeStatus)
+        params: host
+        return: state (active, standby, 조회 실패 시 None)
+        """
+        try:
+            response = requests.get(f"http://{host}:{HDFS_NAMENODE_HTTP_PORT}/jmx", params = {"qry": "Hadoop:service=NameNode,name=NameNodeStatus"}, timeout = 5)
+            response.raise_for_status()
+            return response.json()['beans'][0]['State']
+        except Exception as e:
+            logging.info(f"get_namenode_state {host} Exception::: {e}")
+            return None
+
+    def get_client(hdfs_user = HDFS_USER, refresh = False):
+        """
+        active 네임노드 WebHDFS 클라이언트 조회 (네임노드, 사용자별 재사용)
+        params: hdfs_user, refresh (active 네임노드 다시 확인)
+        return: client
+        """
+        from hdfs import InsecureClient
+
+        host = HdfsUtil.get_active_namenode(refresh)
+        client = hdfs_client_dict.get((host, hdfs_user))
+        if client is None:
+            client = InsecureClient(f"http://{host}:{HDFS_NAMENODE_HTTP_PORT}", user = hdfs_user)
+            hdfs_client_dict[(host, hdfs_user)] = client
+        return client
+
+    def is_standby_exception(e):
+        """
+        standby 네임노드 요청 오류 여부
+        params: e
+        return: True / False
+        """
+        message = str(e)
+        return "StandbyException" in message or "in state standby" in message
+
+    def run_with_failover(func, *args, hdfs_user = HDFS_USER):
+        """
+        active 네임노드 클라이언트로 func(client, *args) 실행, StandbyException 발생 시 active 네임노드 다시 확인 후 1회 재실행
+        params: func, args, hdfs_user
+        return: func 결과
+        """
+        try:
+            return func(HdfsUtil.get_client(hdfs_user), *args)
+        except Exception as e:
+            if not HdfsUtil.is_standby_exception(e):
+                raise e
+            logging.info(f"run_with_failover::: standby 네임노드, active 네임노드 재확인 ({e})")
+            return func(HdfsUtil.get_client(hdfs_user, refresh = True), *args)
+
+    def upload_files(local_path, hdfs_path, file_list, max_workers = HDFS_UPLOAD_MAX_WORKERS, hdfs_user = HDFS_USER):
+        """
+        로컬 파일 목록을 HDFS 로 병렬 전송 (변경 없는 파일은 전송 생략, 실패 파일은 로그 후 다음 파일 진행, standby 네임노드 시 failover)
+        params: local_path, hdfs_path, file_list, max_workers, hdfs_user
+        return: result_dict {file: upload(전송) / skip(변경 없음) / error(실패)}
+        """
+        manifest = HdfsUtil.read_manifest(local_path)
+        result_dict = {}
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers = max(1, min(int(max_workers), len(file_list) or 1))) as executor:
+            futures = {file: executor.submit(HdfsUtil.run_with_failover, HdfsUtil.upload_file, os.path.join(local_path, file), hdfs_path + file, manifest.get(hdfs_path + file), hdfs_user = hdfs_user) for file in file_list}
+            for file, future in futures.items():
+                try:
+                    manifest[hdfs_path + file], result_dict[file] = future.result()
+                except Exception as e:
+                    logging.error(f"{file} 전송 실패 ::: {e}")
+                    manifest.pop(hdfs_path + file, None)
+                    result_dict[file] = "error"
+        HdfsUtil.write_manifest(local_path, manifest)
+        logging.info(f"upload_files::: {hdfs_path} 전송 {list(result_dict.values()).count('upload')}건, 생략 {list(result_dict.values()).count('skip')}건, 실패 {list(result_dict.values()).count('error')}건 ({time.time() - start_time:.1f}s)")
+        return result_dict
+
+    def upload_file(client, local_file_path, hdfs_file_path, manifest_entry = None):
+        """
+        파일 1개 HDFS 전송 (HDFS_UPLOAD_CHUNK_SIZE 단위 스트리밍)
+        전송 이력의 size, mtime 이 로컬 파일과 같고 HDFS 파일 상태 (length, modificationTime) 및 checksum 이 이력과 같으면 전송 생략
+        params: client, local_file_path, hdfs_file_path, manifest_entry
+        return: manifest_entry, upload_result (upload, skip)
+        """
+        file_stat = os.stat(local_file_path)
+        file_size = file_stat.st_size
+        file_mtime = int(file_stat.st_mtime * 1000)  # HDFS modificationTime 과 같은 ms 단위
+        if manifest_entry and manifest_entry.get('size') == file_size and manifest_entry.get('mtime') == file_mtime:
+            hdfs_status = client.status(hdfs_file_path, strict = False)
+            if hdfs_status and hdfs_status['length'] == file_size and hdfs_status['modificationTime'] == file_mtime\
+                    and client.checksum(hdfs_file_path)['bytes'] == manifest_entry.get('checksum'):
+                logging.info(f"변경 없음, 전송 생략 ::: {hdfs_file_path}")
+                return manifest_entry, "skip"
+
+        start_time = time.time()
+        with open(local_file_path, 'rb') as f:
+            client.write(hdfs_file_path, iter(lambda: f.read(HDFS_UPLOAD_CHUNK_SIZE), b""), overwrite = True)
+        elapsed_time = max(time.time() - start_time, 0.001)
+        client.set_times(hdfs_file_path, modification_time = file_mtime)  # 다음 실행 시 변경 여부 비교용
+        checksum = client.checksum(hdfs_file_path)['bytes']
+        file_size_mb = file_size / 1024 / 1024
+        logging.info(f"파일이 Active 네임노드로 전송됨 ::: {hdfs_file_path} ({file_size_mb:.1f}MB, {elapsed_time:.1f}s, {file_size_mb / elapsed_time:.1f}MB/s)")
+        return {"size": file_size, "mtime": file_mtime, "checksum": checksum}, "upload"
+
+    def read_manifest(local_path):
+        """
+        HDFS 전송 이력 조회 (없거나 읽기 실패 시 빈 dict)
+        params: local_path
+        return: manifest
+        """
+        manifest_file = os.path.join(local_path, HDFS_UPLOAD_MANIFEST)
+        try:
+            if os.path.isfile(manifest_file):
+                with open(manifest_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logging.info(f"read_manifest Exception::: {e}")
+        return {}
+
+    def write_manifest(local_path, manifest):
+        """
+        HDFS 전송 이력 저장
+        params: local_path, manifest
+        """
+        manifest_file = os.path.join(local_path, HDFS_UPLOAD_MANIFEST)
+        try:
+            with open(manifest_file + ".tmp", 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False)
+            os.replace(manifest_file + ".tmp", manifest_file)
+        except Exception as e:
+            logging.info(f"write_manifest Exception::: {e}")
@@ -0,0 +1,290 @@
+import datetime
+import decimal
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+JDBC_GATEWAY_ADDRESS = os.path.join(tempfile.gettempdir(), "jdbc_gateway.sock")  # 로컬 unix socket
+JDBC_GATEWAY_LOCK_FILE = os.path.join(tempfile.gettempdir(), "jdbc_gateway.lock")  # 게이트웨이 단일 실행 잠금
+JDBC_GATEWAY_LOG_FILE = os.path.join(tempfile.gettempdir(), "jdbc_gateway.log")
+JDBC_GATEWAY_AUTHKEY = os.environ.get("JDBC_GATEWAY_AUTHKEY", "gsdpmng-jdbc-gateway").encode()
+JDBC_GATEWAY_START_TIMEOUT = 60  # 게이트웨이 기동 대기 시간 (초)
+JDBC_GATEWAY_IDLE_TIMEOUT = 1800  # 요청 없이 유지되면 게이트웨이 종료 (초)
+JDBC_POOL_IDLE_TIMEOUT = 600  # 미사용 풀 커넥션 종료 시간 (초)
+JDBC_POOL_MAX_IDLE = 4  # 연계 DB 별 유지 커넥션 수
+JDBC_PICKLE_TYPES = (str, int, float, bool, bytes, decimal.Decimal, datetime.date, datetime.datetime, datetime.time)  # 그대로 전송 가능한 값 유형
+
+class JdbcGateway:
+    """
+    JVM 과 연계 DB 커넥션 풀을 유지하는 로컬 JDBC 게이트웨이 (task 는 unix socket 으로 조회 요청, JVM 기동 및 driver 로딩 생략)
+    게이트웨이가 없으면 첫 요청 task 가 별도 프로세스로 기동, 요청 없이 JDBC_GATEWAY_IDLE_TIMEOUT 지나면 종료
+    """
+    def connect(link_db_id, driver_class_nm, connection_url, driver_args, jars):
+        """
+        게이트웨이 커넥션 조회 (게이트웨이가 없으면 기동 후 연결)
+        params: link_db_id, driver_class_nm, connection_url, driver_args, jars
+        return: GatewayConnection
+        """
+        try:
+            client = Client(JDBC_GATEWAY_ADDRESS, 'AF_UNIX', authkey = JDBC_GATEWAY_AUTHKEY)
+        except (FileNotFoundError, ConnectionRefusedError):
+            client = JdbcGateway.start()
+        gateway_conn = GatewayConnection(client)
+        try:
+            gateway_conn.request("connect", {"link_db_id": link_db_id, "driver_class_nm": driver_class_nm, "connection_url": connection_url, "driver_args": driver_args, "jars": jars})
+        except Exception as e:
+            client.close()
+            raise e
+        return gateway_conn
+
+    def start():
+        """
+        게이트웨이 프로세스 기동 (task 종료 후에도 유지되도록 새 세션으로 실행) 후 연결 대기
+        return: client
+        """
+        with open(JDBC_GATEWAY_LOG_FILE, 'a') as log_file:
+            subprocess.Popen([sys.executable, os.path.abspath(__file__)], stdout = log_file, stderr = log_file, stdin = subprocess.DEVNULL, start_new_session = True)
+        start_time = time.time()
+        while True:
+            try:
+                return Client(JDBC_GATEWAY_ADDRESS, 'AF_UNIX', authkey = JDBC_GATEWAY_AUTHKEY)
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                if time.time() - start_time > JDBC_GATEWAY_START_TIMEOUT:
+                    raise Exception(f"JDBC 게이트웨이 기동 실패 (로그: {JDBC_GATEWAY_LOG_FILE}) {e}")
+                time.sleep(0.2)
+
+    def serve():
+        """
+        게이트웨이 실행 (이미 실행 중이면 종료)
+        """
+        lock_file = open(JDBC_GATEWAY_LOCK_FILE, 'w')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            logging.info("serve::: JDBC 게이트웨이 실행 중")
+            return
+        if os.path.exists(JDBC_GATEWAY_ADDRESS):  # 비정상 종료 시 남은 socket 파일
+            os.remove(JDBC_GATEWAY_ADDRESS)
+        os.umask(0o077)
+        listener = Listener(JDBC_GATEWAY_ADDRESS, 'AF_UNIX', authkey = JDBC_GATEWAY_AUTHKEY)
+        logging.info(f"serve::: JDBC 게이트웨이 시작 {JDBC_GATEWAY_ADDRESS} (pid {os.getpid()})")
+        pool = JdbcConnectionPool()
+        threading.Thread(target = pool.monitor, daemon = True).start()
+        while True:
+            try:
+                client = listener.accept()
+            except Exception as e:
+                logging.info(f"serve accept Exception::: {e}")
+                continue
+            threading.Thread(target = pool.handle_client, args = (client,), daemon = True).start()
+
+class GatewayConnection:
+    """
+    게이트웨이 커넥션 (DB-API 커넥션 중 extract_to_csv 에서 사용하는 cursor, close 제공)
+    """
+    def __init__(self, client):
+        self.client = client
+
+    def request(self, *message):
+        """
+        게이트웨이 요청
+        params: message (command, args)
+        return: result
+        """
+        self.client.send(message)
+        status, result = self.client.recv()
+        if status == "error":
+            raise Exception(result)
+        return result
+
+    def cursor(self):
+        return GatewayCursor(self)
+
+    def close(self):
+        try:
+            self.client.send(("close",))
+        except Exception:
+            pass
+        finally:
+            self.client.close()
+
+class GatewayCursor:
+    """
+    게이트웨이 cursor (execute, description, fetchmany, fetchone, close)
+    """
+    def __init__(self, gateway_conn):
+        self.gateway_conn = gateway_conn
+        self.description = None
+
+    def execute(self, stmt):
+        self.description = self.gateway_conn.request("execute", stmt)
+
+    def fetchmany(self, size):
+        return self.gateway_conn.request("fetchmany", size)
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        self.gateway_conn.request("close_cursor")
+
+class JdbcConnectionPool:
+    """
+    게이트웨이 내 연계 DB 커넥션 풀 (link_db_id, 접속 정보별)
+    """
+    def __init__(self):
+        self.idle_dict = {}  # pool_key: [(jaydebeapi 커넥션, 반환 시각)]
+        self.lock = threading.Lock()
+        self.client_count = 0
+        self.last_request_time = time.time()
+
+    def get_pool_key(self, connect_info):
+        """
+        풀 구분 키 (비밀번호는 hash 로 구분)
+        params: connect_info
+        return: pool_key
+        """
+        driver_args_hash = hashlib.sha256(json.dumps(connect_info['driver_args'], sort_keys = True).encode()).hexdigest()
+        return (connect_info['link_db_id'], connect_info['connection_url'], driver_args_hash)
+
+    def borrow(self, connect_info):
+        """
+        풀 커넥션 조회 (유효하지 않으면 종료, 없으면 새로 연결)
+        params: connect_info
+        return: pool_key, db_conn
+        """
+        pool_key = self.get_pool_key(connect_info)
+        while True:
+            with self.lock:
+                idle_list = self.idle_dict.get(pool_key)
+                db_conn = idle_list.pop()[0] if idle_list else None
+            if db_conn is None:
+                break
+            try:
+                if db_conn.jconn.isValid(5):
+                    return pool_key, db_conn
+            except Exception as e:
+                logging.info(f"borrow isValid Exception::: {e}")
+            JdbcConnectionPool.close_quietly(db_conn)
+
+        import jaydebeapi as jp
+        db_conn = jp.connect(connect_info['driver_class_nm'], connect_info['connection_url'], connect_info['driver_args'], connect_info['jars'])
+        logging.info(f"borrow::: {connect_info['link_db_id']} 새 커넥션")
+        return pool_key, db_conn
+
+    def give_back(self, pool_key, db_conn):
+        """
+        풀 커넥션 반환 (유지 커넥션 수 초과 시 종료)
+        params: pool_key, db_conn
+        """
+        with self.lock:
+            idle_list = self.idle_dict.setdefault(pool_key, [])
+            if len(idle_list) < JDBC_POOL_MAX_IDLE:
+                idle_list.append((db_conn, time.time()))
+                return
+        JdbcConnectionPool.close_quietly(db_conn)
+
+    def monitor(self):
+        """
+        미사용 풀 커넥션 종료, 요청 없이 JDBC_GATEWAY_IDLE_TIMEOUT 지나면 게이트웨이 종료
+        """
+        while True:
+            time.sleep(30)
+            now_time = time.time()
+            with self.lock:
+                close_list = [db_conn for idle_list in self.idle_dict.values() for db_conn, return_time in idle_list if now_time - return_time > JDBC_POOL_IDLE_TIMEOUT]
+                for pool_key in list(self.idle_dict):
+                    self.idle_dict[pool_key] = [(db_conn, return_time) for db_conn, return_time in self.idle_dict[pool_key] if now_time - return_time <= JDBC_POOL_IDLE_TIMEOUT]
+                shutdown_yn = self.client_count == 0 and now_time - self.last_request_time > JDBC_GATEWAY_IDLE_TIMEOUT
+            for db_conn in close_list:
+                JdbcConnectionPool.close_quietly(db_conn)
+            if shutdown_yn:
+                logging.info("monitor::: 요청 없음, JDBC 게이트웨이 종료")
+                with self.lock:
+                    for idle_list in self.idle_dict.values():
+                        for db_conn, return_time in idle_list:
+                            JdbcConnectionPool.close_quietly(db_conn)
+                if os.path.exists(JDBC_GATEWAY_ADDRESS):
+                    os.remove(JDBC_GATEWAY_ADDRESS)
+                os._exit(0)
+
+    def handle_client(self, client):
+        """
+        task 요청 처리 (connect, execute, fetchmany, close_cursor, close), task 종료 시 커넥션 풀 반환
+        params: client
+        """
+        pool_key = db_conn = cursor = None
+        error_yn = False
+        with self.lock:
+            self.client_count += 1
+        try:
+            while True:
+                try:
+                    message = client.recv()
+                except (EOFError, OSError):
+                    break
+                with self.lock:
+                    self.last_request_time = time.time()
+                command = message[0]
+                if command == "close":
+                    break
+                try:
+                    result = None
+                    if command == "connect":
+                        pool_key, db_conn = self.borrow(message[1])
+                    elif command == "execute":
+                        if cursor is not None:
+                            cursor.close()
+                        cursor = db_conn.cursor()
+                        cursor.execute(message[1])
+                        result = [(description[0], getattr(description[1], "values", None), None, None, None, None, None) for description in cursor.description]  # 유형은 JDBC 유형명 tuple
+                    elif command == "fetchmany":
+                        result = [tuple(value if value is None or isinstance(value, JDBC_PICKLE_TYPES) else str(value) for value in row) for row in cursor.fetchmany(message[1])]
+                    elif command == "close_cursor":
+                        if cursor is not None:
+                            cursor.close()
+                        cursor = None
+                    else:
+                        raise Exception(f"알 수 없는 요청 {command}")
+                    client.send(("ok", result))
+                except Exception as e:
+                    error_yn = True
+                    logging.info(f"handle_client {command} Exception::: {e}")
+                    client.send(("error", f"{type(e).__name__}: {e}"))
+        except Exception as e:
+            error_yn = True
+            logging.info(f"handle_client Exception::: {e}")
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    error_yn = True
+            if db_conn is not None:
+                if error_yn:  # 오류가 난 커넥션은 재사용하지 않음
+                    JdbcConnectionPool.close_quietly(db_conn)
+                else:
+                    self.give_back(pool_key, db_conn)
+            client.close()
+            with self.lock:
+                self.client_count -= 1
+                self.last_request_time = time.time()
+
+    def close_quietly(db_conn):
+        try:
+            db_conn.close()
+        except Exception as e:
+            logging.info(f"close_quietly Exception::: {e}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level = logging.INFO, format = "%(asctime)s %(levelname)s %(message)s")
+    JdbcGateway.serve()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# dags 디렉터리 (Airflow PYTHONPATH) 기준으로 util, dto 모듈 import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dags"))
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+call_url_util = pytest.importorskip("util.call_url_util")
+RateLimiter = call_url_util.RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def clear_rate_limiter():
+    RateLimiter.rate_limiter_dict.clear()
+    yield
+    RateLimiter.rate_limiter_dict.clear()
+
+
+def test_rate_limiter_per_provider_bucket():
+    rate_limit_config = {"default": {"rate": 20}, "ps00002": {"rate": 10}}
+    site_a = RateLimiter.get_rate_limiter(rate_limit_config, "ps00001", None)
+    site_b = RateLimiter.get_rate_limiter(rate_limit_config, "ps00003", None)
+    inst_a = RateLimiter.get_rate_limiter(rate_limit_config, "ps00002", "pi00001")
+    inst_b = RateLimiter.get_rate_limiter(rate_limit_config, "ps00002", "pi00002")
+
+    assert site_a is not site_b  # default 설정을 같이 쓰더라도 bucket 은 제공처별
+    assert (site_a.max_rate, site_b.max_rate) == (20, 20)
+    assert inst_a is not inst_b and (inst_a.max_rate, inst_b.max_rate) == (10, 10)
+    assert RateLimiter.get_rate_limiter(rate_limit_config, "ps00001", None) is site_a
+
+    site_a.backoff()
+    assert site_a.rate == 10 and site_b.rate == 20  # 다른 제공처 속도에 영향 없음
+
+
+def test_rate_limiter_rebuild_on_config_change():
+    rate_limiter = RateLimiter.get_rate_limiter({"default": {"rate": 20}}, "ps00001", None)
+    assert RateLimiter.get_rate_limiter({"default": {"rate": 20}}, "ps00001", None) is rate_limiter
+    changed = RateLimiter.get_rate_limiter({"default": {"rate": 5, "burst": 2}}, "ps00001", None)
+    assert changed is not rate_limiter
+    assert (changed.max_rate, changed.burst) == (5, 2)
+    assert RateLimiter.get_rate_limiter({}, "ps00001", None) is None
+
+
+def test_set_http_config_without_pvdr_inst_cd():
+    tn_data_bsc_info = SimpleNamespace(pvdr_site_cd="SAEOL", pvdr_inst_cd=None, dtst_cd="data001")
+    kwargs = {"var": {"value": {"http_client_config": {"saeol": {"retry_max": 3, "retry_rules": {"no_data": {"max_retries": 1}}}}}}}
+
+    http_config = call_url_util.CallUrlUtil.set_http_config(tn_data_bsc_info, kwargs)
+    retry_policy = call_url_util.RetryPolicy(http_config)
+
+    assert http_config['rate_limiter'] is None
+    assert retry_policy.max_retries == 3
+    assert retry_policy.wait(0, error_class="no_data") == 3  # no_data 재시도 1회 제한
+
+
+def test_retry_policy_fixed_no_data_delay(monkeypatch):
+    delay_list = []
+    monkeypatch.setattr(call_url_util.time, "sleep", delay_list.append)
+    retry_policy = call_url_util.RetryPolicy(dict(call_url_util.HTTP_CONFIG_DEFAULT), no_data={"base_delay": 240, "max_delay": 240, "jitter": False})
+
+    retry_num = 0
+    while retry_num < retry_policy.max_retries:
+        retry_num = retry_policy.wait(retry_num, error_class="no_data")
+
+    assert delay_list == [240, 240, 240, 240]  # 5회 호출 간격 고정 (데이터 생성 대기)
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+import pytest
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+from sqlalchemy.orm import sessionmaker
+
+from dto.tn_data_clct_wtrmk_info import Base, TnDataClctWtrmkInfo
+from util.db_util import DbUtil
+
+SELECT_DB_STMT = "SELECT a.*, '202401' data_crtr_pnttm FROM src a"
+
+
+class FakeCursor:
+    def __init__(self, type_code, max_value):
+        self.description = None
+        self.type_code = type_code
+        self.max_value = max_value
+        self.stmt_list = []
+
+    def execute(self, stmt):
+        self.stmt_list.append(stmt)
+        self.description = [("MAX", self.type_code, None, None, None, None, None)]
+
+    def fetchone(self):
+        return (self.max_value,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self.fake_cursor = cursor
+
+    def cursor(self):
+        return self.fake_cursor
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'meta.db'}")
+    Base.metadata.create_all(engine)
+    return sessionmaker(engine, expire_on_commit=False)
+
+
+def add_watermark(session, wtrmk_col_nm, wtrmk_vl):
+    with session.begin() as conn:
+        conn.add(TnDataClctWtrmkInfo(dtst_cd="data1", wtrmk_col_nm=wtrmk_col_nm, wtrmk_vl=wtrmk_vl))
+
+
+def get_incremental_stmt(session, type_code, max_value, db_knd_cd, clct_log_sn=10, dw_load_mthd_cd="upsert", crtr_del_col_nm="id", cursor=None):
+    cursor = cursor or FakeCursor(type_code, max_value)
+    tn_data_bsc_info = SimpleNamespace(dtst_cd="data1", dw_load_mthd_cd=dw_load_mthd_cd, crtr_del_col_nm=crtr_del_col_nm)
+    return DbUtil.get_incremental_stmt(session, lambda: FakeConnection(cursor), tn_data_bsc_info, SELECT_DB_STMT, clct_log_sn, db_knd_cd)
+
+
+@pytest.mark.parametrize("type_code", [SimpleNamespace(name="DB_TYPE_DATE"), SimpleNamespace(values=("TIMESTAMP",)), ("TIMESTAMP",)])
+def test_incremental_stmt_oracle_date(session, type_code):
+    add_watermark(session, "indt", "2024-01-01 00:00:00")
+    stmt = get_incremental_stmt(session, type_code, "2024-01-02 03:04:05", "oracle")
+
+    assert stmt == (f"SELECT * FROM ({SELECT_DB_STMT}) p WHERE "
+                    "indt > TO_TIMESTAMP('2024-01-01 00:00:00.000000', 'YYYY-MM-DD HH24:MI:SS.FF') "
+                    "AND indt <= TO_TIMESTAMP('2024-01-02 03:04:05.000000', 'YYYY-MM-DD HH24:MI:SS.FF')")
+    with session.begin() as conn:
+        wtrmk_info = conn.get(TnDataClctWtrmkInfo, "data1")
+    assert wtrmk_info.pndng_wtrmk_vl == "2024-01-02 03:04:05.000000"
+    assert wtrmk_info.pndng_clct_log_sn == 10
+
+
+def test_incremental_stmt_commit_watermark(session):
+    add_watermark(session, "indt", None)
+    stmt = get_incremental_stmt(session, SimpleNamespace(name="DB_TYPE_TIMESTAMP"), "2024-01-02 03:04:05.5", "tibero")
+    assert stmt.endswith("WHERE indt <= TO_TIMESTAMP('2024-01-02 03:04:05.500000', 'YYYY-MM-DD HH24:MI:SS.FF')")
+
+    DbUtil.commit_watermark(session, "data1", 99)  # 다른 수집 건은 반영하지 않음
+    with session.begin() as conn:
+        assert conn.get(TnDataClctWtrmkInfo, "data1").wtrmk_vl is None
+    DbUtil.commit_watermark(session, "data1", 10)
+    with session.begin() as conn:
+        wtrmk_info = conn.get(TnDataClctWtrmkInfo, "data1")
+    assert wtrmk_info.wtrmk_vl == "2024-01-02 03:04:05.500000"
+    assert wtrmk_info.pndng_wtrmk_vl is None
+
+
+@pytest.mark.parametrize("type_code, db_knd_cd", [(SimpleNamespace(name="DB_TYPE_NUMBER"), "oracle"), (SimpleNamespace(values=("DECIMAL", "NUMERIC")), "tibero"), (246, "mysql")])
+def test_incremental_stmt_number(session, type_code, db_knd_cd):
+    add_watermark(session, "sn", "12345.0")
+    stmt = get_incremental_stmt(session, type_code, 12400.0, db_knd_cd)
+    assert stmt.endswith("WHERE sn > 12345 AND sn <= 12400")
+
+
+def test_incremental_stmt_string(session):
+    add_watermark(session, "indt", "20240101000000")
+    stmt = get_incremental_stmt(session, SimpleNamespace(values=("CHAR", "VARCHAR")), "20240102030405", "oracle")
+    assert stmt.endswith("WHERE indt > '20240101000000' AND indt <= '20240102030405'")
+
+
+def test_incremental_stmt_mysql_datetime(session):
+    add_watermark(session, "upd_dt", "2024-01-01 00:00:00.000000")
+    stmt = get_incremental_stmt(session, 12, "2024-01-02 03:04:05", "mariadb")
+    assert stmt.endswith("WHERE upd_dt > '2024-01-01 00:00:00.000000' AND upd_dt <= '2024-01-02 03:04:05.000000'")
+
+
+def test_incremental_stmt_not_registered(session):
+    assert get_incremental_stmt(session, SimpleNamespace(name="DB_TYPE_DATE"), "2024-01-02", "oracle") == SELECT_DB_STMT
+
+
+@pytest.mark.parametrize("dw_load_mthd_cd, crtr_del_col_nm", [("append", None), ("append", " "), ("overwrite", "id"), ("partition", "id")])
+def test_incremental_stmt_refused_load_mthd(session, dw_load_mthd_cd, crtr_del_col_nm):
+    add_watermark(session, "indt", "2024-01-01 00:00:00")
+    cursor = FakeCursor(SimpleNamespace(name="DB_TYPE_DATE"), "2024-01-02 03:04:05")
+    stmt = get_incremental_stmt(session, None, None, "oracle", dw_load_mthd_cd=dw_load_mthd_cd, crtr_del_col_nm=crtr_del_col_nm, cursor=cursor)
+
+    assert stmt == SELECT_DB_STMT  # data_crtr_pnttm 단위 delete 적재는 전체 조회
+    assert cursor.stmt_list == []
+    with session.begin() as conn:
+        assert conn.get(TnDataClctWtrmkInfo, "data1").pndng_wtrmk_vl is None
+
+
+def test_incremental_stmt_append_with_crtr_del_col_nm(session):
+    add_watermark(session, "sn", "100")
+    stmt = get_incremental_stmt(session, SimpleNamespace(name="DB_TYPE_NUMBER"), 120, "oracle", dw_load_mthd_cd="APPEND", crtr_del_col_nm="sn")
+    assert stmt.endswith("WHERE sn > 100 AND sn <= 120")
@@ -0,0 +1,106 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("util.common_util")  # airflow 환경 모듈 (pendulum, sqlalchemy) 없으면 skip
+from util.dw_util import DwUtil
+
+# DW 적재 SQL 테스트용 PostgreSQL 접속 정보 (ex. "host=/tmp port=5432 user=postgres"), 없으면 skip
+DW_TEST_DSN = os.environ.get("DW_TEST_DSN")
+
+
+@pytest.fixture
+def cursor():
+    if not DW_TEST_DSN:
+        pytest.skip("DW_TEST_DSN 미설정")
+    psycopg2 = pytest.importorskip("psycopg2")
+    conn = psycopg2.connect(DW_TEST_DSN)
+    try:
+        with conn.cursor() as cursor:
+            yield cursor
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def get_tn_data_bsc_info(crtr_del_col_nm, dw_load_mthd_cd="partition"):
+    return SimpleNamespace(dw_tbl_phys_nm="tdw_test", crtr_del_col_nm=crtr_del_col_nm, dw_load_mthd_cd=dw_load_mthd_cd)
+
+
+def run_upsert_stmt(cursor, file_column, row_list, dw_load_mthd_cd="upsert"):
+    cursor.execute("CREATE TABLE tdw_test (key_col integer PRIMARY KEY, vl text, clct_sn integer)")
+    cursor.execute("INSERT INTO tdw_test VALUES (1, 'old', 0)")
+    cursor.execute("CREATE TEMP TABLE tmp_test (key_col integer, vl text, clct_sn integer)")
+    for row in row_list:
+        cursor.execute(f"INSERT INTO tmp_test ({', '.join(file_column)}) VALUES ({', '.join(['%s'] * len(row))})", row)
+    cursor.execute(DwUtil.get_upsert_stmt(get_tn_data_bsc_info("key_col", dw_load_mthd_cd), file_column, "tmp_test"))
+    cursor.execute("SELECT key_col, vl FROM tdw_test ORDER BY key_col")
+    return cursor.fetchall()
+
+
+def test_upsert_stmt_orders_duplicate_keys():
+    upsert_stmt = DwUtil.get_upsert_stmt(get_tn_data_bsc_info("key_col"), ["key_col", "vl", "clct_sn"], "tmp_test")
+
+    assert 'ORDER BY "key_col", "clct_sn" DESC' in " ".join(upsert_stmt.split())
+
+
+def test_upsert_duplicate_keys_last_clct_sn_wins(cursor):
+    row_list = [(1, "b", 2), (2, "x", 1), (1, "c", 3), (1, "a", 1)]
+
+    assert run_upsert_stmt(cursor, ["key_col", "vl", "clct_sn"], row_list) == [(1, "c"), (2, "x")]
+
+
+def test_upsert_all_duplicate_keys_last_row_wins_without_clct_sn(cursor):
+    row_list = [(1, "a"), (2, "x"), (1, "b"), (1, "c")]
+
+    assert run_upsert_stmt(cursor, ["key_col", "vl"], row_list, "upsert_all") == [(1, "c"), (2, "x")]
+
+
+def run_partition_stmt_list(cursor, key_type, existing_value_list, value_list):
+    cursor.execute(f"CREATE TABLE tdw_test (key_col {key_type}, vl text) PARTITION BY LIST (key_col)")
+    for index, existing_value in enumerate(existing_value_list):
+        cursor.execute(f"CREATE TABLE tdw_test_old{index} PARTITION OF tdw_test FOR VALUES IN ('{existing_value}')")
+    cursor.execute("CREATE TABLE tdw_test_default PARTITION OF tdw_test DEFAULT")
+    cursor.execute(f"CREATE TEMP TABLE tmp_test (key_col {key_type}, vl text)")
+    cursor.execute("INSERT INTO tmp_test SELECT v::" + key_type + ", 'x' FROM unnest(%s::text[]) v", (value_list,))
+    return DwUtil.get_partition_stmt_list(cursor, get_tn_data_bsc_info("key_col"), "tmp_test")
+
+
+def test_partition_integer_key_uses_existing_partition(cursor):
+    partition_stmt_list = run_partition_stmt_list(cursor, "integer", ["007"], ["7", "8"])
+
+    assert "TRUNCATE TABLE tdw_test_old0" in partition_stmt_list
+    assert "CREATE TABLE tdw_test_8 PARTITION OF tdw_test FOR VALUES IN ('8')" in partition_stmt_list
+    assert "TRUNCATE TABLE tdw_test_default" not in partition_stmt_list
+    for partition_stmt in partition_stmt_list:
+        cursor.execute(partition_stmt)
+
+
+def test_partition_date_key_uses_existing_partition(cursor):
+    partition_stmt_list = run_partition_stmt_list(cursor, "date", ["2024-01-31"], ["2024-01-31", "2024-02-01"])
+
+    assert sorted(partition_stmt_list) == sorted([
+        "TRUNCATE TABLE tdw_test_old0",
+        "CREATE TABLE tdw_test_2024_02_01 PARTITION OF tdw_test FOR VALUES IN ('2024-02-01')",
+        "TRUNCATE TABLE tdw_test_2024_02_01",
+    ])
+
+
+def test_partition_text_key_with_quote(cursor):
+    partition_stmt_list = run_partition_stmt_list(cursor, "text", ["a''b"], ["a'b", "50%"])
+
+    assert "TRUNCATE TABLE tdw_test_old0" in partition_stmt_list
+    assert "CREATE TABLE tdw_test_50_ PARTITION OF tdw_test FOR VALUES IN ('50%')" in partition_stmt_list
+
+
+def test_partition_multi_column_key_rejected():
+    with pytest.raises(ValueError, match="다중 컬럼"):
+        DwUtil.get_partition_stmt_list(None, get_tn_data_bsc_info("clct_sn, data_crtr_pnttm"), "tmp_test")
+
+
+def test_partition_name_long_value():
+    partition_name = DwUtil.get_partition_name("tdw_test", "x" * 100)
+
+    assert len(partition_name) <= 63
+    assert partition_name.startswith("tdw_test_")
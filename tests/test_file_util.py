@@ -0,0 +1,64 @@
+import os
+import zipfile
+
+import pytest
+
+from util.file_util import FileUtil, ZipAssembler, ZIP_ZSTANDARD
+
+
+def write_members(tmp_path, member_dict):
+    file_path = tmp_path / "src"
+    file_path.mkdir()
+    for file_name, data in member_dict.items():
+        (file_path / file_name).write_bytes(data)
+    return file_path
+
+
+def assemble(tmp_path, file_path, member_dict, force_zip64 = False, compress_type = zipfile.ZIP_DEFLATED):
+    full_zip_path = str(tmp_path / "out.zip")
+    with ZipAssembler(full_zip_path, force_zip64) as zip_assembler:
+        for index, file_name in enumerate(member_dict):
+            temp_file_name = str(tmp_path / f"member{index}")
+            crc, compress_size, file_size = FileUtil.compress_member(str(file_path / file_name), temp_file_name, compress_type)
+            zip_assembler.write_member(str(file_path / file_name), file_name, temp_file_name, compress_type, crc, compress_size, file_size)
+    return full_zip_path
+
+
+@pytest.mark.parametrize("force_zip64", [False, True])
+@pytest.mark.parametrize("compress_type", [zipfile.ZIP_DEFLATED, zipfile.ZIP_STORED])
+def test_zip_assembler_round_trip(tmp_path, force_zip64, compress_type):
+    member_dict = {"data.csv": b"clct_sn|a\n" + b"1|x\n" * 10000, "수집_결과.json": "{\"한글\": 1}".encode("utf-8"), "empty.txt": b""}
+    file_path = write_members(tmp_path, member_dict)
+    full_zip_path = assemble(tmp_path, file_path, member_dict, force_zip64, compress_type)
+
+    with zipfile.ZipFile(full_zip_path) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.namelist() == list(member_dict)
+        for file_name, data in member_dict.items():
+            assert zip_file.read(file_name) == data
+            assert zip_file.getinfo(file_name).compress_type == compress_type
+
+
+def test_zip_file_parallel_unzip(tmp_path):
+    member_dict = {f"file{index}.csv": f"clct_sn|a\n1|{index}\n".encode() * 1000 for index in range(5)}
+    file_path = write_members(tmp_path, member_dict)
+    full_zip_path = str(file_path / "out.zip")
+    FileUtil.zip_file_parallel(str(file_path), full_zip_path, list(member_dict), max_workers = 2)
+
+    with zipfile.ZipFile(full_zip_path) as zip_file:
+        assert zip_file.testzip() is None
+        assert {file_name: zip_file.read(file_name) for file_name in zip_file.namelist()} == member_dict
+    assert sorted(os.listdir(file_path)) == sorted(list(member_dict) + ["out.zip"])  # 임시 디렉터리 삭제
+
+
+def test_zip_assembler_zstd(tmp_path):
+    pytest.importorskip("zstandard")
+    member_dict = {"data.csv": b"clct_sn|a\n" + b"1|x\n" * 10000}
+    file_path = write_members(tmp_path, member_dict)
+    full_zip_path = assemble(tmp_path, file_path, member_dict, compress_type = ZIP_ZSTANDARD)
+
+    out_path = tmp_path / "out"
+    out_path.mkdir()
+    with zipfile.ZipFile(full_zip_path) as zip_file:
+        FileUtil.unzip_zstd_member(full_zip_path, zip_file.getinfo("data.csv"), str(out_path))
+    assert (out_path / "data.csv").read_bytes() == member_dict["data.csv"]